@@ -61,13 +61,17 @@ async def deactivate_kill_switch():
 
 @app.get("/api/v1/admin/exchanges")
 async def get_exchanges():
-    """Get exchange status"""
+    """
+    Configured exchanges.
+
+    This server holds no exchange connections, so it cannot report status or
+    latency; the engine (backend.main) serves measured values at the same path
+    and at /metrics.
+    """
     return {
         "exchanges": [
-            {"name": "Binance", "status": "connected", "latency_ms": 45},
-            {"name": "Kraken", "status": "connected", "latency_ms": 120},
-            {"name": "Coinbase", "status": "connected", "latency_ms": 85},
-            {"name": "Bybit", "status": "connected", "latency_ms": 65},
+            {"name": name, "status": "unknown", "latency_ms": None}
+            for name in settings.exchanges_list
         ],
         "timestamp": datetime.utcnow().isoformat()
     }
@@ -0,0 +1,217 @@
+"""
+Stateless API worker for Quantum Arbitrage Engine.
+
+Serves the read endpoints of backend.main from the state the engine process
+publishes over local IPC (backend/services/engine_link.py). A worker holds
+no exchange connections and runs no detectors, so any number of them can run
+behind one port; run.py starts them when API_WORKERS > 0:
+
+    uvicorn backend.api.worker:app --port 8000 --workers 4
+
+Prices come straight from the shared-memory price book when ingestion
+workers are running, and from the engine link otherwise. Admin endpoints
+return the engine's latest status snapshot (refreshed every
+ENGINE_STATUS_INTERVAL seconds); stream, snapshot and engine-link statistics
+are this worker's own.
+"""
+
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+
+from fastapi import FastAPI, HTTPException, Request, WebSocket
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+
+from backend.core.config import settings
+from backend.core.logging_config import setup_logging
+from backend.services.engine_link import EngineReplica, ReplicaPriceBook
+from backend.services.shared_price_book import SharedPriceBook
+from backend.services.snapshot_cache import OpportunitiesSnapshot, PricesSnapshot, negotiate_format, respond
+from backend.services.stream_hub import KeyedTopic, PriceTopic, StateTopic, StreamHub, opportunity_key
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+# Built in lifespan(): importing this module attaches no shared memory and opens no engine link
+replica: Optional[EngineReplica] = None
+price_book: Optional[Union[SharedPriceBook, ReplicaPriceBook]] = None
+prices_snapshot: Optional[PricesSnapshot] = None
+opportunities_snapshot: Optional[OpportunitiesSnapshot] = None
+stream_hub: Optional[StreamHub] = None
+
+
+async def current_opportunities() -> List[Dict]:
+    return replica.get("opportunities", [])
+
+
+def engine_status(key: str) -> Dict[str, Any]:
+    status = replica.get("status")
+    if status is None:
+        raise HTTPException(status_code=503, detail="Engine status not received yet")
+    return status[key]
+
+
+def system_status() -> Dict:
+    status = replica.get("status")
+    return {**(status["system"] if status else {}), "engine_link": replica.connected}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Follow the engine for the life of the server."""
+    global replica, price_book, prices_snapshot, opportunities_snapshot, stream_hub
+    replica = EngineReplica(settings.engine_link_address)
+    if settings.ingest_workers > 0:
+        # Same memory the ingestion workers write; no IPC on the read path
+        price_book = SharedPriceBook.attach(settings.shared_price_book_name)
+    else:
+        price_book = ReplicaPriceBook(replica)
+
+    prices_snapshot = PricesSnapshot(price_book)
+    opportunities_snapshot = OpportunitiesSnapshot(current_opportunities, lambda: replica.version("opportunities"))
+
+    stream_hub = StreamHub(interval=settings.stream_interval, queue_size=settings.stream_client_queue_size)
+    stream_hub.add_topic(PriceTopic(price_book))
+    stream_hub.add_topic(KeyedTopic("opportunities", current_opportunities, opportunity_key))
+    stream_hub.add_topic(StateTopic("system", system_status))
+
+    await replica.start()
+    await stream_hub.start()
+    logger.info(f"API worker started, following engine at {settings.engine_link_address}")
+    try:
+        yield
+    finally:
+        await stream_hub.stop()
+        await replica.stop()
+        if isinstance(price_book, SharedPriceBook):
+            price_book.close()
+
+
+app = FastAPI(
+    title="Quantum Arbitrage Engine API",
+    description="Institutional-Grade Multi-Exchange Arbitrage Trading Platform",
+    version="2.0.0",
+    lifespan=lifespan,
+)
+
+# Configure CORS
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+
+# --- API Endpoints ---
+
+@app.get("/api/v1/health")
+async def health_check():
+    return {
+        "status": "healthy" if replica.connected else "degraded",
+        "engine_link": replica.connected,
+        "timestamp": datetime.utcnow().isoformat(),
+        "version": settings.app_version
+    }
+
+@app.get("/api/v1/market/prices")
+async def get_market_prices(request: Request):
+    """Get all real-time prices (JSON, MessagePack or the columnar grid; see wire.py)."""
+    fmt = negotiate_format(request, PricesSnapshot.formats)
+    return respond(request, prices_snapshot.get(fmt))
+
+@app.get("/api/v1/arbitrage/opportunities")
+async def get_opportunities(request: Request, min_profit: float = 0.0):
+    """Get active arbitrage opportunities (JSON or MessagePack)."""
+    fmt = negotiate_format(request, OpportunitiesSnapshot.formats)
+    return respond(request, await opportunities_snapshot.get(min_profit, fmt))
+
+@app.get("/api/v1/arbitrage/detector")
+async def get_detector_stats():
+    return engine_status("detector")
+
+@app.get("/api/v1/portfolio/metrics")
+async def get_portfolio_metrics():
+    """Get portfolio and P&L summary."""
+    # Return demo metrics for dashboard display
+    return {
+        "daily_pnl_usd": 1250.50,
+        "daily_pnl_pct": 1.25,
+        "total_exposure_usd": 45000.00,
+        "active_trades_count": 3,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/api/v1/admin/exchanges")
+async def get_exchanges_status():
+    return engine_status("exchanges")
+
+@app.get("/api/v1/admin/subscriptions")
+async def get_subscription_coverage():
+    return engine_status("subscriptions")
+
+@app.get("/api/v1/admin/persistence")
+async def get_persistence_stats():
+    return engine_status("persistence")
+
+@app.get("/api/v1/admin/ingest")
+async def get_ingest_stats():
+    return engine_status("ingest")
+
+@app.get("/api/v1/admin/tick-store")
+async def get_tick_store_stats():
+    return engine_status("tick_store")
+
+@app.get("/api/v1/admin/runtime")
+async def get_runtime_stats():
+    """The engine's event loop, CPU executor and stage busy time."""
+    return engine_status("runtime")
+
+@app.get("/api/v1/admin/stream")
+async def get_stream_stats():
+    """This worker's /ws/market subscribers and frames."""
+    return {"stats": stream_hub.stats(), "timestamp": datetime.utcnow().isoformat()}
+
+@app.get("/api/v1/admin/snapshots")
+async def get_snapshot_stats():
+    """This worker's encoded REST snapshot versions and cache hit counts."""
+    return {
+        "prices": prices_snapshot.stats(),
+        "opportunities": opportunities_snapshot.stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/api/v1/admin/engine-link")
+async def get_engine_link_stats():
+    """This worker's connection to the engine, and the engine's publisher statistics."""
+    status = replica.get("status")
+    return {
+        "replica": replica.stats(),
+        "publisher": status["engine_link"]["stats"] if status else None,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.websocket("/ws/market")
+async def websocket_market(websocket: WebSocket):
+    """Live prices / opportunities / system deltas; same protocol as the engine's /ws/market."""
+    requested = websocket.query_params.get("topics")
+    topics = [t.strip() for t in requested.split(",") if t.strip()] if requested else list(stream_hub.topics)
+    fmt = websocket.query_params.get("format", "json").lower()
+    await stream_hub.serve(websocket, topics, fmt)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """The engine's exchange telemetry in the Prometheus text format, as of its last status snapshot."""
+    return PlainTextResponse(engine_status("metrics"), media_type="text/plain; version=0.0.4")
+
+@app.get("/")
+async def root():
+    return {
+        "message": "Quantum Arbitrage Engine API",
+        "version": settings.app_version,
+        "docs": "/docs",
+        "health": "/api/v1/health"
+    }
@@ -31,6 +31,12 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str = "sqlite+aiosqlite:///./qae.db"
+    storage_profile: str = "balanced"  # default | durable | balanced | fast (SQLite PRAGMA set)
+    db_echo: bool = False  # log every SQL statement
+    persistence_enabled: bool = True  # write-behind storage of opportunities, trades, risk events
+    persistence_batch_size: int = 500  # rows per INSERT transaction
+    persistence_flush_interval: float = 1.0  # seconds between flushes of a partial batch
+    persistence_max_pending: int = 20000  # buffered rows before new ones are dropped
     
     # Exchange API Keys
     binance_api_key: str = ""
@@ -75,6 +81,32 @@ class Settings(BaseSettings):
     enabled_exchanges: str = "binance,kraken"
     price_update_interval: float = 2.0
     opportunity_scan_interval: float = 1.0
+    arbitrage_scan_mode: str = "pairwise"  # pairwise | vectorized | incremental
+    arbitrage_top_k: int = 20  # opportunities kept per vectorized scan
+    quote_max_age_seconds: float = 10.0  # older quotes are excluded from arbitrage scans (0 = never)
+    feed_stale_seconds: float = 30.0  # a stream shard silent this long is resubscribed (0 = never)
+    triangular_enabled: bool = False  # needs the cycle markets in tracked_symbols
+    order_book_depth_enabled: bool = False  # stream L2 books and add VWAP profit to opportunities
+    order_book_depth: int = 50  # levels requested per book
+    exchange_connect_timeout: float = 15.0  # per-exchange load_markets deadline
+    exchange_startup_wait: float = 5.0  # max wait before engines start; slower exchanges join later
+    mock_exchange_url: str = ""  # e.g. http://127.0.0.1:8765 routes every enabled exchange to the local mock
+
+    # Market metadata cache (data/market_cache/<exchange>.bin)
+    market_cache_enabled: bool = True
+    market_cache_dir: str = "./data/market_cache"
+    market_cache_ttl: float = 86400.0  # entries older than this are ignored
+    market_cache_refresh_after: float = 3600.0  # older entries are served, then refreshed in background
+
+    # Tick ingestion between exchange streams and the market engine
+    tick_ingest_enabled: bool = True
+    tick_ingest_policy: str = "latest"  # latest | drop_oldest
+    tick_ingest_max_depth: int = 1000  # per exchange
+    tick_ingest_batch_size: int = 256
+    tick_store_enabled: bool = False  # record raw tick history for backtests
+    tick_store_dir: str = "data/ticks"
+    tick_store_partition: str = "day"  # day | hour
+    tick_store_flush_interval: float = 1.0
     
     @property
     def symbols_list(self) -> List[str]:
@@ -109,9 +141,46 @@ class Settings(BaseSettings):
     ai_model_path: str = "./models/trade_filter_model.pkl"
     ai_decision_threshold: float = 0.7
     
+    # Engine runtime
+    engine_event_loop: str = "auto"  # auto (uvloop when installed) | uvloop | asyncio
+    engine_cpu_executor: str = "thread"  # inline | thread | process (pure stages such as the spread ranking)
+    engine_cpu_workers: int = 0  # 0 = min(4, CPU count)
+    loop_lag_interval: float = 0.25  # seconds between event loop lag probes
+    loop_lag_warn_ms: float = 100.0  # wake-ups later than this are logged and counted as late
+
+    # Process topology (run.py)
+    ingest_workers: int = 0  # ingestion processes feeding a shared-memory price book (0 = streams run in the engine)
+    ingest_exchange_groups: str = ""  # e.g. "binance,bybit;kraken,okx"; default spreads exchanges over ingest_workers
+    shared_price_book_name: str = "qae-prices"  # shared memory block name
+    api_workers: int = 0  # stateless API processes (backend.api.worker) fed by the engine; 0 = the engine serves the API
+    engine_api_port: int = 8001  # the engine's own API, on loopback, when api_workers > 0
+    engine_link_address: str = "unix:data/engine.sock"  # engine -> API worker IPC; tcp:127.0.0.1:8790 where no Unix sockets
+    engine_publish_interval: float = 0.1  # seconds between checks for changed prices / opportunities
+    engine_status_interval: float = 1.0  # seconds between admin/statistics snapshots sent to API workers
+
+    @property
+    def ingest_groups(self) -> List[List[str]]:
+        """Exchanges handled by each ingestion worker."""
+        if self.ingest_exchange_groups:
+            groups = [[e.strip() for e in g.split(",") if e.strip()] for g in self.ingest_exchange_groups.split(";")]
+            return [g for g in groups if g]
+        exchanges = self.exchanges_list
+        n = min(self.ingest_workers, len(exchanges))
+        return [exchanges[i::n] for i in range(n)] if n > 0 else []
+
+    def check_topology(self):
+        """Raise ValueError for features the ingestion-worker topology cannot provide."""
+        if self.ingest_workers > 0 and self.tick_store_enabled:
+            raise ValueError("TICK_STORE_ENABLED needs INGEST_WORKERS=0: with ingestion workers the ticker "
+                             "streams run outside the engine and no tick history would be recorded")
+
     # WebSocket Configuration
-    ws_reconnect_delay: int = 5
-    ws_max_retries: int = 3
+    ws_reconnect_delay: int = 5  # first stream retry delay (s); doubles per failure, with jitter
+    ws_reconnect_max_delay: float = 60.0  # backoff ceiling (s)
+    ws_max_retries: int = 3  # failed retries per exchange, with no data in between, that open its circuit
+    ws_circuit_cooldown: float = 60.0  # seconds an open circuit pauses reconnects before one probe
+    stream_interval: float = 0.5  # seconds between /ws/market delta frames
+    stream_client_queue_size: int = 64  # frames buffered per client before it is dropped as too slow
     
     class Config:
         env_file = ".env"
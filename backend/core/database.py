@@ -4,7 +4,11 @@ Author: HABIB-UR-REHMAN <hassanbhatti2343@gmail.com>
 """
 
 import logging
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from typing import Any, Dict, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from backend.core.config import settings
 
@@ -15,22 +19,114 @@ class Base(DeclarativeBase):
     pass
 
 
-engine = create_async_engine(
+# SQLite PRAGMA sets applied on every new connection. journal_mode is
+# persistent in the database file and is only set by the writer.
+STORAGE_PROFILES: Dict[str, Dict[str, Any]] = {
+    # SQLite defaults: rollback journal, fsync on every commit
+    "default": {},
+    # WAL with a full fsync per commit; no committed row is ever lost
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -32000,  # KiB
+        "busy_timeout": 5000,
+    },
+    # WAL with fsync at checkpoints only; a power loss can drop the last commits
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64000,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # No fsync at all; for replays, benchmarks and throwaway databases
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "mmap_size": 1024 * 1024 * 1024,
+        "cache_size": -256000,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
+
+
+def _apply_pragmas(pragmas: Dict[str, Any], writer: bool):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                if name == "journal_mode" and not writer:
+                    continue
+                cursor.execute(f"PRAGMA {name}={value}")
+            if not writer:
+                cursor.execute("PRAGMA query_only=ON")
+        finally:
+            cursor.close()
+    return on_connect
+
+
+def create_engines(database_url: str, profile: str = "balanced",
+                   echo: bool = False) -> Tuple[AsyncEngine, AsyncEngine]:
+    """
+    Build the (writer, reader) engines for ``database_url``.
+
+    For file-backed SQLite the writer is a single pooled connection, so
+    writes are serialized in-process instead of contending for the file
+    lock, and readers get their own query-only pool that WAL lets run
+    alongside it. Other backends (and in-memory SQLite) share one engine.
+    """
+    url = make_url(database_url)
+    is_sqlite = url.get_backend_name() == "sqlite"
+    in_memory = is_sqlite and url.database in (None, "", ":memory:")
+
+    if not is_sqlite or in_memory:
+        writer = create_async_engine(database_url, echo=echo, pool_pre_ping=True)
+        return writer, writer
+
+    if profile not in STORAGE_PROFILES:
+        raise ValueError(f"Unknown storage profile '{profile}', expected one of {sorted(STORAGE_PROFILES)}")
+    pragmas = STORAGE_PROFILES[profile]
+
+    writer = create_async_engine(database_url, echo=echo, pool_size=1, max_overflow=0)
+    event.listen(writer.sync_engine, "connect", _apply_pragmas(pragmas, writer=True))
+
+    reader = create_async_engine(database_url, echo=echo, pool_size=5, max_overflow=5)
+    event.listen(reader.sync_engine, "connect", _apply_pragmas(pragmas, writer=False))
+    return writer, reader
+
+
+engine, read_engine = create_engines(
     settings.database_url,
-    echo=settings.debug,
-    pool_pre_ping=True,
+    profile=settings.storage_profile,
+    echo=settings.db_echo,
 )
 
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+read_session = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
 
 
 async def init_db():
     """Create all tables."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
-    logger.info("Database tables created successfully")
+    logger.info(f"Database tables created successfully (storage profile: {settings.storage_profile})")
+
+
+async def close_db():
+    """Dispose of the writer and reader connection pools."""
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
 
 
 async def get_session() -> AsyncSession:
     async with async_session() as session:
         yield session
+
+
+async def get_read_session() -> AsyncSession:
+    """Session on the query-only reader pool, for endpoints that never write."""
+    async with read_session() as session:
+        yield session
@@ -0,0 +1,36 @@
+"""
+Lightweight in-process metrics for Quantum Arbitrage Engine.
+"""
+
+from typing import Any, Dict
+
+import numpy as np
+
+
+class LatencyRecorder:
+    """Fixed-size ring buffer of latency samples (nanoseconds) with percentile summaries."""
+
+    def __init__(self, size: int = 4096):
+        self._samples = np.zeros(size, dtype=np.int64)
+        self._size = size
+        self._next = 0
+        self.count = 0
+
+    def record(self, nanos: int):
+        self._samples[self._next] = nanos
+        self._next = (self._next + 1) % self._size
+        self.count += 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Percentiles in microseconds over the most recent samples."""
+        n = min(self.count, self._size)
+        if n == 0:
+            return {"count": 0, "p50_us": None, "p99_us": None, "max_us": None}
+        window = self._samples[:n] / 1000.0
+        p50, p99 = np.percentile(window, [50, 99])
+        return {
+            "count": self.count,
+            "p50_us": round(float(p50), 2),
+            "p99_us": round(float(p99), 2),
+            "max_us": round(float(window.max()), 2),
+        }
@@ -0,0 +1,227 @@
+"""
+Event loop and CPU offload runtime for the engine process.
+
+    loop      uvloop when installed (ENGINE_EVENT_LOOP = auto | uvloop | asyncio)
+    executor  CPU-heavy stages run inline, on a thread pool, or (for pure
+              functions such as the spread ranking) on a process pool
+    lag       a monitor task measures how late the loop wakes it up
+    stages    busy time per stage: on the loop for timed callbacks, in the
+              executor for offloaded calls
+
+Lag that keeps growing while stage busy time approaches 100% of wall time
+means the loop is saturated and work should move to the executor.
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from backend.core.metrics import LatencyRecorder
+
+logger = logging.getLogger(__name__)
+
+LOOPS = ("auto", "uvloop", "asyncio")
+EXECUTORS = ("inline", "thread", "process")
+
+
+def install_event_loop(choice: str = "auto") -> str:
+    """Install the event loop policy for asyncio.run(); returns the loop that will be used."""
+    if choice not in LOOPS:
+        raise ValueError(f"Unknown event loop '{choice}' (expected one of {', '.join(LOOPS)})")
+    if choice == "asyncio":
+        return "asyncio"
+    try:
+        import uvloop
+    except ImportError:
+        if choice == "uvloop":
+            raise RuntimeError("ENGINE_EVENT_LOOP=uvloop but uvloop is not installed")
+        return "asyncio"
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return "uvloop"
+
+
+def loop_name(loop: Optional[asyncio.AbstractEventLoop] = None) -> str:
+    loop = loop or asyncio.get_running_loop()
+    return "uvloop" if type(loop).__module__.startswith("uvloop") else "asyncio"
+
+
+class StageTimer:
+    """Cumulative busy time of one pipeline stage."""
+
+    __slots__ = ("name", "calls", "loop_ns", "executor_ns", "last_ns")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.loop_ns = 0       # time spent running on the event loop
+        self.executor_ns = 0   # time offloaded calls took, queueing included
+        self.last_ns = 0
+
+    def record(self, nanos: int, offloaded: bool = False):
+        self.calls += 1
+        self.last_ns = nanos
+        if offloaded:
+            self.executor_ns += nanos
+        else:
+            self.loop_ns += nanos
+
+    def summary(self, uptime_s: float) -> Dict[str, Any]:
+        uptime_ns = max(uptime_s, 1e-9) * 1e9
+        return {
+            "calls": self.calls,
+            "loop_busy_ms": round(self.loop_ns / 1e6, 1),
+            "loop_busy_pct": round(100.0 * self.loop_ns / uptime_ns, 2),
+            "executor_ms": round(self.executor_ns / 1e6, 1),
+            "mean_ms": round((self.loop_ns + self.executor_ns) / self.calls / 1e6, 3) if self.calls else None,
+            "last_ms": round(self.last_ns / 1e6, 3),
+        }
+
+
+class LoopLagMonitor:
+    """Sleeps ``interval`` seconds at a time and records how late each wake-up is."""
+
+    def __init__(self, interval: float = 0.25, warn_ms: float = 100.0):
+        self.interval = interval
+        self.warn_ms = warn_ms
+        self.lag = LatencyRecorder(size=1024)
+        self.late = 0  # wake-ups later than warn_ms
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run(), name="loop-lag-monitor")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        interval_ns = int(self.interval * 1e9)
+        warn_ns = int(self.warn_ms * 1e6)
+        while True:
+            expected = time.perf_counter_ns() + interval_ns
+            await asyncio.sleep(self.interval)
+            lag = max(0, time.perf_counter_ns() - expected)
+            self.lag.record(lag)
+            if lag > warn_ns:
+                self.late += 1
+                if self.late == 1 or self.late % 100 == 0:
+                    logger.warning(f"Event loop lag {lag / 1e6:.0f} ms (late wake-ups: {self.late})")
+
+    def summary(self) -> Dict[str, Any]:
+        lag = self.lag.summary()
+        return {
+            "samples": lag["count"],
+            "p50_ms": round(lag["p50_us"] / 1000, 3) if lag["p50_us"] is not None else None,
+            "p99_ms": round(lag["p99_us"] / 1000, 3) if lag["p99_us"] is not None else None,
+            "max_ms": round(lag["max_us"] / 1000, 3) if lag["max_us"] is not None else None,
+            "late": self.late,
+            "warn_ms": self.warn_ms,
+        }
+
+
+class EngineRuntime:
+    """CPU offload pools, stage busy time and loop lag for the engine process."""
+
+    def __init__(self, executor: str = "thread", workers: int = 0,
+                 lag_interval: float = 0.25, lag_warn_ms: float = 100.0):
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown CPU executor '{executor}' (expected one of {', '.join(EXECUTORS)})")
+        self.executor = executor
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.monitor = LoopLagMonitor(lag_interval, lag_warn_ms)
+        self.stages: Dict[str, StageTimer] = {}
+        self._threads: Optional[Executor] = None
+        self._processes: Optional[Executor] = None
+        self._started_at = time.monotonic()
+
+    def stage(self, name: str) -> StageTimer:
+        timer = self.stages.get(name)
+        if timer is None:
+            timer = self.stages[name] = StageTimer(name)
+        return timer
+
+    def timed(self, name: str, fn: Callable) -> Callable:
+        """Wrap a synchronous callback so its time on the loop is charged to stage ``name``."""
+        timer = self.stage(name)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                timer.record(time.perf_counter_ns() - started)
+        return wrapper
+
+    async def run(self, name: str, fn: Callable, *args, pure: bool = False):
+        """
+        Run CPU-bound ``fn(*args)`` off the loop and charge it to stage ``name``.
+
+        ``pure`` marks a function whose arguments and result pickle and which
+        touches no shared state; only those go to the process pool. Everything
+        else uses the thread pool, or runs inline when offload is off.
+        """
+        timer = self.stage(name)
+        executor = self._processes if pure and self._processes is not None else self._threads
+        started = time.perf_counter_ns()
+        if executor is None:
+            try:
+                return fn(*args)
+            finally:
+                timer.record(time.perf_counter_ns() - started)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        finally:
+            timer.record(time.perf_counter_ns() - started, offloaded=True)
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        self._started_at = time.monotonic()
+        if self.executor != "inline" and self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="engine-cpu")
+        if self.executor == "process" and self._processes is None:
+            # spawn: forking a process that runs an event loop and socket threads is unsafe
+            self._processes = ProcessPoolExecutor(max_workers=self.workers,
+                                                  mp_context=multiprocessing.get_context("spawn"))
+            # Spawn and import the workers now rather than on the first scan
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(loop.run_in_executor(self._processes, os.getpid) for _ in range(self.workers)))
+        await self.monitor.start()
+        logger.info(f"Engine runtime: {loop_name()} loop, {self.executor} CPU executor ({self.workers} workers)")
+
+    async def stop(self):
+        await self.monitor.stop()
+        for pool in (self._threads, self._processes):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._threads = self._processes = None
+
+    def stats(self) -> Dict[str, Any]:
+        uptime = time.monotonic() - self._started_at
+        try:
+            loop = loop_name()
+        except RuntimeError:
+            loop = None
+        return {
+            "loop": loop,
+            "executor": self.executor,
+            "workers": self.workers,
+            "uptime_sec": round(uptime, 1),
+            "loop_lag": self.monitor.summary(),
+            "loop_busy_pct": round(sum(100.0 * t.loop_ns / max(uptime, 1e-9) / 1e9
+                                       for t in self.stages.values()), 2),
+            "stages": {name: t.summary(uptime) for name, t in self.stages.items()},
+        }
@@ -0,0 +1,364 @@
+"""
+Engine graph of the Quantum Arbitrage Engine process.
+
+``Engines()`` builds every engine and service from settings and wires them
+together; ``start()`` / ``stop()`` bring them up and down in dependency
+order. backend.main builds it inside the FastAPI lifespan, so importing the
+app (or a uvicorn reload, or a run.py respawn) does none of this work until
+the server actually starts.
+"""
+
+import asyncio
+import importlib
+import logging
+from typing import Any, Dict, List, Optional
+
+from backend.core.config import settings
+from backend.core.database import close_db, init_db, read_session
+from backend.core.runtime import EngineRuntime
+from backend.exchanges.adapter import ExchangeManager
+from backend.exchanges.bootstrap import exchange_config, stream_policy
+from backend.exchanges.market_cache import MarketCache
+from backend.services.tick_ingest import TickIngestQueue
+from backend.services.tick_store import TickStore
+from backend.services.price_book import PriceBook, initial_version
+from backend.services.shared_price_book import SharedBookFollower, SharedPriceBook
+from backend.services.spread_scanner import SpreadScanner, load_taker_fees
+from backend.services.incremental_arbitrage import IncrementalArbitrageDetector
+from backend.services.triangular import TriangularDetector
+from backend.services.depth import DepthEstimator
+from backend.services.engine_link import EnginePublisher
+from backend.services.persistence import WriteBehindWriter
+from backend.services.snapshot_cache import OpportunitiesSnapshot, PricesSnapshot
+from backend.services.wire import COLUMNAR
+from backend.services.stream_hub import KeyedTopic, PriceTopic, StateTopic, StreamHub, opportunity_key
+
+logger = logging.getLogger(__name__)
+
+
+def legacy_engine(module: str, name: str) -> Optional[type]:
+    """``backend.services.<module>.<name>``, or None when that legacy engine module is not installed."""
+    path = f"backend.services.{module}"
+    try:
+        return getattr(importlib.import_module(path), name)
+    except ModuleNotFoundError as e:
+        if e.name != path:
+            raise  # the module exists but one of its own imports is missing
+        return None
+
+
+class Engines:
+    """Every engine of the process, built from settings and wired together."""
+
+    def __init__(self):
+        # Detector versions restart at 0; this keeps opportunities_version() from repeating across restarts
+        self._started_version = initial_version()
+        # CPU offload pools, per-stage busy time and event loop lag
+        self.engine_runtime = EngineRuntime(
+            executor=settings.engine_cpu_executor,
+            workers=settings.engine_cpu_workers,
+            lag_interval=settings.loop_lag_interval,
+            lag_warn_ms=settings.loop_lag_warn_ms,
+        )
+        runtime = self.engine_runtime
+        self.market_cache = MarketCache(
+            settings.market_cache_dir,
+            ttl=settings.market_cache_ttl,
+            refresh_after=settings.market_cache_refresh_after,
+        ) if settings.market_cache_enabled and not settings.mock_exchange_url else None
+        self.tick_ingest = TickIngestQueue(
+            policy=settings.tick_ingest_policy,
+            max_depth=settings.tick_ingest_max_depth,
+            batch_size=settings.tick_ingest_batch_size,
+        ) if settings.tick_ingest_enabled else None
+        tick_ingest = self.tick_ingest
+        self.exchange_manager = ExchangeManager(
+            market_cache=self.market_cache,
+            ingest=tick_ingest,
+            stream_policy=stream_policy(settings),
+        )
+
+        # Raw tick history, tapped before coalescing so every update is kept
+        self.tick_store = TickStore(
+            settings.tick_store_dir,
+            partition=settings.tick_store_partition,
+            flush_interval=settings.tick_store_flush_interval,
+        ) if settings.tick_store_enabled else None
+        if self.tick_store:
+            self.exchange_manager.add_tick_tap(self.tick_store.record)
+
+        # Columnar top-of-book store, fed from every ingested batch
+        self.shared_ingest = settings.ingest_workers > 0
+        self.book_follower: Optional[SharedBookFollower] = None
+        if self.shared_ingest:
+            settings.check_topology()
+            # Ingestion workers own the streams and write the book in shared memory (run.py creates it)
+            try:
+                self.price_book = SharedPriceBook.attach(settings.shared_price_book_name)
+            except FileNotFoundError:
+                raise RuntimeError(
+                    f"INGEST_WORKERS={settings.ingest_workers} but shared price book "
+                    f"'{settings.shared_price_book_name}' does not exist; start the engine with run.py"
+                )
+            if tick_ingest:
+                # Tick-driven detectors see the book's changes as ticker batches
+                self.book_follower = SharedBookFollower(self.price_book, tick_ingest.publish)
+        else:
+            self.price_book = PriceBook(settings.exchanges_list, settings.symbols_list)
+            if tick_ingest:
+                tick_ingest.add_listener(runtime.timed("price_book", self.price_book.apply_tickers))
+        # The price book is fed (prices served from it rather than the market engine)
+        self.book_fed = tick_ingest is not None or self.shared_ingest
+        self.spread_scanner = SpreadScanner(
+            self.price_book,
+            top_k=settings.arbitrage_top_k,
+            min_net_profit_pct=settings.min_profit_threshold_pct,
+            trade_size_usd=settings.default_trade_size_usd,
+            max_quote_age=settings.quote_max_age_seconds,
+        )
+        self.incremental_detector = IncrementalArbitrageDetector(
+            min_net_profit_pct=settings.min_profit_threshold_pct,
+            trade_size_usd=settings.default_trade_size_usd,
+            max_quote_age=settings.quote_max_age_seconds,
+        )
+        if tick_ingest and settings.arbitrage_scan_mode == "incremental":
+            # Each ingested tick re-evaluates only its own symbol
+            tick_ingest.add_listener(runtime.timed("incremental", self.incremental_detector.on_tickers),
+                                     received=True)
+        self.triangular_detector = TriangularDetector(
+            min_net_profit_pct=settings.min_profit_threshold_pct,
+            trade_size_usd=settings.default_trade_size_usd,
+            exchange_manager=self.exchange_manager,
+        )
+        if tick_ingest and settings.triangular_enabled:
+            tick_ingest.add_listener(runtime.timed("triangular", self.triangular_detector.on_tickers))
+        self.depth_estimator = DepthEstimator(
+            self.exchange_manager,
+            self.spread_scanner.taker_fees,
+            trade_size_usd=settings.default_trade_size_usd,
+            max_slippage_pct=settings.max_slippage_pct,
+        )
+        self.order_book_tasks: List[asyncio.Task] = []
+        self.ticker_tasks: List[asyncio.Task] = []  # ticker streams when there is no legacy market engine
+        if settings.order_book_depth_enabled:
+            # Book walks read L2 books the stream tasks mutate, so they stay on the loop (timed only)
+            self.spread_scanner.enrich = self.incremental_detector.enrich = \
+                runtime.timed("depth", self.depth_estimator.enrich)
+
+        # Opportunities are buffered and written in batches; detection never waits on disk
+        self.persistence = WriteBehindWriter(
+            max_pending=settings.persistence_max_pending,
+            batch_size=settings.persistence_batch_size,
+            flush_interval=settings.persistence_flush_interval,
+        ) if settings.persistence_enabled else None
+        if self.persistence:
+            self.spread_scanner.add_listener(self.persistence.submit_opportunity)
+            self.incremental_detector.add_listener(self.persistence.submit_opportunity)
+        self._build_legacy_engines()
+
+        # Hot REST payloads are encoded once per engine version and served with ETags
+        self.prices_snapshot = PricesSnapshot(self.price_book)
+        self.opportunities_snapshot = OpportunitiesSnapshot(self.current_opportunities, self.opportunities_version)
+
+        # /ws/market: deltas are diffed and encoded once per interval, then fanned out to subscribers
+        self.stream_hub = StreamHub(interval=settings.stream_interval, queue_size=settings.stream_client_queue_size)
+        self.stream_hub.add_topic(
+            PriceTopic(self.price_book) if self.book_fed or self.market_engine is None
+            else StateTopic("prices", self.market_engine.get_all_prices)
+        )
+        self.stream_hub.add_topic(KeyedTopic("opportunities", self.current_opportunities, opportunity_key))
+        self.stream_hub.add_topic(StateTopic("system", self.system_status))
+
+        # Stateless API workers (API_WORKERS > 0) replicate prices, opportunities and status from here;
+        # the app adds the "status" topic, since it is made of its admin endpoint payloads
+        self.engine_publisher = EnginePublisher(
+            settings.engine_link_address,
+            interval=settings.engine_publish_interval,
+        ) if settings.api_workers > 0 else None
+        if self.engine_publisher:
+            if self.book_fed:
+                # The cached columnar body, encoded at most once per book version
+                self.engine_publisher.add_topic("prices", lambda: self.prices_snapshot.get(COLUMNAR).body,
+                                                lambda: self.price_book.version)
+            self.engine_publisher.add_topic("opportunities", self.current_opportunities, self.opportunities_version)
+
+    def _build_legacy_engines(self):
+        """The pre-price-book engines (pairwise scan, execution, portfolio); each is None when not installed."""
+        classes = {
+            "market_engine": legacy_engine("market_engine", "MarketDataEngine"),
+            "risk_manager": legacy_engine("risk_manager", "RiskManager"),
+            "portfolio_tracker": legacy_engine("portfolio_tracker", "PortfolioTracker"),
+            "ai_engine": legacy_engine("ai_decision", "AIDecisionEngine"),
+            "arbitrage_engine": legacy_engine("arbitrage_engine", "ArbitrageEngine"),
+            "execution_engine": legacy_engine("execution_engine", "ExecutionEngine"),
+        }
+        missing = [name for name, cls in classes.items() if cls is None]
+        if missing:
+            logger.warning(f"Legacy engines not installed, running without: {', '.join(missing)}")
+
+        def build(name: str, *deps: Any) -> Any:
+            cls = classes[name]
+            return cls(*deps) if cls is not None and all(d is not None for d in deps) else None
+
+        exchange_manager = self.exchange_manager
+        self.market_engine = build("market_engine", exchange_manager)
+        self.risk_manager = build("risk_manager")
+        self.portfolio_tracker = build("portfolio_tracker", exchange_manager)
+        self.ai_engine = build("ai_engine")
+        self.arbitrage_engine = build("arbitrage_engine", self.market_engine, exchange_manager)
+        self.execution_engine = build("execution_engine", exchange_manager, self.risk_manager,
+                                      self.portfolio_tracker)
+        if settings.arbitrage_scan_mode == "pairwise" and self.arbitrage_engine is None:
+            raise RuntimeError("ARBITRAGE_SCAN_MODE=pairwise needs the legacy backend/services/arbitrage_engine.py, "
+                               "which is not installed; use vectorized or incremental")
+        if self.market_engine is None and not self.book_fed:
+            raise RuntimeError("Without the legacy market engine, prices reach the detectors through the tick "
+                               "ingest queue; set TICK_INGEST_ENABLED=true")
+
+    async def current_opportunities(self) -> List[Dict]:
+        """Active opportunities from whichever detector the scan mode selects."""
+        if settings.arbitrage_scan_mode == "vectorized":
+            opps = await self.spread_scanner.get_opportunities()
+        elif settings.arbitrage_scan_mode == "incremental":
+            opps = await self.incremental_detector.get_opportunities()
+        elif self.arbitrage_engine:
+            opps = await self.arbitrage_engine.get_opportunities()
+        else:
+            opps = []
+        if settings.triangular_enabled:
+            opps = list(opps) + await self.triangular_detector.get_opportunities()
+        return opps
+
+    def opportunities_version(self):
+        """Changes whenever current_opportunities() may return something new; None when unversioned."""
+        mode = settings.arbitrage_scan_mode
+        if mode == "vectorized":
+            version = self.spread_scanner.version
+        elif mode == "incremental":
+            version = self.incremental_detector.version
+        else:
+            return None
+        return (self._started_version, mode, version,
+                self.triangular_detector.version if settings.triangular_enabled else 0)
+
+    def system_status(self) -> Dict:
+        return {
+            "execution_mode": self.execution_engine.mode if self.execution_engine else None,
+            "connected_exchanges": [
+                a.name for a in self.exchange_manager.get_all_adapters().values() if a.is_connected
+            ],
+        }
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        """Initialize all services, in dependency order."""
+        runtime = self.engine_runtime
+        await runtime.start()
+        if settings.engine_cpu_executor != "inline":
+            self.spread_scanner.offload = runtime.run
+        self.stream_hub.busy = runtime.stage("stream")
+
+        if self.persistence:
+            await init_db()
+            await self.persistence.start()
+
+        # 1. Initialize Exchange Manager
+        exchange_manager = self.exchange_manager
+        for name in settings.exchanges_list:
+            exchange_manager.add_exchange(name, exchange_config(name, settings))
+
+        # Exchanges connect concurrently; stragglers keep connecting in the background
+        await exchange_manager.initialize_all(wait_timeout=settings.exchange_startup_wait)
+
+        # 2. Start Market Data Engine (ticks reach it through the ingest queue)
+        if self.tick_ingest:
+            await self.tick_ingest.start()
+        if self.tick_store:
+            await self.tick_store.start()
+        if self.shared_ingest:
+            # Ticker streams run in the ingestion workers; markets and private clients stay here
+            if self.book_follower:
+                await self.book_follower.start()
+            if settings.arbitrage_scan_mode == "pairwise":
+                logger.warning("Pairwise scan mode reads the market engine, which has no streams with "
+                               "INGEST_WORKERS > 0; use vectorized or incremental")
+        elif self.market_engine:
+            await self.market_engine.start()
+        else:
+            # No legacy market engine: the streams feed the ingest queue and its listeners directly
+            for name, adapter in exchange_manager.get_all_adapters().items():
+                self.ticker_tasks.append(asyncio.create_task(
+                    adapter.watch_tickers(settings.symbols_list, None), name=f"tickers-{name}"
+                ))
+
+        if settings.order_book_depth_enabled:
+            for adapter in exchange_manager.get_all_adapters().values():
+                self.order_book_tasks.append(asyncio.create_task(
+                    adapter.watch_order_books(settings.symbols_list, settings.order_book_depth)
+                ))
+
+        # 3. Start Portfolio Tracker
+        if self.portfolio_tracker:
+            await self.portfolio_tracker.start()
+
+        # 4. Start Arbitrage Engine
+        if self.arbitrage_engine:
+            await self.arbitrage_engine.start()
+        if settings.arbitrage_scan_mode in ("vectorized", "incremental") or settings.triangular_enabled:
+            try:
+                async with read_session() as session:
+                    fees = await load_taker_fees(session)
+                self.spread_scanner.set_fees(fees)
+                self.incremental_detector.set_fees(fees)
+                self.triangular_detector.set_fees(fees)
+            except Exception as e:
+                logger.warning(f"Taker fees unavailable from database, using defaults: {e}")
+        if settings.arbitrage_scan_mode == "vectorized":
+            await self.spread_scanner.start(settings.opportunity_scan_interval)
+        elif settings.arbitrage_scan_mode == "incremental":
+            # Retires opportunities whose legs stopped ticking
+            await self.incremental_detector.start(settings.opportunity_scan_interval)
+        if settings.triangular_enabled:
+            self.triangular_detector.build_all()
+
+        # 5. Start Execution Engine
+        if self.execution_engine:
+            await self.execution_engine.start()
+
+        await self.stream_hub.start()
+        if self.engine_publisher:
+            self.engine_publisher.busy = runtime.stage("publish")
+            await self.engine_publisher.start()
+
+    async def stop(self):
+        """Gracefully shut down all services."""
+        if self.engine_publisher:
+            await self.engine_publisher.stop()
+        await self.stream_hub.stop()
+        if self.execution_engine:
+            await self.execution_engine.stop()
+        await self.spread_scanner.stop()
+        await self.incremental_detector.stop()
+        if self.arbitrage_engine:
+            await self.arbitrage_engine.stop()
+        if self.portfolio_tracker:
+            await self.portfolio_tracker.stop()
+        if self.book_follower:
+            await self.book_follower.stop()
+        if not self.shared_ingest and self.market_engine:
+            await self.market_engine.stop()
+        for task in self.order_book_tasks + self.ticker_tasks:
+            task.cancel()
+        await self.exchange_manager.close_all()
+        if self.tick_ingest:
+            await self.tick_ingest.stop()
+        if self.tick_store:
+            await self.tick_store.stop()
+        # Flush buffered rows last, after every producer has stopped
+        if self.persistence:
+            await self.persistence.stop()
+        await close_db()
+        await self.engine_runtime.stop()
+        if self.shared_ingest:
+            self.price_book.close()
@@ -7,45 +7,132 @@ Supports hybrid public/private access and real-time WebSocket streaming.
 """
 
 import asyncio
+import importlib
 import logging
-import ccxt.pro as ccxtpro
-import ccxt
+import time
 from typing import Dict, List, Optional, Any, Callable
 
+from backend.exchanges.market_cache import MarketCache
+from backend.exchanges.order_book import L2Book
+from backend.exchanges.subscriptions import SubscriptionPlan, SubscriptionShard, plan_subscriptions
+from backend.exchanges.supervisor import StreamPolicy, StreamSupervisor
+from backend.exchanges.telemetry import ExchangeTelemetry
+from backend.services.tick_ingest import TickIngestQueue
+
 # Disable verbose logging for CCXT and other libraries
 logging.getLogger('ccxt').setLevel(logging.WARNING)
 logging.getLogger('ccxt.pro').setLevel(logging.WARNING)
 
 logger = logging.getLogger(__name__)
 
+# Adapter-level options carried in the exchange config that must not reach ccxt
+ADAPTER_OPTIONS = ('load_markets_timeout', 'ccxt_id', 'feed_stale_seconds')
+# Config entries also applied to the public client (endpoint overrides, e.g. a local mock exchange)
+PUBLIC_PASSTHROUGH = ('urls', 'hostname')
+
+_ccxt_pro = None
+
+
+async def load_ccxt_pro():
+    """
+    Import ccxt.pro on first connect, in a thread so the event loop keeps running.
+
+    ccxt's package __init__ imports every exchange class, so a per-exchange import
+    is not possible; instead processes that never connect (API workers, tools)
+    never pay for it, and the ones that do pay once.
+    """
+    global _ccxt_pro
+    if _ccxt_pro is None:
+        _ccxt_pro = await asyncio.to_thread(importlib.import_module, "ccxt.pro")
+    return _ccxt_pro
+
+
 class ExchangeAdapter:
-    def __init__(self, name: str, config: Dict[str, Any]):
+    def __init__(self, name: str, config: Dict[str, Any], market_cache: Optional[MarketCache] = None,
+                 ingest: Optional[TickIngestQueue] = None,
+                 tick_taps: Optional[List[Callable[[str, List[dict]], None]]] = None,
+                 stream_policy: Optional[StreamPolicy] = None):
         self.name = name
         self.config = config
         self.exchange_id = name.lower()
+        # ccxt class to instantiate; differs from the name when e.g. a mock venue speaks Binance's protocol
+        self.ccxt_id = config.get('ccxt_id', name).lower()
         self.markets = {}
         self.client = None
         self.public_client = None
         self.is_connected = False
         self.use_private = bool(config.get('apiKey') and config.get('secret'))
 
+        # Startup bookkeeping: pending -> connecting -> ready | failed
+        self.state = "pending"
+        self.connect_time_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.load_markets_timeout = float(config.get('load_markets_timeout', 15))
+        # A shard silent this long gets its connection reset and resubscribed (0 = never)
+        self.feed_stale_seconds = float(config.get('feed_stale_seconds', 0))
+        self._connect_done = asyncio.Event()
+
+        # Market metadata cache: "cache" or "exchange" once markets are loaded
+        self.market_cache = market_cache
+        self.markets_source: Optional[str] = None
+        self._cache_task: Optional[asyncio.Task] = None
+
+        # Optional non-blocking hand-off between the socket reader and consumers
+        self.ingest = ingest
+        self.subscriptions: Optional[SubscriptionPlan] = None
+        self.order_books: Dict[str, L2Book] = {}
+        # Synchronous observers of every raw frame, before any coalescing (e.g. TickStore.record)
+        self.tick_taps = tick_taps if tick_taps is not None else []
+        # Feed latency, rates, reconnects, errors, quote ages and REST latency
+        self.telemetry = ExchangeTelemetry(name)
+        # Independent retry loops with backoff per subscription, one circuit breaker per exchange
+        self.supervisor = StreamSupervisor(
+            name, stream_policy,
+            on_error=lambda key, e: self.telemetry.on_stream_error(),
+            on_retry=lambda key: self.telemetry.on_reconnect(),
+        )
+
     async def connect(self):
         """Initialize both public and private clients."""
+        self.state = "connecting"
+        self.last_error = None
+        self._connect_done.clear()
+        started = time.perf_counter()
+        try:
+            await self._connect()
+        finally:
+            self.connect_time_ms = (time.perf_counter() - started) * 1000
+            self.state = "ready" if self.is_connected else "failed"
+            self._connect_done.set()
+
+    async def wait_until_connected(self, timeout: Optional[float] = None) -> bool:
+        """Wait for an in-flight connect() to finish; returns True if the adapter is usable."""
+        if self.state == "connecting":
+            try:
+                await asyncio.wait_for(self._connect_done.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                return False
+        return self.is_connected
+
+    async def _connect(self):
         try:
             # 1. Initialize Public Client (Always used for streaming)
-            exchange_class = getattr(ccxtpro, self.exchange_id, None)
+            exchange_class = getattr(await load_ccxt_pro(), self.ccxt_id, None)
             if not exchange_class:
                 logger.error(f"[{self.name}] Exchange not supported by CCXT.Pro")
+                self.last_error = "unsupported exchange"
                 return
 
-            self.public_client = exchange_class({
+            public_config = {
                 'enableRateLimit': True,
-                'options': {'defaultType': self.config.get('type', 'spot')}
-            })
+                'options': {'defaultType': self.config.get('type', 'spot'), **self.config.get('options', {})}
+            }
+            public_config.update({k: self.config[k] for k in PUBLIC_PASSTHROUGH if k in self.config})
+            self.public_client = exchange_class(public_config)
             
             # 2. Initialize Private Client (If credentials provided)
             if self.use_private:
-                private_config = self.config.copy()
+                private_config = {k: v for k, v in self.config.items() if k not in ADAPTER_OPTIONS}
                 private_config['enableRateLimit'] = True
                 self.client = exchange_class(private_config)
                 logger.info(f"[{self.name}] Private API enabled")
@@ -53,77 +140,401 @@ class ExchangeAdapter:
                 self.client = self.public_client
                 logger.info(f"[{self.name}] Using Public API only")
 
-            # 3. Load Markets (Quietly and with timeout)
+            # 3. Load Markets (from local cache if fresh, otherwise quietly and with timeout)
+            if await self._load_cached_markets():
+                return
             try:
-                self.markets = await asyncio.wait_for(self.public_client.load_markets(), timeout=15)
+                self.markets = await asyncio.wait_for(
+                    self.rest('load_markets'), timeout=self.load_markets_timeout
+                )
+                self.markets_source = "exchange"
                 self.is_connected = True
                 logger.info(f"[{self.name}] Connected. Loaded {len(self.markets)} markets.")
+                self._schedule_cache(self._store_markets())
+            except asyncio.TimeoutError:
+                logger.warning(f"[{self.name}] Load markets timed out after {self.load_markets_timeout:.0f}s")
+                self.last_error = "load_markets timeout"
+                self.is_connected = False
             except Exception as e:
                 logger.warning(f"[{self.name}] Load markets failed: {e}")
+                self.last_error = str(e)
                 self.is_connected = False
             
         except Exception as e:
             logger.error(f"[{self.name}] Connection failed: {e}")
+            self.last_error = str(e)
             self.is_connected = False
 
-    async def watch_tickers(self, symbols: List[str], callback: Callable):
-        """Watch multiple tickers using public WebSocket stream."""
-        if not self.public_client or not self.is_connected:
+    async def _load_cached_markets(self) -> bool:
+        """Populate markets from the on-disk cache; refresh in the background when aging."""
+        if not self.market_cache:
+            return False
+        entry = await self.market_cache.load_async(self.exchange_id)
+        if entry is None:
+            return False
+
+        self._apply_markets(entry.markets, entry.currencies)
+        self.markets_source = "cache"
+        self.is_connected = True
+        logger.info(
+            f"[{self.name}] Connected. Loaded {len(self.markets)} markets from cache "
+            f"(age {entry.age / 60:.0f} min)."
+        )
+        if self.market_cache.needs_refresh(entry):
+            self._schedule_cache(self.refresh_markets())
+        return True
+
+    def _apply_markets(self, markets: Dict[str, Any], currencies: Optional[Dict[str, Any]] = None):
+        self.public_client.set_markets(markets, currencies)
+        if self.client is not self.public_client:
+            self.client.set_markets(markets, currencies)
+        self.markets = self.public_client.markets
+
+    def _schedule_cache(self, coro):
+        if self._cache_task and not self._cache_task.done():
+            self._cache_task.cancel()
+        self._cache_task = asyncio.create_task(coro, name=f"markets-cache-{self.name}")
+
+    async def _store_markets(self):
+        if self.market_cache and self.markets:
+            await self.market_cache.save_async(self.exchange_id, self.markets, self.public_client.currencies)
+
+    async def refresh_markets(self):
+        """Reload markets from the exchange and rewrite the cache."""
+        try:
+            markets = await asyncio.wait_for(
+                self.rest('load_markets', reload=True), timeout=self.load_markets_timeout
+            )
+        except Exception as e:
+            logger.warning(f"[{self.name}] Background market refresh failed: {e}")
             return
+        if self.client is not self.public_client:
+            self.client.set_markets(markets, self.public_client.currencies)
+        self.markets = markets
+        self.markets_source = "exchange"
+        logger.info(f"[{self.name}] Refreshed {len(markets)} markets")
+        await self._store_markets()
+
+    async def rest(self, method: str, *args, private: bool = False, **kwargs):
+        """Call a ccxt REST method, recording its latency and outcome in telemetry."""
+        client = self.client if private else self.public_client
+        started = time.perf_counter()
+        ok = False
+        try:
+            result = await getattr(client, method)(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            self.telemetry.on_rest(method, (time.perf_counter() - started) * 1000, ok)
+
+    async def watch_tickers(self, symbols: List[str], callback: Optional[Callable]):
+        """
+        Watch tickers over the public WebSocket stream, one task per subscription shard.
 
-        valid_symbols = [s for s in symbols if s in self.markets]
-        if not valid_symbols:
-            valid_symbols = symbols[:5]
-
-        # Handle exchange-specific limitations
-        if self.name.lower() == 'bybit':
-            # Bybit limits watchTickers to 10 symbols per call
-            valid_symbols = valid_symbols[:10]
-        elif self.name.lower() in ['kraken', 'mexc']:
-            # Fallback to watchTicker (singular) if watchTickers is not supported
-            logger.info(f"[{self.name}] watchTickers not supported, falling back to individual watchTicker")
-            tasks = [self._watch_single_ticker(s, callback) for s in valid_symbols[:5]]
-            await asyncio.gather(*tasks)
+        ``callback`` may be None when an ingest queue is attached and its
+        listeners consume the ticks (e.g. an ingestion worker).
+        """
+        # Exchanges still bootstrapping in the background start streaming once ready
+        if not await self.wait_until_connected() or not self.public_client:
             return
 
-        logger.info(f"[{self.name}] Starting public stream for {len(valid_symbols)} symbols")
-        
-        while True:
+        deliver = self._delivery(callback)
+        plan = plan_subscriptions(
+            self.exchange_id, symbols, self.markets,
+            supports_batch=bool(self.public_client.has.get('watchTickers')),
+        )
+        self.subscriptions = plan
+        self.telemetry.track(plan.subscribed)
+        if plan.unsupported:
+            logger.warning(f"[{self.name}] Not listed, skipping: {', '.join(plan.unsupported)}")
+        if not plan.shards:
+            logger.warning(f"[{self.name}] No tradable symbols to stream")
+            return
+
+        logger.info(
+            f"[{self.name}] Starting public stream for {len(plan.subscribed)} symbols "
+            f"in {len(plan.shards)} shard(s)"
+        )
+        tasks = [
+            asyncio.create_task(self._run_shard(shard, deliver), name=f"stream-{shard.shard_id}")
+            for shard in plan.shards
+        ]
+        if self.feed_stale_seconds > 0:
+            tasks.append(asyncio.create_task(self._watch_feed(plan.shards), name=f"feed-watchdog-{self.name}"))
+        try:
+            # Shards handle their own errors, so one failing never cancels the others
+            await asyncio.wait(tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _run_shard(self, shard: SubscriptionShard, deliver: Callable):
+        if shard.batch:
+            await self._stream_batch(shard, deliver)
+        else:
+            await self._stream_single(shard, deliver)
+
+    async def _stream_batch(self, shard: SubscriptionShard, deliver: Callable):
+        """One supervised watchTickers subscription covering the shard's symbols."""
+        async def step():
+            tickers = await self.public_client.watch_tickers(shard.symbols)
+            shard.record(len(tickers))
             try:
-                tickers = await self.public_client.watch_tickers(valid_symbols)
-                for symbol, ticker in tickers.items():
-                    await callback(ticker)
+                await deliver(tickers.values())
+            except Exception as e:
+                # A consumer bug is not a stream failure; keep the subscription
+                logger.error(f"[{self.name}] Ticker callback error for {shard.shard_id}: {e}")
+
+        await self.supervisor.run(shard.shard_id, step, on_error=shard.record_error)
+
+    async def _stream_single(self, shard: SubscriptionShard, deliver: Callable):
+        """One supervised watchTicker per symbol for exchanges without watchTickers."""
+        tasks = [
+            asyncio.create_task(self._stream_ticker(shard, symbol, deliver), name=f"stream-{self.name}-{symbol}")
+            for symbol in shard.symbols
+        ]
+        try:
+            # Each symbol retries on its own; one failing never cancels the others
+            await asyncio.wait(tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _stream_ticker(self, shard: SubscriptionShard, symbol: str, deliver: Callable):
+        async def step():
+            ticker = await self.public_client.watch_ticker(symbol)
+            shard.record(1)
+            try:
+                await deliver((ticker,))
             except Exception as e:
-                logger.error(f"[{self.name}] Stream error: {e}")
-                await asyncio.sleep(5)
+                # A consumer bug is not a stream failure; keep the subscription
+                logger.error(f"[{self.name}] Ticker callback error for {symbol}: {e}")
 
-    async def _watch_single_ticker(self, symbol: str, callback: Callable):
-        """Watch a single ticker as a fallback."""
+        await self.supervisor.run(f"{shard.shard_id}:{symbol}", step, on_error=shard.record_error)
+
+    async def _watch_feed(self, shards: List[SubscriptionShard]):
+        """
+        Resubscribe shards that stopped receiving data without raising.
+
+        A socket can stay open while the exchange silently stops sending; the
+        watch call then never errors and the last quotes go stale in the book.
+        Rejecting the stale shards' pending watches makes those streams take
+        their normal error path and subscribe again (see _reset_streams).
+        """
+        limit = self.feed_stale_seconds
         while True:
+            await asyncio.sleep(limit / 2)
+            now = time.monotonic()
+            stale = [shard for shard in shards if shard.silent_for(now) >= limit]
+            if not stale:
+                continue
+            # Still silent after an in-place resubscribe: the connection itself is suspect
+            repeated = any(
+                shard.resubscribes and (shard.last_message_at or 0.0) < shard.started_at for shard in stale
+            )
+            logger.warning(
+                f"[{self.name}] No data for {limit:g}s on {', '.join(s.shard_id for s in stale)}, resubscribing"
+            )
+            for shard in stale:
+                shard.mark_resubscribed(now)
+            live = [shard for shard in shards if shard not in stale]
+            await self._reset_streams(f"no data for {limit:g}s", stale, live, drop_shared=repeated)
+
+    def _stream_tokens(self, shards: List[SubscriptionShard]) -> List[str]:
+        """Lowercased symbols and market ids of ``shards``, as they appear in ccxt message hashes."""
+        tokens = set()
+        for shard in shards:
+            for symbol in shard.symbols:
+                tokens.add(symbol.lower())
+                market_id = (self.markets.get(symbol) or {}).get('id')
+                if market_id:
+                    tokens.add(str(market_id).lower())
+        return sorted(tokens)
+
+    async def _reset_streams(self, reason: str, stale: List[SubscriptionShard],
+                             live: List[SubscriptionShard], drop_shared: bool = False):
+        """
+        Fail the stale shards' pending watches so they subscribe again.
+
+        Streams are matched to connections through the symbols and market ids
+        in ccxt's message hashes. A connection serving only stale shards is
+        dropped, so they resubscribe on a fresh one. A connection that also
+        carries receiving streams (other shards, order books) stays open: only
+        the stale hashes are rejected and forgotten, and the next watch sends
+        its subscription again on the same socket. ``drop_shared`` drops those
+        connections too, for shards an in-place resubscribe did not revive.
+        """
+        from ccxt.base.errors import NetworkError
+        error = NetworkError(f"{self.name} stream reset: {reason}")
+        stale_tokens, live_tokens = self._stream_tokens(stale), self._stream_tokens(live)
+
+        def is_stale(message_hash) -> bool:
+            key = str(message_hash).lower()
+            return ('book' not in key and any(t in key for t in stale_tokens)
+                    and not any(t in key for t in live_tokens))
+
+        clients = getattr(self.public_client, 'clients', None) or {}
+        for url, client in list(clients.items()):
+            hashes = set(client.futures) | set(client.subscriptions)
+            stale_hashes = {h for h in hashes if is_stale(h)}
+            if not stale_hashes:
+                continue
             try:
-                ticker = await self.public_client.watch_ticker(symbol)
-                await callback(ticker)
+                if drop_shared or stale_hashes == hashes:
+                    client.reset(error)
+                    clients.pop(url, None)
+                    await client.close()
+                    continue
+                for message_hash in stale_hashes:
+                    client.subscriptions.pop(message_hash, None)
+                    if message_hash in client.futures:
+                        client.reject(error, message_hash)
             except Exception as e:
-                logger.error(f"[{self.name}] Single stream error for {symbol}: {e}")
-                await asyncio.sleep(5)
+                logger.warning(f"[{self.name}] Stream reset failed for {url}: {e}")
+
+    async def watch_order_books(self, symbols: List[str], limit: Optional[int] = None):
+        """Stream L2 order books for ``symbols`` into ``self.order_books``."""
+        if not await self.wait_until_connected() or not self.public_client:
+            return
+        if not self.public_client.has.get('watchOrderBook'):
+            logger.warning(f"[{self.name}] watchOrderBook not supported, depth estimates unavailable")
+            return
+
+        symbols = [s for s in symbols if not self.markets or s in self.markets]
+        logger.info(f"[{self.name}] Starting order book streams for {len(symbols)} symbols")
+        tasks = [
+            asyncio.create_task(self._stream_order_book(s, limit), name=f"book-{self.name}-{s}")
+            for s in symbols
+        ]
+        if not tasks:
+            return
+        try:
+            await asyncio.wait(tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _stream_order_book(self, symbol: str, limit: Optional[int]):
+        async def step():
+            order_book = await self.public_client.watch_order_book(symbol, limit)
+            self.order_books[symbol] = L2Book.from_ccxt(self.name, order_book)
+
+        await self.supervisor.run(f"book:{symbol}", step)
+
+    def subscription_status(self) -> Optional[Dict[str, Any]]:
+        """Symbol coverage and per-shard message rates, once streaming has started."""
+        return self.subscriptions.coverage() if self.subscriptions else None
+
+    def _delivery(self, callback: Callable) -> Callable:
+        """
+        Build the per-frame delivery function for a stream.
+
+        With an ingest queue attached, frames are enqueued without suspending
+        the reader and ``callback`` runs from the queue's drain task instead.
+        """
+        taps = self.tick_taps
+        on_frame = self.telemetry.on_frame
+        if self.ingest is None:
+            async def deliver(tickers):
+                on_frame(tickers)
+                for tap in taps:
+                    tap(self.name, tickers)
+                for ticker in tickers:
+                    await callback(ticker)
+            return deliver
+
+        ingest = self.ingest
+        ingest.register(self.name, callback)
+
+        async def deliver(tickers):
+            received_ns = time.perf_counter_ns()
+            on_frame(tickers)
+            for tap in taps:
+                tap(self.name, tickers)
+            ingest.publish(self.name, tickers, received_ns)
+        return deliver
 
     async def close(self):
+        if self._cache_task and not self._cache_task.done():
+            self._cache_task.cancel()
         if self.public_client:
             await self.public_client.close()
         if self.client and self.client != self.public_client:
             await self.client.close()
 
+    def startup_status(self) -> Dict[str, Any]:
+        """Connection state and bootstrap timing for status reporting."""
+        return {
+            "state": self.state,
+            "connect_ms": round(self.connect_time_ms, 1) if self.connect_time_ms is not None else None,
+            "markets": len(self.markets),
+            "markets_source": self.markets_source,
+            "error": self.last_error,
+        }
+
 class ExchangeManager:
-    def __init__(self):
+    def __init__(self, market_cache: Optional[MarketCache] = None, ingest: Optional[TickIngestQueue] = None,
+                 stream_policy: Optional[StreamPolicy] = None):
         self.adapters: Dict[str, ExchangeAdapter] = {}
+        self.market_cache = market_cache
+        self.ingest = ingest
+        self.stream_policy = stream_policy
+        self.tick_taps: List[Callable[[str, List[dict]], None]] = []
+        self._connect_tasks: Dict[str, asyncio.Task] = {}
 
     def add_exchange(self, name: str, config: Dict[str, Any]):
-        adapter = ExchangeAdapter(name, config)
+        adapter = ExchangeAdapter(name, config, market_cache=self.market_cache, ingest=self.ingest,
+                                  tick_taps=self.tick_taps, stream_policy=self.stream_policy)
         self.adapters[name] = adapter
 
-    async def initialize_all(self):
-        for adapter in self.adapters.values():
-            await adapter.connect()
+    def add_tick_tap(self, tap: Callable[[str, List[dict]], None]):
+        """Register ``tap(exchange, tickers)`` on every adapter's raw ticker stream."""
+        self.tick_taps.append(tap)
+
+    async def initialize_all(self, wait_timeout: Optional[float] = None) -> List[str]:
+        """
+        Connect all adapters concurrently.
+
+        Waits at most ``wait_timeout`` seconds (``None`` = until every adapter
+        has finished) and returns the names of adapters that are ready. Slower
+        exchanges keep connecting in the background; their streams start as
+        soon as they become ready.
+        """
+        for name, adapter in self.adapters.items():
+            task = self._connect_tasks.get(name)
+            if task is None or task.done():
+                adapter.state = "connecting"
+                self._connect_tasks[name] = asyncio.create_task(
+                    adapter.connect(), name=f"connect-{name}"
+                )
+
+        pending = [t for t in self._connect_tasks.values() if not t.done()]
+        if pending:
+            await asyncio.wait(pending, timeout=wait_timeout)
+
+        ready = [name for name, a in self.adapters.items() if a.is_connected]
+        still_connecting = [name for name, a in self.adapters.items() if a.state == "connecting"]
+        for name, adapter in self.adapters.items():
+            status = adapter.startup_status()
+            if status["connect_ms"] is not None:
+                logger.info(f"[{name}] Startup {status['state']} in {status['connect_ms']:.0f} ms")
+        logger.info(
+            f"Exchange bootstrap: {len(ready)}/{len(self.adapters)} ready"
+            + (f", still connecting: {', '.join(still_connecting)}" if still_connecting else "")
+        )
+        return ready
+
+    def startup_report(self) -> Dict[str, Dict[str, Any]]:
+        """Per-exchange readiness and connect time."""
+        return {name: a.startup_status() for name, a in self.adapters.items()}
+
+    def telemetry_report(self) -> Dict[str, Dict[str, Any]]:
+        """Per-exchange feed latency, rates, reconnects, errors, quote ages and REST latency."""
+        return {name: a.telemetry.summary() for name, a in self.adapters.items()}
+
+    def subscription_report(self) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Per-exchange symbol coverage and shard message rates."""
+        return {name: a.subscription_status() for name, a in self.adapters.items()}
 
     def get_adapter(self, name: str) -> Optional[ExchangeAdapter]:
         return self.adapters.get(name)
@@ -132,5 +543,8 @@ class ExchangeManager:
         return self.adapters
 
     async def close_all(self):
+        for task in self._connect_tasks.values():
+            if not task.done():
+                task.cancel()
         tasks = [adapter.close() for adapter in self.adapters.values()]
         await asyncio.gather(*tasks)
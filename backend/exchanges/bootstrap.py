@@ -0,0 +1,40 @@
+"""
+Exchange adapter configuration from Settings.
+
+Shared by the engine and the ingestion workers so every process builds the
+same clients (keys, timeouts, mock routing) and stream policy.
+"""
+
+from typing import Any, Dict
+
+from backend.core.config import Settings
+from backend.exchanges.supervisor import StreamPolicy
+
+
+def exchange_config(name: str, settings: Settings) -> Dict[str, Any]:
+    """ccxt config plus adapter options (see ADAPTER_OPTIONS) for one enabled exchange."""
+    name_lower = name.lower()
+    config = {
+        'apiKey': getattr(settings, f"{name_lower}_api_key", ""),
+        'secret': getattr(settings, f"{name_lower}_api_secret", ""),
+        'load_markets_timeout': settings.exchange_connect_timeout,
+        'feed_stale_seconds': settings.feed_stale_seconds,
+    }
+    # Add passphrase if available (for OKX/KuCoin)
+    passphrase = getattr(settings, f"{name_lower}_passphrase", None)
+    if passphrase:
+        config['password'] = passphrase
+    if settings.mock_exchange_url:
+        # Offline/load testing: every venue is served by backend.exchanges.mock_server (aiohttp, imported only here)
+        from backend.exchanges.mock_server import mock_overrides
+        config.update(mock_overrides(settings.mock_exchange_url, name_lower))
+    return config
+
+
+def stream_policy(settings: Settings) -> StreamPolicy:
+    return StreamPolicy(
+        base_delay=settings.ws_reconnect_delay,
+        max_delay=settings.ws_reconnect_max_delay,
+        max_retries=settings.ws_max_retries,
+        cooldown=settings.ws_circuit_cooldown,
+    )
@@ -0,0 +1,136 @@
+"""
+On-disk market metadata cache for Quantum Arbitrage Engine.
+
+Stores the result of ``load_markets()`` per exchange so restarts can skip the
+market download. Files live under ``data/market_cache/<exchange_id>.bin`` and
+consist of a fixed header (magic, format version, save time) followed by
+zlib-compressed MessagePack of the markets and currencies. ccxt markets are
+plain dicts and lists, and unlike pickle, decoding a tampered file cannot run
+code in a process that holds API keys.
+"""
+
+import asyncio
+import importlib.metadata
+import logging
+import os
+import struct
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import msgpack
+
+logger = logging.getLogger(__name__)
+
+CACHE_MAGIC = b"QAEMKT"
+CACHE_VERSION = 2  # 1 was pickle; such files are ignored, never decoded
+_HEADER = struct.Struct("<6sHd")  # magic, version, saved_at (unix seconds)
+
+
+def _ccxt_version() -> str:
+    try:
+        return importlib.metadata.version("ccxt")
+    except importlib.metadata.PackageNotFoundError:
+        return ""
+
+
+@dataclass
+class CachedMarkets:
+    """Markets loaded from the cache together with their age."""
+    exchange_id: str
+    markets: Dict[str, Any]
+    currencies: Optional[Dict[str, Any]]
+    saved_at: float
+
+    @property
+    def age(self) -> float:
+        return max(0.0, time.time() - self.saved_at)
+
+
+class MarketCache:
+    """Versioned, TTL-bounded binary cache of exchange market definitions."""
+
+    def __init__(self, directory: str = "./data/market_cache", ttl: float = 86400.0,
+                 refresh_after: float = 3600.0, library_version: str = ""):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.refresh_after = refresh_after
+        # Market structures depend on the ccxt version that produced them
+        self.library_version = library_version or _ccxt_version()
+
+    def path_for(self, exchange_id: str) -> Path:
+        return self.directory / f"{exchange_id}.bin"
+
+    def load(self, exchange_id: str) -> Optional[CachedMarkets]:
+        """Read a cache entry; returns None when missing, corrupt, stale or from another version."""
+        path = self.path_for(exchange_id)
+        try:
+            raw = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"[{exchange_id}] Market cache unreadable: {e}")
+            return None
+
+        if len(raw) < _HEADER.size:
+            return None
+        magic, version, saved_at = _HEADER.unpack_from(raw)
+        if magic != CACHE_MAGIC or version != CACHE_VERSION:
+            logger.info(f"[{exchange_id}] Ignoring market cache with incompatible format")
+            return None
+        if time.time() - saved_at > self.ttl:
+            logger.info(f"[{exchange_id}] Market cache expired")
+            return None
+
+        try:
+            payload = msgpack.unpackb(zlib.decompress(raw[_HEADER.size:]), raw=False, strict_map_key=False)
+        except Exception as e:
+            logger.warning(f"[{exchange_id}] Market cache corrupt, ignoring: {e}")
+            return None
+        if not isinstance(payload, dict):
+            return None
+        if payload.get("exchange_id") != exchange_id or payload.get("library_version") != self.library_version:
+            return None
+
+        return CachedMarkets(
+            exchange_id=exchange_id,
+            markets=payload["markets"],
+            currencies=payload.get("currencies"),
+            saved_at=saved_at,
+        )
+
+    def save(self, exchange_id: str, markets: Dict[str, Any],
+             currencies: Optional[Dict[str, Any]] = None) -> Path:
+        """Atomically write a cache entry for an exchange."""
+        payload = {
+            "exchange_id": exchange_id,
+            "library_version": self.library_version,
+            "markets": markets,
+            "currencies": currencies,
+        }
+        body = zlib.compress(msgpack.packb(payload, use_bin_type=True), 6)
+        header = _HEADER.pack(CACHE_MAGIC, CACHE_VERSION, time.time())
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(exchange_id)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(header)
+            f.write(body)
+        os.replace(tmp, path)
+        return path
+
+    async def load_async(self, exchange_id: str) -> Optional[CachedMarkets]:
+        return await asyncio.to_thread(self.load, exchange_id)
+
+    async def save_async(self, exchange_id: str, markets: Dict[str, Any],
+                         currencies: Optional[Dict[str, Any]] = None):
+        try:
+            await asyncio.to_thread(self.save, exchange_id, markets, currencies)
+        except Exception as e:
+            logger.warning(f"[{exchange_id}] Failed to write market cache: {e}")
+
+    def needs_refresh(self, entry: CachedMarkets) -> bool:
+        return entry.age >= self.refresh_after
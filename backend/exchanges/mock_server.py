@@ -0,0 +1,355 @@
+"""
+Local mock exchange for Quantum Arbitrage Engine.
+
+Speaks enough of the Binance spot REST and WebSocket protocol for the
+unmodified ccxt.pro ``binance`` client, and so ``ExchangeAdapter.connect``,
+``watch_tickers`` and ``watch_order_books``, to run against it. Several
+venues can be served from one process under ``/v/<venue>/``. Each venue
+quotes the same random-walk mid prices with its own noise, so cross-venue
+spreads (and opportunities) appear.
+
+REST:  GET /v/<venue>/api/v3/exchangeInfo, /ticker/24hr, /ticker/bookTicker, /depth, /time, /ping
+WS:    /v/<venue>/stream/ws/<n>  SUBSCRIBE to ``!ticker@arr``, ``<id>@ticker`` or ``<id>@depth``
+
+Load shape (tick rate, symbol count, jitter, disconnects) is set per server:
+
+    python -m backend.exchanges.mock_server --port 8765 --symbols 200 --rate 50 --jitter-ms 5 --disconnect-every 60
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Set
+
+from aiohttp import WSMsgType, web
+
+logger = logging.getLogger(__name__)
+
+QUOTES = ("USDT", "BTC")
+BASE_PRICES = {"BTC": 60000.0, "ETH": 3000.0, "SOL": 150.0, "XRP": 0.6, "ADA": 0.45, "DOGE": 0.15}
+
+
+def mock_overrides(base_url: str, venue: str) -> Dict[str, Any]:
+    """
+    ccxt ``binance`` config entries pointing a client at one mock venue.
+
+    The WebSocket URL contains ``/stream`` because ccxt.pro uses that to tell
+    spot ticker streams from contract ones.
+    """
+    http = f"{base_url.rstrip('/')}/v/{venue}"
+    ws = http.replace("http://", "ws://").replace("https://", "wss://") + "/stream/ws"
+    return {
+        "ccxt_id": "binance",
+        "urls": {"api": {
+            "public": f"{http}/api/v3",
+            "private": f"{http}/api/v3",
+            "v1": f"{http}/api/v1",
+            "sapi": f"{http}/sapi/v1",
+            "fapiPublic": f"{http}/fapi/v1",
+            "dapiPublic": f"{http}/dapi/v1",
+            "ws": {"spot": ws, "margin": ws, "future": ws, "delivery": ws},
+        }},
+        "options": {"fetchMarkets": ["spot"], "fetchCurrencies": False},
+    }
+
+
+class _Market:
+    __slots__ = ("symbol", "id", "base", "quote", "mid", "step")
+
+    def __init__(self, base: str, quote: str, mid: float):
+        self.base = base
+        self.quote = quote
+        self.symbol = f"{base}/{quote}"
+        self.id = f"{base}{quote}"
+        self.mid = mid
+        self.step = mid * 0.0001  # fixed 1 bp price grid for book levels
+
+    def price(self, k: int) -> str:
+        return f"{k * self.step:.12g}"
+
+
+class MockExchangeServer:
+    """Synthetic multi-venue Binance-compatible market data server."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, symbols: int = 50,
+                 rate: float = 10.0, jitter_ms: float = 0.0, disconnect_every: Optional[float] = None,
+                 spread_bps: float = 2.0, venue_noise_bps: float = 15.0, depth_levels: int = 20,
+                 seed: int = 7):
+        self.host = host
+        self.port = port
+        self.rate = rate  # ticker updates per symbol per second
+        self.jitter_ms = jitter_ms
+        self.disconnect_every = disconnect_every  # mean seconds between forced disconnects
+        self.spread = spread_bps / 10_000
+        self.venue_noise = venue_noise_bps / 10_000
+        self.depth_levels = depth_levels
+        self.rng = random.Random(seed)
+        self.markets = self._make_markets(symbols)
+        self.by_id = {m.id: m for m in self.markets}
+
+        self._book_seq = 0
+        self.connections = 0
+        self.messages_sent = 0
+        self.disconnects = 0
+        self._runner: Optional[web.AppRunner] = None
+        self._walker: Optional[asyncio.Task] = None
+
+    def _make_markets(self, count: int) -> List[_Market]:
+        markets = []
+        bases = list(BASE_PRICES) + [f"C{i:03d}" for i in range(max(0, count))]
+        for base in bases:
+            for quote in QUOTES:
+                if len(markets) >= count or base == quote:
+                    continue
+                usd = BASE_PRICES.get(base, self.rng.uniform(0.05, 500))
+                mid = usd if quote == "USDT" else usd / BASE_PRICES["BTC"]
+                markets.append(_Market(base, quote, mid))
+        return markets
+
+    # --- Prices ---
+
+    async def _walk(self):
+        """Move every mid a little, ``rate`` times a second."""
+        interval = 1.0 / max(self.rate, 0.1)
+        while True:
+            for m in self.markets:
+                m.mid *= 1.0 + self.rng.gauss(0.0, 0.0004)
+            await asyncio.sleep(interval)
+
+    def _quote(self, venue: str, m: _Market):
+        # Stable per-venue offset plus fresh noise, so venues disagree a little
+        offset = (zlib.crc32(f"{venue}:{m.id}".encode()) % 2001 - 1000) / 1000 * self.venue_noise
+        mid = m.mid * (1.0 + offset + self.rng.gauss(0.0, self.venue_noise / 3))
+        return mid * (1.0 - self.spread / 2), mid * (1.0 + self.spread / 2)
+
+    def _ticker(self, venue: str, m: _Market, now_ms: int) -> Dict[str, Any]:
+        bid, ask = self._quote(venue, m)
+        last = (bid + ask) / 2
+        return {
+            "e": "24hrTicker", "E": now_ms, "s": m.id,
+            "p": "0", "P": "0", "w": f"{last:.8f}", "x": f"{last:.8f}",
+            "c": f"{last:.8f}", "Q": "1",
+            "b": f"{bid:.8f}", "B": f"{self.rng.uniform(0.1, 10):.4f}",
+            "a": f"{ask:.8f}", "A": f"{self.rng.uniform(0.1, 10):.4f}",
+            "o": f"{last:.8f}", "h": f"{last * 1.01:.8f}", "l": f"{last * 0.99:.8f}",
+            "v": "1000", "q": f"{last * 1000:.2f}",
+            "O": now_ms - 86_400_000, "C": now_ms, "F": 0, "L": 1, "n": 1,
+        }
+
+    def _depth(self, venue: str, m: _Market, clear: int = 0) -> Dict[str, Any]:
+        """
+        Book levels on the market's price grid.
+
+        With ``clear`` > 0 the result is a self-contained delta: it also zeroes
+        ``clear`` grid levels on either side of the live ones, which removes
+        whatever the previous update left behind as the price moves.
+        """
+        bid, ask = self._quote(venue, m)
+        top_bid = math.floor(bid / m.step)
+        top_ask = max(math.ceil(ask / m.step), top_bid + 1)
+        n = self.depth_levels
+
+        def side(top: int, direction: int) -> List[List[str]]:
+            levels = [[m.price(top + direction * i), f"{self.rng.uniform(0.1, 5):.4f}"] for i in range(n)]
+            if clear:
+                levels += [[m.price(top + direction * i), "0"] for i in range(n, n + clear)]
+                levels += [[m.price(top - direction * i), "0"] for i in range(1, clear + 1)]
+            return levels
+
+        self._book_seq += 1
+        return {"seq": self._book_seq, "bids": side(top_bid, -1), "asks": side(top_ask, 1)}
+
+    # --- REST ---
+
+    async def exchange_info(self, request: web.Request) -> web.Response:
+        if not request.path.endswith("/api/v3/exchangeInfo"):
+            return web.json_response({"timezone": "UTC", "serverTime": int(time.time() * 1000), "symbols": []})
+        symbols = []
+        for m in self.markets:
+            symbols.append({
+                "symbol": m.id, "status": "TRADING", "baseAsset": m.base, "quoteAsset": m.quote,
+                "baseAssetPrecision": 8, "quotePrecision": 8, "quoteAssetPrecision": 8,
+                "orderTypes": ["LIMIT", "MARKET"], "isSpotTradingAllowed": True,
+                "isMarginTradingAllowed": False, "permissions": ["SPOT"],
+                "filters": [
+                    {"filterType": "PRICE_FILTER", "minPrice": "0.00000001", "maxPrice": "1000000", "tickSize": "0.00000001"},
+                    {"filterType": "LOT_SIZE", "minQty": "0.00001", "maxQty": "900000", "stepSize": "0.00001"},
+                    {"filterType": "NOTIONAL", "minNotional": "5"},
+                ],
+            })
+        return web.json_response({"timezone": "UTC", "serverTime": int(time.time() * 1000), "symbols": symbols})
+
+    async def tickers(self, request: web.Request) -> web.Response:
+        venue = request.match_info["venue"]
+        now_ms = int(time.time() * 1000)
+        wanted = request.query.get("symbol")
+        markets = [self.by_id[wanted]] if wanted in self.by_id else self.markets
+        data = [self._ticker(venue, m, now_ms) for m in markets]
+        rest = [{
+            "symbol": t["s"], "bidPrice": t["b"], "bidQty": t["B"], "askPrice": t["a"], "askQty": t["A"],
+            "lastPrice": t["c"], "openPrice": t["o"], "highPrice": t["h"], "lowPrice": t["l"],
+            "volume": t["v"], "quoteVolume": t["q"], "openTime": t["O"], "closeTime": t["C"],
+        } for t in data]
+        return web.json_response(rest[0] if wanted in self.by_id else rest)
+
+    async def depth(self, request: web.Request) -> web.Response:
+        m = self.by_id.get(request.query.get("symbol", ""))
+        if m is None:
+            return web.json_response({"code": -1121, "msg": "Invalid symbol."}, status=400)
+        book = self._depth(request.match_info["venue"], m)
+        return web.json_response({"lastUpdateId": book["seq"], "bids": book["bids"], "asks": book["asks"]})
+
+    async def server_time(self, request: web.Request) -> web.Response:
+        return web.json_response({"serverTime": int(time.time() * 1000)})
+
+    async def ping(self, request: web.Request) -> web.Response:
+        return web.json_response({})
+
+    # --- WebSocket ---
+
+    async def stream(self, request: web.Request) -> web.WebSocketResponse:
+        venue = request.match_info["venue"]
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        self.connections += 1
+        all_tickers = False
+        tickers: Set[str] = set()
+        books: Set[str] = set()
+        sender = asyncio.create_task(self._send_loop(ws, venue, lambda: all_tickers, tickers, books))
+        drop_after = self.rng.expovariate(1.0 / self.disconnect_every) if self.disconnect_every else None
+        dropper = asyncio.create_task(self._drop_later(ws, drop_after)) if drop_after else None
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                request_msg = json.loads(msg.data)
+                if request_msg.get("method") == "SUBSCRIBE":
+                    for param in request_msg.get("params", []):
+                        name, _, stream = param.partition("@")
+                        if param == "!ticker@arr":
+                            all_tickers = True
+                        elif stream == "ticker":
+                            tickers.add(name.upper())
+                        elif stream.startswith("depth"):
+                            books.add(name.upper())
+                    await ws.send_str(json.dumps({"result": None, "id": request_msg.get("id")}))
+        finally:
+            sender.cancel()
+            if dropper:
+                dropper.cancel()
+            self.connections -= 1
+        return ws
+
+    async def _drop_later(self, ws: web.WebSocketResponse, delay: float):
+        await asyncio.sleep(delay)
+        self.disconnects += 1
+        await ws.close(code=1011, message=b"mock disconnect")
+
+    async def _send_loop(self, ws: web.WebSocketResponse, venue: str, all_tickers, tickers: Set[str],
+                         books: Set[str]):
+        interval = 1.0 / max(self.rate, 0.1)
+        book_ids: Dict[str, int] = {}
+        while not ws.closed:
+            if self.jitter_ms:
+                await asyncio.sleep(self.rng.uniform(0, self.jitter_ms) / 1000)
+            now_ms = int(time.time() * 1000)
+            frames = []
+            if all_tickers():
+                frames.append([self._ticker(venue, m, now_ms) for m in self.markets])
+            for market_id in list(tickers):
+                if market_id in self.by_id:
+                    frames.append(self._ticker(venue, self.by_id[market_id], now_ms))
+            for market_id in list(books):
+                if market_id in self.by_id:
+                    # Diff-depth event; U..u spans everything since this connection's last one
+                    book = self._depth(venue, self.by_id[market_id], clear=self.depth_levels)
+                    frames.append({"e": "depthUpdate", "E": now_ms, "s": market_id,
+                                   "U": book_ids.get(market_id, 0) + 1, "u": book["seq"],
+                                   "b": book["bids"], "a": book["asks"]})
+                    book_ids[market_id] = book["seq"]
+            try:
+                for frame in frames:
+                    await ws.send_str(json.dumps(frame))
+                    self.messages_sent += 1
+            except (ConnectionResetError, RuntimeError):
+                return
+            await asyncio.sleep(interval)
+
+    # --- Lifecycle ---
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        prefix = "/v/{venue}"
+        app.router.add_get(prefix + "/api/v3/exchangeInfo", self.exchange_info)
+        app.router.add_get(prefix + "/fapi/v1/exchangeInfo", self.exchange_info)
+        app.router.add_get(prefix + "/dapi/v1/exchangeInfo", self.exchange_info)
+        app.router.add_get(prefix + "/api/v3/ticker/24hr", self.tickers)
+        app.router.add_get(prefix + "/api/v3/ticker/bookTicker", self.tickers)
+        app.router.add_get(prefix + "/api/v3/depth", self.depth)
+        app.router.add_get(prefix + "/api/v3/time", self.server_time)
+        app.router.add_get(prefix + "/api/v3/ping", self.ping)
+        app.router.add_get(prefix + "/stream/ws/{stream}", self.stream)
+        app.router.add_get(prefix + "/stream/ws", self.stream)
+        return app
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self._walker = asyncio.create_task(self._walk())
+        logger.info(f"Mock exchange on {self.url} ({len(self.markets)} markets, {self.rate}/s per symbol)")
+
+    async def stop(self):
+        if self._walker:
+            self._walker.cancel()
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"connections": self.connections, "messages_sent": self.messages_sent,
+                "disconnects": self.disconnects, "markets": len(self.markets)}
+
+
+async def _serve(args):
+    server = MockExchangeServer(args.host, args.port, symbols=args.symbols, rate=args.rate,
+                                jitter_ms=args.jitter_ms, disconnect_every=args.disconnect_every,
+                                venue_noise_bps=args.venue_noise_bps, seed=args.seed)
+    await server.start()
+    try:
+        while True:
+            await asyncio.sleep(10)
+            logger.info(f"Mock exchange: {server.stats()}")
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Binance-compatible mock exchange.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--symbols", type=int, default=50, help="number of markets")
+    parser.add_argument("--rate", type=float, default=10.0, help="ticker updates per symbol per second")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="random delay added before each send")
+    parser.add_argument("--disconnect-every", type=float, help="mean seconds between forced disconnects")
+    parser.add_argument("--venue-noise-bps", type=float, default=15.0, help="price disagreement between venues")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
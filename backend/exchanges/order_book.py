@@ -0,0 +1,145 @@
+"""
+Compact L2 order books for Quantum Arbitrage Engine.
+
+Each side is a pair of sorted NumPy arrays (best price first) with cached
+cumulative base and quote depth, so filling an order of a given size is a
+binary search over the cumulative arrays instead of a level-by-level walk.
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+
+class BookSide:
+    """One side of an L2 book, best level first."""
+
+    __slots__ = ("prices", "sizes", "is_bid", "_cum_base", "_cum_quote")
+
+    def __init__(self, prices: np.ndarray, sizes: np.ndarray, is_bid: bool):
+        self.prices = prices
+        self.sizes = sizes
+        self.is_bid = is_bid
+        self._cum_base: Optional[np.ndarray] = None
+        self._cum_quote: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_levels(cls, levels, is_bid: bool) -> "BookSide":
+        """Build from ccxt ``[[price, amount], ...]`` levels (already best-first)."""
+        if len(levels):
+            arr = np.asarray([lvl[:2] for lvl in levels], dtype=np.float64)
+            prices, sizes = arr[:, 0].copy(), arr[:, 1].copy()
+        else:
+            prices = sizes = np.empty(0)
+        return cls(prices, sizes, is_bid)
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    @property
+    def best(self) -> Optional[float]:
+        return float(self.prices[0]) if len(self.prices) else None
+
+    def _cumulative(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._cum_base is None:
+            self._cum_base = np.cumsum(self.sizes)
+            self._cum_quote = np.cumsum(self.prices * self.sizes)
+        return self._cum_base, self._cum_quote
+
+    def _levels_within(self, limit_price: Optional[float]) -> int:
+        """Number of levels priced no worse than ``limit_price``."""
+        if limit_price is None:
+            return len(self.prices)
+        if self.is_bid:
+            # Bids descend: count prices >= limit
+            return int(np.searchsorted(-self.prices, -limit_price, side="right"))
+        return int(np.searchsorted(self.prices, limit_price, side="right"))
+
+    def _fill(self, cum: np.ndarray, target: float, n: int) -> Tuple[float, float]:
+        """Fill ``target`` of the cumulative measure within the first n levels -> (base, quote)."""
+        cum_base, cum_quote = self._cumulative()
+        if n == 0 or target <= 0:
+            return 0.0, 0.0
+        i = int(np.searchsorted(cum[:n], target, side="left"))
+        if i >= n:
+            return float(cum_base[n - 1]), float(cum_quote[n - 1])
+        prev_base = float(cum_base[i - 1]) if i else 0.0
+        prev_quote = float(cum_quote[i - 1]) if i else 0.0
+        price = float(self.prices[i])
+        if cum is cum_quote:
+            partial_quote = target - prev_quote
+            return prev_base + partial_quote / price, target
+        partial_base = target - prev_base
+        return target, prev_quote + partial_base * price
+
+    def fill_quote(self, notional: float, limit_price: Optional[float] = None) -> Tuple[float, float]:
+        """Spend up to ``notional`` quote currency -> (base filled, quote used)."""
+        return self._fill(self._cumulative()[1], notional, self._levels_within(limit_price))
+
+    def fill_base(self, amount: float, limit_price: Optional[float] = None) -> Tuple[float, float]:
+        """Trade up to ``amount`` base currency -> (base filled, quote value)."""
+        return self._fill(self._cumulative()[0], amount, self._levels_within(limit_price))
+
+
+class L2Book:
+    """Bids and asks for one symbol on one exchange."""
+
+    __slots__ = ("exchange", "symbol", "bids", "asks", "timestamp", "nonce")
+
+    def __init__(self, exchange: str, symbol: str, bids: BookSide, asks: BookSide,
+                 timestamp: Optional[float] = None, nonce: Optional[int] = None):
+        self.exchange = exchange
+        self.symbol = symbol
+        self.bids = bids
+        self.asks = asks
+        self.timestamp = timestamp
+        self.nonce = nonce
+
+    @classmethod
+    def from_ccxt(cls, exchange: str, order_book: Dict[str, Any]) -> "L2Book":
+        return cls(
+            exchange,
+            order_book.get("symbol"),
+            BookSide.from_levels(order_book.get("bids") or [], is_bid=True),
+            BookSide.from_levels(order_book.get("asks") or [], is_bid=False),
+            order_book.get("timestamp"),
+            order_book.get("nonce"),
+        )
+
+
+def estimate_fill(buy_book: L2Book, sell_book: L2Book, trade_size_usd: float,
+                  buy_fee: float = 0.001, sell_fee: float = 0.001,
+                  max_slippage_pct: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    Depth-aware profit for buying on ``buy_book`` and selling on ``sell_book``.
+
+    Only levels within ``max_slippage_pct`` of the touch are used. The fillable
+    size is the smaller of what ``trade_size_usd`` buys and what the sell side
+    can absorb within its band.
+    """
+    best_ask, best_bid = buy_book.asks.best, sell_book.bids.best
+    if best_ask is None or best_bid is None:
+        return None
+    ask_limit = bid_limit = None
+    if max_slippage_pct is not None:
+        ask_limit = best_ask * (1 + max_slippage_pct / 100.0)
+        bid_limit = best_bid * (1 - max_slippage_pct / 100.0)
+
+    base, _ = buy_book.asks.fill_quote(trade_size_usd, ask_limit)
+    sellable, _ = sell_book.bids.fill_base(base, bid_limit)
+    base = min(base, sellable)
+    if base <= 0:
+        return None
+    _, cost = buy_book.asks.fill_base(base, ask_limit)
+    _, proceeds = sell_book.bids.fill_base(base, bid_limit)
+
+    net = proceeds * (1 - sell_fee) - cost * (1 + buy_fee)
+    return {
+        "fillable_base": base,
+        "fillable_usd": cost,
+        "buy_vwap": cost / base,
+        "sell_vwap": proceeds / base,
+        "vwap_net_profit_usd": net,
+        "vwap_net_profit_pct": net / cost * 100.0 if cost else 0.0,
+        "depth_limited": cost < trade_size_usd * 0.999,
+    }
@@ -0,0 +1,136 @@
+"""
+Ticker subscription planning for Quantum Arbitrage Engine.
+
+Splits a symbol universe into shards that respect each exchange's streaming
+limits (e.g. Bybit accepts at most 10 symbols per watchTickers call; Kraken and
+MEXC only support watchTicker per symbol). Every shard runs as its own stream
+task and keeps message counters for coverage and rate reporting.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class StreamLimits:
+    """Per-exchange streaming constraints."""
+    max_symbols: int  # symbols per shard
+    batch: bool = True  # watchTickers supported (False = one watchTicker per symbol)
+
+
+# Exchanges not listed here use DEFAULT_LIMITS
+STREAM_LIMITS: Dict[str, StreamLimits] = {
+    "bybit": StreamLimits(max_symbols=10),
+    "kraken": StreamLimits(max_symbols=5, batch=False),
+    "mexc": StreamLimits(max_symbols=5, batch=False),
+}
+DEFAULT_LIMITS = StreamLimits(max_symbols=100)
+
+RATE_ALPHA = 0.3  # EWMA weight of the latest one-second window
+
+
+@dataclass
+class SubscriptionShard:
+    """One stream task's slice of the symbol universe."""
+    shard_id: str
+    symbols: List[str]
+    batch: bool
+    messages: int = 0
+    errors: int = 0
+    resubscribes: int = 0  # forced by the stale-feed watchdog
+    last_message_at: Optional[float] = None
+    rate: float = 0.0  # messages/second (EWMA)
+    started_at: float = field(default_factory=time.monotonic, repr=False)  # or last resubscribe
+    _window_start: float = field(default_factory=time.monotonic, repr=False)
+    _window_count: int = field(default=0, repr=False)
+
+    def record(self, count: int = 1):
+        now = time.monotonic()
+        self.messages += count
+        self.last_message_at = now
+        self._window_count += count
+        elapsed = now - self._window_start
+        if elapsed >= 1.0:
+            self.rate = RATE_ALPHA * (self._window_count / elapsed) + (1 - RATE_ALPHA) * self.rate
+            self._window_start = now
+            self._window_count = 0
+
+    def record_error(self, error: Optional[Exception] = None):
+        self.errors += 1
+
+    def silent_for(self, now: Optional[float] = None) -> float:
+        """Seconds since the last message, or since the (re)subscription if none arrived since."""
+        now = time.monotonic() if now is None else now
+        return now - max(self.last_message_at or 0.0, self.started_at)
+
+    def mark_resubscribed(self, now: Optional[float] = None):
+        self.resubscribes += 1
+        self.started_at = time.monotonic() if now is None else now
+
+    def status(self) -> Dict[str, Any]:
+        age = time.monotonic() - self.last_message_at if self.last_message_at is not None else None
+        return {
+            "shard": self.shard_id,
+            "mode": "watchTickers" if self.batch else "watchTicker",
+            "symbols": list(self.symbols),
+            "messages": self.messages,
+            "errors": self.errors,
+            "resubscribes": self.resubscribes,
+            "rate_per_sec": round(self.rate, 2),
+            "last_message_age_sec": round(age, 2) if age is not None else None,
+        }
+
+
+@dataclass
+class SubscriptionPlan:
+    """Shards covering an exchange's requested symbols."""
+    exchange: str
+    requested: List[str]
+    shards: List[SubscriptionShard]
+    unsupported: List[str]
+
+    @property
+    def subscribed(self) -> List[str]:
+        return [s for shard in self.shards for s in shard.symbols]
+
+    def coverage(self) -> Dict[str, Any]:
+        subscribed = len(self.subscribed)
+        return {
+            "requested": len(self.requested),
+            "subscribed": subscribed,
+            "coverage_pct": round(100.0 * subscribed / len(self.requested), 1) if self.requested else 0.0,
+            "unsupported": list(self.unsupported),
+            "shards": [shard.status() for shard in self.shards],
+        }
+
+
+def limits_for(exchange_id: str) -> StreamLimits:
+    return STREAM_LIMITS.get(exchange_id.lower(), DEFAULT_LIMITS)
+
+
+def plan_subscriptions(exchange_id: str, symbols: List[str], markets: Dict[str, Any],
+                       supports_batch: bool = True) -> SubscriptionPlan:
+    """
+    Split ``symbols`` into shards that fit the exchange's limits.
+
+    Symbols missing from ``markets`` are reported as unsupported rather than
+    subscribed. When markets are not loaded at all, every symbol is kept.
+    """
+    limits = limits_for(exchange_id)
+    batch = limits.batch and supports_batch
+
+    seen = set()
+    requested = [s for s in symbols if not (s in seen or seen.add(s))]
+    if markets:
+        valid = [s for s in requested if s in markets]
+        unsupported = [s for s in requested if s not in markets]
+    else:
+        valid, unsupported = requested, []
+
+    size = max(1, limits.max_symbols)
+    shards = [
+        SubscriptionShard(shard_id=f"{exchange_id}#{i // size}", symbols=valid[i:i + size], batch=batch)
+        for i in range(0, len(valid), size)
+    ]
+    return SubscriptionPlan(exchange=exchange_id, requested=requested, shards=shards, unsupported=unsupported)
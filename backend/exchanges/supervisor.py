@@ -0,0 +1,199 @@
+"""
+Stream supervision for Quantum Arbitrage Engine.
+
+Every subscription (a ticker shard, a single-symbol ticker, an order book)
+runs in its own supervised loop. A failure is retried after an exponential
+backoff with jitter that belongs to that subscription alone, and the loop
+resumes the same subscription with its counters intact.
+
+Per exchange, a circuit breaker counts retries that fail again. After
+``max_retries`` of them, with no data arriving in between, the venue counts
+as down. The breaker then opens and every stream of that exchange parks on a
+single event for ``cooldown`` seconds instead of reconnecting on its own
+timer. Once the cooldown ends, one stream probes the venue. If the probe gets
+data, the breaker closes and the others resubscribe spread over one base
+delay. If it fails, the breaker opens again.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+@dataclass(frozen=True)
+class StreamPolicy:
+    """Retry and circuit-breaker parameters shared by an exchange's streams."""
+    base_delay: float = 5.0     # first retry delay (s); doubles per consecutive failure
+    max_delay: float = 60.0     # backoff ceiling (s)
+    max_retries: int = 3        # failed retries, exchange-wide, that open the breaker
+    cooldown: float = 60.0      # seconds the breaker stays open before a probe
+
+
+# 2^32 x any sane base delay is far past any cap
+MAX_EXPONENT = 32
+
+
+class Backoff:
+    """Exponential backoff with equal jitter: a delay in [d/2, d) where d = base * 2^attempt, capped."""
+
+    __slots__ = ("base", "cap", "attempt")
+
+    def __init__(self, base: float, cap: float):
+        self.base = base
+        self.cap = cap
+        self.attempt = 0
+
+    def next(self) -> float:
+        # attempt keeps counting through long outages; the exponent is bounded so the float cannot overflow
+        delay = min(self.cap, self.base * 2.0 ** min(self.attempt, MAX_EXPONENT))
+        self.attempt += 1
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def reset(self):
+        self.attempt = 0
+
+
+class CircuitBreaker:
+    """Per-exchange breaker; streams ``await acquire()`` before every (re)subscribe."""
+
+    def __init__(self, exchange: str, max_retries: int, cooldown: float, spread: float):
+        self.exchange = exchange
+        self.max_retries = max(1, max_retries)
+        self.cooldown = cooldown
+        self.spread = spread  # seconds over which parked streams resume once closed
+        self.state = CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.opened_at: Optional[float] = None
+        self._changed = asyncio.Event()
+
+    def _transition(self, state: str):
+        self.state = state
+        # Wake everything parked on the old state; later waiters get a fresh event
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def acquire(self) -> bool:
+        """Return once a subscribe attempt is allowed; True when the caller is the half-open probe."""
+        if self.state == CLOSED:
+            return False
+        parked = False
+        while self.state != CLOSED:
+            changed = self._changed
+            if self.state == OPEN:
+                remaining = self.opened_at + self.cooldown - time.monotonic()
+                if remaining <= 0:
+                    self._transition(HALF_OPEN)
+                    return True
+                parked = True
+                try:
+                    await asyncio.wait_for(changed.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                # Another stream is probing; wait for its outcome
+                parked = True
+                await changed.wait()
+        if parked and self.spread > 0:
+            await asyncio.sleep(random.uniform(0, self.spread))
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        if self.state != CLOSED:
+            logger.info(f"[{self.exchange}] Stream circuit closed, resubscribing")
+            self._transition(CLOSED)
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.max_retries):
+            reason = "probe failed" if self.state == HALF_OPEN else f"{self.failures} failed retries"
+            self.trips += 1
+            self.opened_at = time.monotonic()
+            logger.warning(
+                f"[{self.exchange}] Stream circuit open ({reason}), pausing reconnects for {self.cooldown:g}s"
+            )
+            self._transition(OPEN)
+
+    def abandon_probe(self):
+        """The probing stream went away without an outcome; let the next waiter probe."""
+        if self.state == HALF_OPEN:
+            self.opened_at = time.monotonic() - self.cooldown
+            self._transition(OPEN)
+
+    def status(self) -> Dict[str, Any]:
+        return {"state": self.state, "failures": self.failures, "trips": self.trips}
+
+
+class StreamSupervisor:
+    """Runs an exchange's subscriptions independently under one circuit breaker."""
+
+    def __init__(self, exchange: str, policy: Optional[StreamPolicy] = None,
+                 on_error: Optional[Callable[[str, Exception], None]] = None,
+                 on_retry: Optional[Callable[[str], None]] = None):
+        self.exchange = exchange
+        self.policy = policy or StreamPolicy()
+        self.breaker = CircuitBreaker(exchange, self.policy.max_retries, self.policy.cooldown,
+                                      self.policy.base_delay)
+        self.on_error = on_error
+        self.on_retry = on_retry
+        self.retrying: Dict[str, int] = {}  # key -> consecutive failures, for keys currently failing
+        self.restarts = 0
+
+    async def run(self, key: str, step: Callable[[], Awaitable[Any]],
+                  on_error: Optional[Callable[[Exception], None]] = None):
+        """
+        Await ``step()`` forever; each completed step counts as data received.
+
+        ``step`` is one receive-and-deliver cycle of the subscription, so
+        re-entering it after a failure resubscribes the same stream.
+        """
+        backoff = Backoff(self.policy.base_delay, self.policy.max_delay)
+        breaker = self.breaker
+        while True:
+            probe = await breaker.acquire()
+            try:
+                await step()
+            except asyncio.CancelledError:
+                if probe:
+                    breaker.abandon_probe()
+                raise
+            except Exception as e:
+                # Only a retry (or the probe) failing again counts towards the venue being down
+                if backoff.attempt or probe:
+                    breaker.record_failure()
+                delay = backoff.next()
+                self.retrying[key] = backoff.attempt
+                if on_error is not None:
+                    on_error(e)
+                if self.on_error is not None:
+                    self.on_error(key, e)
+                logger.error(
+                    f"[{self.exchange}] Stream error on {key} "
+                    f"(attempt {backoff.attempt}, retry in {delay:.1f}s): {e}"
+                )
+                await asyncio.sleep(delay)
+                self.restarts += 1
+                if self.on_retry is not None:
+                    self.on_retry(key)
+            else:
+                if backoff.attempt:
+                    backoff.reset()
+                    self.retrying.pop(key, None)
+                if breaker.failures or breaker.state != CLOSED:
+                    breaker.record_success()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "circuit": self.breaker.status(),
+            "retrying": len(self.retrying),
+            "max_attempt": max(self.retrying.values(), default=0),
+            "restarts": self.restarts,
+        }
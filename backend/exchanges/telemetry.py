@@ -0,0 +1,238 @@
+"""
+Per-exchange feed telemetry for Quantum Arbitrage Engine.
+
+Each ExchangeAdapter owns one ExchangeTelemetry. The hot path (every ticker
+frame) only bumps integers, does one bisect into fixed histogram buckets per
+ticker and stores the receive time per symbol; percentiles, rates and ages
+are derived when a report is requested.
+
+    feed latency   exchange timestamp -> local receive, per ticker (ms)
+    messages       frames and tickers received, with an EWMA message rate
+    reconnects     stream resubscriptions after an error
+    errors         stream and REST errors
+    quote age      seconds since each subscribed symbol last ticked
+    REST latency   per ccxt method (ms)
+
+``render_prometheus()`` renders all adapters in the Prometheus text format.
+
+Quote ages are kept only for the symbols passed to ``track()`` (the adapter's
+subscription plan), so tickers an exchange pushes beyond it neither grow
+``last_seen`` nor add a Prometheus series per symbol.
+"""
+
+import bisect
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from backend.exchanges.subscriptions import RATE_ALPHA
+
+# Upper bounds in milliseconds (Prometheus ``le`` labels); the last bucket is +Inf
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (cumulative form is produced on export)."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Bucket upper bound containing the q-quantile (None when empty or beyond the last bound)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.bounds, self.counts):
+            seen += n
+            if seen >= rank:
+                return float(bound)
+        return None
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.sum / self.count, 2) if self.count else None,
+            "p50_ms_le": self.quantile(0.5),
+            "p99_ms_le": self.quantile(0.99),
+        }
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        out, total = [], 0
+        for bound, n in zip(self.bounds, self.counts):
+            total += n
+            out.append((f"{bound:g}", total))
+        out.append(("+Inf", self.count))
+        return out
+
+
+class ExchangeTelemetry:
+    """Low-overhead counters for one exchange adapter."""
+
+    def __init__(self, exchange: str):
+        self.exchange = exchange
+        self.feed_latency = Histogram()
+        self.frames = 0
+        self.tickers = 0
+        self.untimed = 0       # tickers without an exchange timestamp
+        self.clock_ahead = 0   # exchange timestamp later than our clock (counted as 0 ms)
+        self.reconnects = 0
+        self.stream_errors = 0
+        self.rest_latency: Dict[str, Histogram] = {}
+        self.rest_errors = 0
+        self.last_seen: Dict[str, float] = {}  # symbol -> wall-clock receive time (s)
+        self.tracked: Optional[Set[str]] = None  # symbols with a quote age; None = every symbol seen
+        self.rate = 0.0
+        self._window_start = time.monotonic()
+        self._window_count = 0
+
+    # --- Hot path ---
+
+    def on_frame(self, tickers: Iterable[dict]):
+        now = time.time()
+        now_ms = now * 1000
+        latency = self.feed_latency
+        last_seen = self.last_seen
+        tracked = self.tracked
+        count = 0
+        for ticker in tickers:
+            count += 1
+            symbol = ticker.get("symbol")
+            if symbol and (tracked is None or symbol in tracked):
+                last_seen[symbol] = now
+            ts = ticker.get("timestamp")
+            if not ts:
+                self.untimed += 1
+                continue
+            delay = now_ms - ts
+            if delay < 0:
+                self.clock_ahead += 1
+                delay = 0.0
+            latency.observe(delay)
+        self.frames += 1
+        self.tickers += count
+
+        self._window_count += 1
+        mono = time.monotonic()
+        elapsed = mono - self._window_start
+        if elapsed >= 1.0:
+            self.rate = RATE_ALPHA * (self._window_count / elapsed) + (1 - RATE_ALPHA) * self.rate
+            self._window_start = mono
+            self._window_count = 0
+
+    def track(self, symbols: Iterable[str]):
+        """Keep quote ages for ``symbols`` only, forgetting any other symbol."""
+        self.tracked = set(symbols)
+        for symbol in [s for s in self.last_seen if s not in self.tracked]:
+            del self.last_seen[symbol]
+
+    def on_stream_error(self):
+        self.stream_errors += 1
+
+    def on_reconnect(self):
+        self.reconnects += 1
+
+    def on_rest(self, method: str, elapsed_ms: float, ok: bool = True):
+        hist = self.rest_latency.get(method)
+        if hist is None:
+            hist = self.rest_latency[method] = Histogram()
+        hist.observe(elapsed_ms)
+        if not ok:
+            self.rest_errors += 1
+
+    # --- Reporting ---
+
+    def quote_ages(self, now: Optional[float] = None) -> Dict[str, float]:
+        """Seconds since each symbol last ticked on this exchange."""
+        now = time.time() if now is None else now
+        return {symbol: now - seen for symbol, seen in self.last_seen.items()}
+
+    def summary(self) -> Dict[str, Any]:
+        ages = self.quote_ages()
+        return {
+            "feed_latency": self.feed_latency.summary(),
+            "frames": self.frames,
+            "tickers": self.tickers,
+            "frames_per_sec": round(self.rate, 2),
+            "untimed_tickers": self.untimed,
+            "clock_ahead": self.clock_ahead,
+            "reconnects": self.reconnects,
+            "stream_errors": self.stream_errors,
+            "rest": {method: h.summary() for method, h in self.rest_latency.items()},
+            "rest_errors": self.rest_errors,
+            "max_quote_age_sec": round(max(ages.values()), 2) if ages else None,
+            "quote_age_sec": {symbol: round(age, 2) for symbol, age in ages.items()},
+        }
+
+
+# --- Prometheus text exposition ---
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: Any) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _histogram(lines: List[str], name: str, hist: Histogram, **labels: str):
+    for le, count in hist.cumulative():
+        lines.append(f"{name}_bucket{_labels(**labels, le=le)} {count}")
+    lines.append(f"{name}_sum{_labels(**labels)} {hist.sum:.3f}")
+    lines.append(f"{name}_count{_labels(**labels)} {hist.count}")
+
+
+def render_prometheus(adapters: Iterable[Any]) -> str:
+    """Prometheus text format (0.0.4) for every adapter's ``telemetry``."""
+    adapters = list(adapters)
+    now = time.time()
+    lines: List[str] = []
+
+    def family(name: str, kind: str, help_text: str):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    family("qae_exchange_connected", "gauge", "1 when the adapter is connected")
+    for a in adapters:
+        lines.append(f"qae_exchange_connected{_labels(exchange=a.name)} {int(bool(a.is_connected))}")
+
+    family("qae_exchange_feed_latency_ms", "histogram", "Exchange timestamp to local receive, per ticker")
+    for a in adapters:
+        _histogram(lines, "qae_exchange_feed_latency_ms", a.telemetry.feed_latency, exchange=a.name)
+
+    counters = (
+        ("qae_exchange_frames_total", "frames", "Stream frames received"),
+        ("qae_exchange_tickers_total", "tickers", "Tickers received"),
+        ("qae_exchange_reconnects_total", "reconnects", "Stream resubscriptions after an error"),
+        ("qae_exchange_stream_errors_total", "stream_errors", "Stream errors"),
+        ("qae_exchange_rest_errors_total", "rest_errors", "Failed REST calls"),
+    )
+    for name, attr, help_text in counters:
+        family(name, "counter", help_text)
+        for a in adapters:
+            lines.append(f"{name}{_labels(exchange=a.name)} {getattr(a.telemetry, attr)}")
+
+    family("qae_exchange_frame_rate", "gauge", "Frames per second (EWMA)")
+    for a in adapters:
+        lines.append(f"qae_exchange_frame_rate{_labels(exchange=a.name)} {a.telemetry.rate:.3f}")
+
+    family("qae_exchange_rest_latency_ms", "histogram", "REST call latency per ccxt method")
+    for a in adapters:
+        for method, hist in a.telemetry.rest_latency.items():
+            _histogram(lines, "qae_exchange_rest_latency_ms", hist, exchange=a.name, method=method)
+
+    family("qae_quote_age_seconds", "gauge", "Seconds since the symbol last ticked on the exchange")
+    for a in adapters:
+        for symbol, age in a.telemetry.quote_ages(now).items():
+            lines.append(f"qae_quote_age_seconds{_labels(exchange=a.name, symbol=symbol)} {age:.3f}")
+
+    return "\n".join(lines) + "\n"
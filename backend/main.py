@@ -3,41 +3,55 @@ Quantum Arbitrage Engine - Main Application Entry Point
 Author: HABIB-UR-REHMAN <hassanbhatti2343@gmail.com>
 """
 
-import asyncio
 import logging
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Request, WebSocket
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from backend.core.config import settings
 from backend.core.logging_config import setup_logging
-from backend.exchanges.adapter import ExchangeManager
-from backend.services.market_engine import MarketDataEngine
-from backend.services.arbitrage_engine import ArbitrageEngine
-from backend.services.execution_engine import ExecutionEngine
-from backend.services.risk_manager import RiskManager
-from backend.services.portfolio_tracker import PortfolioTracker
-from backend.services.ai_decision import AIDecisionEngine
+from backend.exchanges.telemetry import render_prometheus
+from backend.services.snapshot_cache import OpportunitiesSnapshot, PricesSnapshot, negotiate_format, respond
+
+if TYPE_CHECKING:
+    from backend.engines import Engines
 
 # Initialize logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
-# Initialize components
-exchange_manager = ExchangeManager()
-market_engine = MarketDataEngine(exchange_manager)
-risk_manager = RiskManager()
-portfolio_tracker = PortfolioTracker(exchange_manager)
-ai_engine = AIDecisionEngine()
-arbitrage_engine = ArbitrageEngine(market_engine, exchange_manager)
-execution_engine = ExecutionEngine(exchange_manager, risk_manager, portfolio_tracker)
+# Built in lifespan(): importing this module (uvicorn, run.py, tools) constructs no engines
+engines: Optional["Engines"] = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the engines, run them for the life of the server, then shut them down."""
+    global engines
+    logger.info("🚀 Starting Quantum Arbitrage Engine...")
+    from backend.engines import Engines
+    engines = Engines()
+    if engines.engine_publisher:
+        engines.engine_publisher.add_topic("status", engine_status, min_interval=settings.engine_status_interval)
+    await engines.start()
+    logger.info("✅ All systems operational")
+    try:
+        yield
+    finally:
+        logger.info("🛑 Shutting down Quantum Arbitrage Engine...")
+        await engines.stop()
+        logger.info("👋 Shutdown complete")
+
 
 app = FastAPI(
     title="Quantum Arbitrage Engine API",
     description="Institutional-Grade Multi-Exchange Arbitrage Trading Platform",
     version="2.0.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -49,54 +63,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize all services on startup."""
-    logger.info("🚀 Starting Quantum Arbitrage Engine...")
-    
-    # 1. Initialize Exchange Manager
-    enabled_exchanges = settings.exchanges_list
-    for name in enabled_exchanges:
-        name_lower = name.lower()
-        config = {
-            'apiKey': getattr(settings, f"{name_lower}_api_key", ""),
-            'secret': getattr(settings, f"{name_lower}_api_secret", ""),
-        }
-        # Add passphrase if available (for OKX/KuCoin)
-        passphrase = getattr(settings, f"{name_lower}_passphrase", None)
-        if passphrase:
-            config['password'] = passphrase
-            
-        exchange_manager.add_exchange(name, config)
-    
-    await exchange_manager.initialize_all()
-    
-    # 2. Start Market Data Engine
-    await market_engine.start()
-    
-    # 3. Start Portfolio Tracker
-    await portfolio_tracker.start()
-    
-    # 4. Start Arbitrage Engine
-    await arbitrage_engine.start()
-    
-    # 5. Start Execution Engine
-    await execution_engine.start()
-    
-    logger.info("✅ All systems operational")
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Gracefully shut down all services."""
-    logger.info("🛑 Shutting down Quantum Arbitrage Engine...")
-    
-    await execution_engine.stop()
-    await arbitrage_engine.stop()
-    await portfolio_tracker.stop()
-    await market_engine.stop()
-    await exchange_manager.close_all()
-    
-    logger.info("👋 Shutdown complete")
+try:
+    from backend.routers import admin_settings
+except ModuleNotFoundError as e:
+    if e.name not in ("backend.routers", "backend.routers.admin_settings"):
+        raise
+    logger.info("backend.routers.admin_settings not installed, serving without it")
+else:
+    app.include_router(admin_settings.router)
 
 # --- API Endpoints ---
 
@@ -109,17 +83,33 @@ async def health_check():
     }
 
 @app.get("/api/v1/market/prices")
-async def get_market_prices():
-    """Get all real-time prices from memory."""
-    prices = await market_engine.get_all_prices()
+async def get_market_prices(request: Request):
+    """Get all real-time prices from memory (JSON, MessagePack or the columnar grid; see wire.py)."""
+    if engines.book_fed or engines.market_engine is None:
+        fmt = negotiate_format(request, PricesSnapshot.formats)
+        # Cache hits are answered on the loop; a new version is encoded on the CPU executor
+        snapshot = engines.prices_snapshot
+        encoded = snapshot.cached(fmt) or await engines.engine_runtime.run("serialize", snapshot.get, fmt)
+        return respond(request, encoded)
+    prices = await engines.market_engine.get_all_prices()
     return {"prices": prices, "timestamp": datetime.utcnow().isoformat()}
 
 @app.get("/api/v1/arbitrage/opportunities")
-async def get_opportunities(min_profit: float = 0.0):
-    """Get active arbitrage opportunities."""
-    opps = await arbitrage_engine.get_opportunities()
-    filtered_opps = [o for o in opps if o['net_profit_pct'] >= min_profit]
-    return {"opportunities": filtered_opps, "count": len(filtered_opps)}
+async def get_opportunities(request: Request, min_profit: float = 0.0):
+    """Get active arbitrage opportunities (JSON or MessagePack)."""
+    fmt = negotiate_format(request, OpportunitiesSnapshot.formats)
+    return respond(request, await engines.opportunities_snapshot.get(min_profit, fmt))
+
+@app.get("/api/v1/arbitrage/detector")
+async def get_detector_stats():
+    """Scan mode and detection statistics, including tick-to-opportunity latency."""
+    return {
+        "mode": settings.arbitrage_scan_mode,
+        "vectorized": engines.spread_scanner.stats(),
+        "incremental": engines.incremental_detector.stats(),
+        "triangular": engines.triangular_detector.stats() if settings.triangular_enabled else None,
+        "timestamp": datetime.utcnow().isoformat()
+    }
 
 @app.get("/api/v1/portfolio/metrics")
 async def get_portfolio_metrics():
@@ -135,16 +125,125 @@ async def get_portfolio_metrics():
 
 @app.get("/api/v1/admin/exchanges")
 async def get_exchanges_status():
-    """Get status of all exchange adapters."""
-    adapters = exchange_manager.get_all_adapters()
+    """Get status of all exchange adapters, with feed latency, rates, errors and quote ages."""
+    adapters = engines.exchange_manager.get_all_adapters()
     return {
         "exchanges": [
-            {"name": a.name, "connected": a.is_connected, "private": a.use_private} 
+            {"name": a.name, "connected": a.is_connected, "private": a.use_private, **a.startup_status(),
+             "streams": a.supervisor.stats(), "telemetry": a.telemetry.summary()}
             for a in adapters.values()
         ],
         "timestamp": datetime.utcnow().isoformat()
     }
 
+@app.get("/api/v1/admin/subscriptions")
+async def get_subscription_coverage():
+    """Tracked-symbol coverage and per-shard message rates for each exchange."""
+    return {
+        "tracked_symbols": settings.symbols_list,
+        "exchanges": engines.exchange_manager.subscription_report(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/api/v1/admin/persistence")
+async def get_persistence_stats():
+    """Write-behind buffer depth and throughput."""
+    return {
+        "enabled": engines.persistence is not None,
+        "stats": engines.persistence.stats() if engines.persistence else None,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/api/v1/admin/ingest")
+async def get_ingest_stats():
+    """Per-exchange tick queue depth and drop counters."""
+    return {
+        "enabled": engines.tick_ingest is not None,
+        "policy": engines.tick_ingest.policy if engines.tick_ingest else None,
+        "exchanges": engines.tick_ingest.stats() if engines.tick_ingest else {},
+        "ingest_workers": settings.ingest_groups if engines.shared_ingest else [],
+        "shared_book": engines.book_follower.stats() if engines.book_follower else None,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/api/v1/admin/tick-store")
+async def get_tick_store_stats():
+    """Tick history recorder throughput and backlog."""
+    return {
+        "enabled": engines.tick_store is not None,
+        "stats": engines.tick_store.stats() if engines.tick_store else {},
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/api/v1/admin/stream")
+async def get_stream_stats():
+    """/ws/market subscribers, encoded frames and dropped slow clients."""
+    return {"stats": engines.stream_hub.stats(), "timestamp": datetime.utcnow().isoformat()}
+
+@app.get("/api/v1/admin/runtime")
+async def get_runtime_stats():
+    """Event loop implementation and lag, CPU executor and per-stage busy time."""
+    return {
+        **engines.engine_runtime.stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/api/v1/admin/snapshots")
+async def get_snapshot_stats():
+    """Encoded REST snapshot versions and cache hit counts."""
+    return {
+        "prices": engines.prices_snapshot.stats(),
+        "opportunities": engines.opportunities_snapshot.stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.websocket("/ws/market")
+async def websocket_market(websocket: WebSocket):
+    """
+    Live prices / opportunities / system deltas.
+
+    ``?topics=prices,opportunities`` picks the initial subscriptions (default:
+    all); clients can send {"action": "subscribe"|"unsubscribe", "topics": [...]} later.
+    ``?format=msgpack`` switches to MessagePack binary frames.
+    """
+    hub = engines.stream_hub
+    requested = websocket.query_params.get("topics")
+    topics = [t.strip() for t in requested.split(",") if t.strip()] if requested else list(hub.topics)
+    fmt = websocket.query_params.get("format", "json").lower()
+    await hub.serve(websocket, topics, fmt)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Per-exchange telemetry in the Prometheus text exposition format."""
+    return PlainTextResponse(
+        render_prometheus(engines.exchange_manager.get_all_adapters().values()),
+        media_type="text/plain; version=0.0.4",
+    )
+
+@app.get("/api/v1/admin/engine-link")
+async def get_engine_link_stats():
+    """Connected API workers and what has been published to them."""
+    return {
+        "enabled": engines.engine_publisher is not None,
+        "stats": engines.engine_publisher.stats() if engines.engine_publisher else None,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+async def engine_status() -> Dict:
+    """Engine-side admin payloads for API workers, keyed like their endpoints."""
+    return {
+        "system": engines.system_status(),
+        "detector": await get_detector_stats(),
+        "exchanges": await get_exchanges_status(),
+        "subscriptions": await get_subscription_coverage(),
+        "persistence": await get_persistence_stats(),
+        "ingest": await get_ingest_stats(),
+        "tick_store": await get_tick_store_stats(),
+        "runtime": await get_runtime_stats(),
+        "engine_link": await get_engine_link_stats(),
+        "metrics": render_prometheus(engines.exchange_manager.get_all_adapters().values()),
+    }
+
 @app.get("/")
 async def root():
     return {
@@ -156,8 +255,4 @@ async def root():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host=settings.api_host, port=settings.api_port)
-
-from backend.routers import admin_settings  # adjust the import path
-
-app.include_router(admin_settings.router)
\ No newline at end of file
+    uvicorn.run(app, host=settings.api_host, port=settings.api_port, loop=settings.engine_event_loop)
@@ -0,0 +1,62 @@
+"""
+Order-book-depth-aware profit estimation for Quantum Arbitrage Engine.
+
+Enriches cross-exchange opportunities with the size that can actually be
+filled for ``default_trade_size_usd`` within ``max_slippage_pct`` and the
+VWAP-based net profit, using the L2 books streamed by each ExchangeAdapter.
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+from backend.exchanges.order_book import estimate_fill
+from backend.services.spread_scanner import DEFAULT_TAKER_FEE
+
+
+class DepthEstimator:
+    """Attach fillable size and VWAP net profit to opportunities."""
+
+    def __init__(self, exchange_manager, taker_fees: Dict[str, float], trade_size_usd: float,
+                 max_slippage_pct: Optional[float] = None, max_book_age: float = 10.0):
+        self.exchange_manager = exchange_manager
+        self.taker_fees = taker_fees  # shared with the scanner, so fee reloads apply here too
+        self.trade_size_usd = trade_size_usd
+        self.max_slippage_pct = max_slippage_pct
+        self.max_book_age = max_book_age
+
+    def _book(self, exchange: str, symbol: str):
+        adapter = self.exchange_manager.get_adapter(exchange)
+        if adapter is None:
+            return None
+        book = adapter.order_books.get(symbol)
+        if book is None:
+            return None
+        if book.timestamp and time.time() * 1000 - book.timestamp > self.max_book_age * 1000:
+            return None
+        return book
+
+    def enrich(self, opportunity: Dict[str, Any]) -> Dict[str, Any]:
+        """Add depth fields in place; ``fillable_base`` is None when books are unavailable."""
+        if opportunity.get("arb_type", "cross_exchange") != "cross_exchange":
+            return opportunity
+        buy, sell = opportunity["buy_exchange"], opportunity["sell_exchange"]
+        buy_book = self._book(buy, opportunity["symbol"])
+        sell_book = self._book(sell, opportunity["symbol"])
+        estimate = None
+        if buy_book is not None and sell_book is not None:
+            estimate = estimate_fill(
+                buy_book, sell_book, self.trade_size_usd,
+                buy_fee=self.taker_fees.get(buy.lower(), DEFAULT_TAKER_FEE),
+                sell_fee=self.taker_fees.get(sell.lower(), DEFAULT_TAKER_FEE),
+                max_slippage_pct=self.max_slippage_pct,
+            )
+        opportunity.update(estimate or {
+            "fillable_base": None,
+            "fillable_usd": None,
+            "buy_vwap": None,
+            "sell_vwap": None,
+            "vwap_net_profit_usd": None,
+            "vwap_net_profit_pct": None,
+            "depth_limited": None,
+        })
+        return opportunity
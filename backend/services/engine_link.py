@@ -0,0 +1,394 @@
+"""
+Engine-to-API state replication over local IPC.
+
+The engine process owns the exchange connections and every detector. With
+API_WORKERS > 0 it runs an EnginePublisher, and each stateless API worker
+(backend/api/worker.py) keeps an EngineReplica of the published state, so
+read traffic scales across processes without opening more exchange sessions.
+
+Transport: a Unix domain socket (``unix:<path>``), or TCP on loopback
+(``tcp:<host>:<port>``) where Unix sockets are unavailable. Each message is a
+4-byte big-endian length followed by a MessagePack map:
+
+    {"topic": "prices", "seq": 17, "data": ...}
+
+``seq`` increases by one per published change of a topic. It starts from the
+clock (price_book.initial_version), so it keeps increasing across engine
+restarts and means the same in every worker. A new connection first receives
+the latest message of every topic, then each change as it is published.
+Topics:
+
+    prices         the price book grid in the columnar wire format (wire.py)
+    opportunities  current_opportunities() as a list
+    status         admin/statistics payloads, refreshed every status interval
+
+A subscriber whose socket buffer backs up past ``max_buffer`` bytes is
+disconnected; it reconnects and starts again from the latest messages.
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import socket
+import struct
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+
+import numpy as np
+
+from backend.exchanges.supervisor import Backoff
+from backend.services.price_book import FIELDS, TIMESTAMP, PriceBookSnapshot, initial_version
+from backend.services.wire import decode_price_grid, encode_msgpack, msgpack
+
+logger = logging.getLogger(__name__)
+
+_LENGTH = struct.Struct(">I")
+DEFAULT_TCP_ADDRESS = "tcp:127.0.0.1:8790"
+MAX_MESSAGE = 256 * 1024 * 1024
+
+
+def resolve_address(address: str) -> Tuple[str, Any]:
+    """``("unix", path)`` or ``("tcp", (host, port))``; Unix addresses fall back to TCP where unsupported."""
+    kind, _, rest = address.partition(":")
+    if kind == "unix":
+        if hasattr(socket, "AF_UNIX"):
+            return "unix", rest
+        logger.warning(f"Unix sockets unavailable, engine link uses {DEFAULT_TCP_ADDRESS} instead of {address}")
+        kind, _, rest = DEFAULT_TCP_ADDRESS.partition(":")
+    if kind == "tcp":
+        host, _, port = rest.rpartition(":")
+        return "tcp", (host or "127.0.0.1", int(port))
+    raise ValueError(f"Engine link address must be unix:<path> or tcp:<host>:<port>, got '{address}'")
+
+
+def pack_message(topic: str, seq: int, data: bytes) -> bytes:
+    """Frame an already MessagePack-encoded ``data`` without decoding it again."""
+    packer = msgpack.Packer(use_bin_type=True)
+    body = b"".join((
+        packer.pack_map_header(3), packer.pack("topic"), packer.pack(topic),
+        packer.pack("seq"), packer.pack(seq), packer.pack("data"), data,
+    ))
+    return _LENGTH.pack(len(body)) + body
+
+
+async def _call(source: Callable) -> Any:
+    result = source()
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+class _Topic:
+    __slots__ = ("name", "source", "version", "min_interval", "seq", "data", "message", "last_version",
+                 "published_at")
+
+    def __init__(self, name: str, source: Callable, version: Optional[Callable[[], Optional[Hashable]]],
+                 min_interval: float):
+        self.name = name
+        self.source = source
+        self.version = version
+        self.min_interval = min_interval
+        self.seq = initial_version()
+        self.data: Optional[bytes] = None     # encoded source result, to detect unchanged state
+        self.message: Optional[bytes] = None  # framed data at the current seq
+        self.last_version: Any = None
+        self.published_at = 0.0
+
+
+class EnginePublisher:
+    """Serves the engine's published topics to API workers over a local socket."""
+
+    def __init__(self, address: str, interval: float = 0.1, max_buffer: int = 16 * 1024 * 1024):
+        self.address = address
+        self.interval = interval
+        self.max_buffer = max_buffer
+        self.topics: Dict[str, _Topic] = {}
+        self.clients: Set[asyncio.StreamWriter] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._task: Optional[asyncio.Task] = None
+        self._path: Optional[str] = None
+
+        self.messages = 0
+        self.bytes_sent = 0
+        self.dropped_clients = 0
+        # Optional ``record(nanos)`` sink for publish time, e.g. EngineRuntime.stage("publish")
+        self.busy: Optional[Any] = None
+
+    def add_topic(self, name: str, source: Callable[[], Any],
+                  version: Optional[Callable[[], Optional[Hashable]]] = None, min_interval: float = 0.0):
+        """
+        Publish ``source()`` (sync or async; None = nothing to publish yet) as topic ``name``.
+
+        ``version()`` lets a poll skip unchanged state without calling the
+        source; without it (or when it returns None) the encoded result is
+        compared instead. ``min_interval`` rate-limits a topic below the loop
+        interval.
+        """
+        self.topics[name] = _Topic(name, source, version, min_interval)
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        if self._server is not None:
+            return
+        kind, target = resolve_address(self.address)
+        if kind == "unix":
+            if os.path.exists(target):
+                os.unlink(target)  # left behind by an engine that did not shut down cleanly
+            os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+            self._server = await asyncio.start_unix_server(self._serve, path=target)
+            self._path = target
+        else:
+            self._server = await asyncio.start_server(self._serve, host=target[0], port=target[1])
+        self._task = asyncio.create_task(self._run(), name="engine-publisher")
+        logger.info(f"Engine publishing {', '.join(self.topics)} on {kind}:{target}")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self.clients):
+                writer.close()
+            self.clients.clear()
+            await self._server.wait_closed()
+            self._server = None
+        if self._path and os.path.exists(self._path):
+            os.unlink(self._path)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # Latest state first, then every change from the publish loop
+        for topic in self.topics.values():
+            if topic.message is not None:
+                writer.write(topic.message)
+                self.messages += 1
+                self.bytes_sent += len(topic.message)
+        self.clients.add(writer)
+        peer = writer.get_extra_info("peername") or "local"
+        logger.info(f"API worker connected to engine link ({peer}), {len(self.clients)} connected")
+        try:
+            # Subscribers never send; EOF means they went away
+            await reader.read()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter_ns()
+            try:
+                await self.publish()
+            except Exception as e:
+                logger.error(f"Engine link publish failed: {e}")
+            if self.busy is not None:
+                self.busy.record(time.perf_counter_ns() - started)
+            await asyncio.sleep(self.interval)
+
+    async def publish(self):
+        """Encode every changed topic once and write it to all connected workers."""
+        now = time.monotonic()
+        for topic in self.topics.values():
+            if topic.min_interval and now - topic.published_at < topic.min_interval:
+                continue
+            version = topic.version() if topic.version is not None else None
+            if version is not None and topic.message is not None and version == topic.last_version:
+                continue
+            value = await _call(topic.source)
+            if value is None:
+                continue
+            data = encode_msgpack(value)
+            topic.published_at = now
+            if data == topic.data:
+                continue
+            topic.seq += 1
+            topic.data, topic.last_version = data, version
+            topic.message = pack_message(topic.name, topic.seq, data)
+            self._broadcast(topic.message)
+
+    def _broadcast(self, message: bytes):
+        for writer in list(self.clients):
+            transport = writer.transport
+            if transport.is_closing():
+                self.clients.discard(writer)
+                continue
+            if transport.get_write_buffer_size() > self.max_buffer:
+                # Too slow to keep up; it reconnects and resumes from the latest state
+                self.clients.discard(writer)
+                self.dropped_clients += 1
+                transport.abort()
+                logger.warning("Engine link subscriber fell behind, disconnected")
+                continue
+            writer.write(message)
+            self.messages += 1
+            self.bytes_sent += len(message)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "address": self.address,
+            "clients": len(self.clients),
+            "messages": self.messages,
+            "bytes_sent": self.bytes_sent,
+            "dropped_clients": self.dropped_clients,
+            "topics": {name: {"seq": t.seq, "bytes": len(t.message) if t.message else 0}
+                       for name, t in self.topics.items()},
+        }
+
+
+class EngineReplica:
+    """The latest message of every topic an EnginePublisher serves, kept current by one reader task."""
+
+    def __init__(self, address: str, reconnect_delay: float = 0.5, max_reconnect_delay: float = 5.0):
+        self.address = address
+        self.data: Dict[str, Any] = {}
+        self.seqs: Dict[str, int] = {}
+        self.received_at: Dict[str, float] = {}
+        # topic -> fn(data) applied once on receipt, e.g. decoding the price grid
+        self.decoders: Dict[str, Callable[[Any], Any]] = {}
+        self.connected = False
+        self.connects = 0
+        self.messages = 0
+        self._backoff = Backoff(reconnect_delay, max_reconnect_delay)
+        self._task: Optional[asyncio.Task] = None
+
+    def get(self, topic: str, default: Any = None) -> Any:
+        return self.data.get(topic, default)
+
+    def version(self, topic: str) -> Optional[int]:
+        """The engine's ``seq`` of the latest ``topic`` message, the same in every worker; None before the first."""
+        return self.seqs.get(topic)
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run(), name="engine-replica")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        # Only cancellation ends this loop; every failure backs off and reconnects
+        kind, target = resolve_address(self.address)
+        while True:
+            try:
+                await self._session(kind, target)
+            except OSError as e:
+                if self._backoff.attempt == 0:
+                    logger.warning(f"Engine link {self.address} unavailable ({e}), retrying")
+            except Exception as e:
+                logger.error(f"Engine link {self.address} failed, reconnecting: {e}")
+            await asyncio.sleep(self._backoff.next())
+
+    async def _session(self, kind: str, target: Any):
+        """One connection: apply messages until the publisher goes away."""
+        if kind == "unix":
+            reader, writer = await asyncio.open_unix_connection(target)
+        else:
+            reader, writer = await asyncio.open_connection(*target)
+
+        self.connected = True
+        self.connects += 1
+        logger.info(f"Connected to engine link {self.address}")
+        try:
+            while True:
+                (length,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+                if length > MAX_MESSAGE:
+                    raise ValueError(f"message of {length} bytes exceeds {MAX_MESSAGE}")
+                self._apply(msgpack.unpackb(await reader.readexactly(length), raw=False,
+                                            strict_map_key=False))
+                # Healthy once a frame applies; a message that always fails keeps backing off
+                if self._backoff.attempt:
+                    self._backoff.reset()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            logger.warning(f"Engine link {self.address} closed, reconnecting")
+        finally:
+            self.connected = False
+            writer.close()
+
+    def _apply(self, message: Dict[str, Any]):
+        topic, data = message["topic"], message["data"]
+        decode = self.decoders.get(topic)
+        self.data[topic] = decode(data) if decode is not None else data
+        self.seqs[topic] = message["seq"]
+        self.received_at[topic] = time.time()
+        self.messages += 1
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "address": self.address,
+            "connected": self.connected,
+            "connects": self.connects,
+            "messages": self.messages,
+            "topics": {topic: {"seq": seq, "age_sec": round(now - self.received_at[topic], 3)}
+                       for topic, seq in self.seqs.items()},
+        }
+
+
+class ReplicaPriceBook:
+    """
+    Read-only PriceBook stand-in over a replica's ``prices`` topic.
+
+    Each message is decoded once into a snapshot whose grid is a read-only
+    view of the received bytes, so ``snapshot()`` and ``frozen_snapshot()``
+    are the same immutable object and PricesSnapshot / PriceTopic work on it
+    unchanged. ``version`` is the engine book's version carried in each
+    message, so every worker reports the same one.
+    """
+
+    def __init__(self, replica: EngineReplica, topic: str = "prices"):
+        self._snap = PriceBookSnapshot((), (), np.full((len(FIELDS), 0, 0), np.nan), 0)
+        replica.decoders[topic] = self._decode
+
+    def _decode(self, data: bytes) -> PriceBookSnapshot:
+        grid = decode_price_grid(data)
+        self._snap = PriceBookSnapshot(tuple(grid["exchanges"]), tuple(grid["symbols"]), grid["grid"],
+                                       grid["version"])
+        return self._snap
+
+    @property
+    def version(self) -> int:
+        return self._snap.version
+
+    @property
+    def exchanges(self) -> Tuple[str, ...]:
+        return self._snap.exchanges
+
+    @property
+    def symbols(self) -> Tuple[str, ...]:
+        return self._snap.symbols
+
+    def snapshot(self) -> PriceBookSnapshot:
+        return self._snap
+
+    def frozen_snapshot(self) -> PriceBookSnapshot:
+        return self._snap
+
+    def get(self, exchange: str, symbol: str) -> Optional[Dict[str, float]]:
+        snap = self._snap
+        if exchange not in snap.exchanges or symbol not in snap.symbols:
+            return None
+        cell = snap.grid[:, snap.exchanges.index(exchange), snap.symbols.index(symbol)].tolist()
+        return None if cell[TIMESTAMP] != cell[TIMESTAMP] else dict(zip(FIELDS, cell))
+
+    def to_dict(self) -> Dict[str, Dict[str, Dict[str, Optional[float]]]]:
+        return self._snap.to_dict()
+
+    @property
+    def nbytes(self) -> int:
+        return self._snap.grid.nbytes
@@ -0,0 +1,266 @@
+"""
+Event-driven cross-exchange arbitrage detection for Quantum Arbitrage Engine.
+
+Instead of rescanning every symbol on a timer, each tick re-evaluates only its
+own symbol. Per symbol, fee-adjusted asks and bids sit in two heaps keyed by
+venue, so the best buy and best sell venue are available in O(log E).
+Superseded heap entries are skipped lazily when they surface.
+
+With ``max_quote_age`` set, venues whose last quote is older than that are
+dropped from the row before it is evaluated, and a periodic sweep retires
+active opportunities whose legs have gone quiet since.
+"""
+
+import asyncio
+import heapq
+import logging
+import time
+from datetime import datetime
+from itertools import repeat
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from backend.core.metrics import LatencyRecorder
+from backend.services.spread_scanner import DEFAULT_TAKER_FEE, DEFAULT_TAKER_FEES
+
+logger = logging.getLogger(__name__)
+
+
+class _SymbolRow:
+    """Venue heaps for one symbol."""
+
+    __slots__ = ("quotes", "asks", "bids")
+
+    def __init__(self):
+        # exchange -> (seq, eff_bid, eff_ask, bid, ask, timestamp_ms)
+        self.quotes: Dict[str, Tuple[int, float, float, float, float, float]] = {}
+        self.asks: List[Tuple[float, int, str]] = []  # (eff_ask, seq, exchange), min-heap
+        self.bids: List[Tuple[float, int, str]] = []  # (-eff_bid, seq, exchange), min-heap
+
+    def _is_current(self, entry: Tuple[float, int, str]) -> bool:
+        quote = self.quotes.get(entry[2])
+        return quote is not None and quote[0] == entry[1]
+
+    def _clean(self, heap: List[Tuple[float, int, str]]):
+        while heap and not self._is_current(heap[0]):
+            heapq.heappop(heap)
+
+    def _top_two(self, heap: List[Tuple[float, int, str]]):
+        self._clean(heap)
+        if not heap:
+            return None, None
+        first = heapq.heappop(heap)
+        self._clean(heap)
+        second = heap[0] if heap else None
+        heapq.heappush(heap, first)
+        return first, second
+
+    def expire(self, cutoff_ms: float) -> int:
+        """Drop venues quoted before ``cutoff_ms``; their heap entries are skipped lazily."""
+        stale = [ex for ex, q in self.quotes.items() if q[5] < cutoff_ms]
+        for ex in stale:
+            del self.quotes[ex]
+        return len(stale)
+
+    def compact(self):
+        """Rebuild heaps from current quotes once stale entries dominate."""
+        self.asks = [(q[2], q[0], ex) for ex, q in self.quotes.items()]
+        self.bids = [(-q[1], q[0], ex) for ex, q in self.quotes.items()]
+        heapq.heapify(self.asks)
+        heapq.heapify(self.bids)
+
+    def best_pair(self) -> Optional[Tuple[str, str]]:
+        """(buy exchange, sell exchange) maximizing eff_bid / eff_ask across different venues."""
+        ask1, ask2 = self._top_two(self.asks)
+        bid1, bid2 = self._top_two(self.bids)
+        if ask1 is None or bid1 is None:
+            return None
+        if ask1[2] != bid1[2]:
+            return ask1[2], bid1[2]
+        # Best buy and best sell are the same venue: take the better runner-up combination
+        options = []
+        if bid2 is not None:
+            options.append((-bid2[0] / ask1[0], ask1[2], bid2[2]))
+        if ask2 is not None:
+            options.append((-bid1[0] / ask2[0], ask2[2], bid1[2]))
+        if not options:
+            return None
+        _, buy, sell = max(options)
+        return buy, sell
+
+
+class IncrementalArbitrageDetector:
+    """Per-tick, per-symbol opportunity detection with tick-to-opportunity latency tracking."""
+
+    def __init__(self, taker_fees: Optional[Dict[str, float]] = None,
+                 min_net_profit_pct: float = 0.0, trade_size_usd: float = 100.0,
+                 max_quote_age: Optional[float] = None, clock: Optional[Callable[[], float]] = None):
+        self.taker_fees: Dict[str, float] = dict(DEFAULT_TAKER_FEES)
+        if taker_fees:
+            self.set_fees(taker_fees)
+        self.min_net_profit_pct = min_net_profit_pct
+        self.trade_size_usd = trade_size_usd
+        # Seconds before a venue's quote is ignored (None/0 = never); ``clock`` returns epoch ms
+        self.max_quote_age = max_quote_age
+        self.clock = clock or (lambda: time.time() * 1000)
+
+        self.rows: Dict[str, _SymbolRow] = {}
+        self.active: Dict[str, Dict[str, Any]] = {}  # best live opportunity per symbol
+        self.latency = LatencyRecorder()     # delivery from the stream -> opportunity emitted
+        self.evaluation = LatencyRecorder()  # on_tick -> opportunity emitted, detector time only
+        self.ticks = 0
+        self.emitted = 0
+        self.stale_expired = 0
+        self.version = 0  # bumped whenever ``active`` changes
+        self._seq = 0
+        self._task: Optional[asyncio.Task] = None
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        # Optional per-opportunity hook, e.g. DepthEstimator.enrich
+        self.enrich: Optional[Callable[[Dict[str, Any]], Any]] = None
+
+    def set_fees(self, taker_fees: Dict[str, float]):
+        self.taker_fees.update({name.lower(): fee for name, fee in taker_fees.items()})
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]):
+        """Call ``listener(opportunity)`` synchronously whenever one is emitted."""
+        self._listeners.append(listener)
+
+    def on_tick(self, exchange: str, symbol: str, bid: Optional[float], ask: Optional[float],
+                timestamp: Optional[float] = None, received_ns: Optional[int] = None):
+        """
+        Apply one quote and re-evaluate its symbol.
+
+        ``received_ns`` is the ``time.perf_counter_ns()`` at which the frame was
+        delivered (TickIngestQueue passes it to ``received`` listeners); with it,
+        tick-to-opportunity latency covers the ingest queue and drain delay, not
+        just this evaluation.
+        """
+        started = time.perf_counter_ns()
+        self.ticks += 1
+        row = self.rows.get(symbol)
+        if row is None:
+            row = self.rows[symbol] = _SymbolRow()
+
+        if not bid or not ask:
+            # Venue has no two-sided quote: drop it from the row
+            if row.quotes.pop(exchange, None) is None:
+                return
+        else:
+            fee = self.taker_fees.get(exchange.lower(), DEFAULT_TAKER_FEE)
+            self._seq += 1
+            eff_bid, eff_ask = bid * (1.0 - fee), ask * (1.0 + fee)
+            row.quotes[exchange] = (self._seq, eff_bid, eff_ask, bid, ask, timestamp or self.clock())
+            heapq.heappush(row.asks, (eff_ask, self._seq, exchange))
+            heapq.heappush(row.bids, (-eff_bid, self._seq, exchange))
+            if len(row.asks) > 4 * len(row.quotes) + 16:
+                row.compact()
+
+        if self.max_quote_age:
+            self.stale_expired += row.expire(self.clock() - self.max_quote_age * 1000.0)
+        self._evaluate(symbol, row, started, received_ns)
+
+    def _evaluate(self, symbol: str, row: _SymbolRow, started: int, received_ns: Optional[int] = None):
+        pair = row.best_pair() if len(row.quotes) >= 2 else None
+        if pair is None:
+            if self.active.pop(symbol, None) is not None:
+                self.version += 1
+            return
+
+        buy, sell = pair
+        _, _, eff_ask, _, ask, _ = row.quotes[buy]
+        _, eff_bid, _, bid, _, _ = row.quotes[sell]
+        net_pct = (eff_bid / eff_ask - 1.0) * 100.0
+        if net_pct < self.min_net_profit_pct:
+            if self.active.pop(symbol, None) is not None:
+                self.version += 1
+            return
+
+        now = time.perf_counter_ns()
+        evaluation = now - started
+        self.evaluation.record(evaluation)
+        latency = now - received_ns if received_ns else None
+        if latency is not None:
+            self.latency.record(latency)
+        opportunity = {
+            "symbol": symbol,
+            "arb_type": "cross_exchange",
+            "buy_exchange": buy,
+            "sell_exchange": sell,
+            "buy_price": ask,
+            "sell_price": bid,
+            "spread_pct": (bid / ask - 1.0) * 100.0,
+            "net_profit_pct": net_pct,
+            "estimated_profit_usd": self.trade_size_usd * net_pct / 100.0,
+            "detected_at": datetime.utcnow().isoformat(),
+            "detection_latency_us": latency / 1000.0 if latency is not None else None,
+            "evaluation_us": evaluation / 1000.0,
+        }
+        if self.enrich is not None:
+            self.enrich(opportunity)
+        self.active[symbol] = opportunity
+        self.emitted += 1
+        self.version += 1
+        for listener in self._listeners:
+            try:
+                listener(opportunity)
+            except Exception as e:
+                logger.error(f"Opportunity listener error: {e}")
+
+    def on_tickers(self, exchange: str, tickers: Iterable[Dict[str, Any]],
+                   received_ns: Optional[Sequence[int]] = None):
+        """Tick-ingest listener: evaluate each ccxt ticker in the batch (``received_ns`` per ticker, if known)."""
+        for ticker, received in zip(tickers, received_ns if received_ns is not None else repeat(None)):
+            self.on_tick(exchange, ticker["symbol"], ticker.get("bid"), ticker.get("ask"), ticker.get("timestamp"),
+                         received)
+
+    def expire_stale(self) -> int:
+        """Re-evaluate active opportunities that have a leg older than ``max_quote_age``."""
+        if not self.max_quote_age:
+            return 0
+        cutoff = self.clock() - self.max_quote_age * 1000.0
+        expired = 0
+        for symbol in list(self.active):
+            row = self.rows[symbol]
+            removed = row.expire(cutoff)
+            if removed:
+                expired += removed
+                self._evaluate(symbol, row, time.perf_counter_ns())
+        self.stale_expired += expired
+        return expired
+
+    # --- Stale sweep (same lifecycle as the other engines) ---
+
+    async def start(self, interval: float = 1.0):
+        if not self.max_quote_age or (self._task and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._run(interval), name="incremental-stale-sweep")
+        logger.info(f"Incremental detector stale sweep started (max_quote_age={self.max_quote_age}s)")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, interval: float):
+        while True:
+            try:
+                self.expire_stale()
+            except Exception as e:
+                logger.error(f"Stale quote sweep failed: {e}")
+            await asyncio.sleep(interval)
+
+    async def get_opportunities(self) -> List[Dict[str, Any]]:
+        return sorted(self.active.values(), key=lambda o: o["net_profit_pct"], reverse=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ticks": self.ticks,
+            "opportunities_emitted": self.emitted,
+            "active": len(self.active),
+            "stale_quotes_expired": self.stale_expired,
+            "tick_to_opportunity": self.latency.summary(),
+            "evaluation": self.evaluation.summary(),
+        }
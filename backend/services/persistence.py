@@ -0,0 +1,223 @@
+"""
+Write-behind persistence for Quantum Arbitrage Engine.
+
+Detectors and engines hand rows to ``WriteBehindWriter.submit*`` which only
+appends to an in-memory buffer and returns immediately. A background task
+flushes the buffer when it reaches ``batch_size`` rows or every
+``flush_interval`` seconds, writing each table's rows with a single
+executemany INSERT inside one transaction per flush.
+
+A failed flush (e.g. SQLite "database is locked") puts its batch back at the
+head of the buffer and is retried with exponential backoff. The buffer stays
+within ``max_pending``: new rows are refused when it is full, and requeued
+rows that no longer fit are evicted oldest first and counted as failed.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from backend.core.database import async_session
+from backend.exchanges.supervisor import Backoff
+from backend.models.tables import Opportunity, RiskEvent, RiskSeverity, Trade
+
+logger = logging.getLogger(__name__)
+
+
+def _columns(model) -> frozenset:
+    return frozenset(c.name for c in model.__table__.columns if c.name != "id")
+
+
+OPPORTUNITY_COLUMNS = _columns(Opportunity)
+TRADE_COLUMNS = _columns(Trade)
+SHUTDOWN_RETRIES = 3  # flush attempts stop() makes before giving up on what is still buffered
+
+
+class WriteBehindWriter:
+    """Bounded, batched, non-blocking writer for Opportunity, Trade and RiskEvent rows."""
+
+    def __init__(self, session_factory=async_session, max_pending: int = 20000,
+                 batch_size: int = 500, flush_interval: float = 1.0,
+                 opportunity_min_interval: float = 1.0, max_retry_delay: float = 30.0):
+        self.session_factory = session_factory
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # The same (symbol, buy, sell) opportunity is stored at most this often
+        self.opportunity_min_interval = opportunity_min_interval
+
+        self._pending: Deque[Tuple[Any, Dict[str, Any]]] = deque()
+        self._batch_ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        self._stopping = asyncio.Event()
+        self._backoff = Backoff(flush_interval, max_retry_delay)
+        self._last_opportunity: Dict[Tuple[str, str, str], float] = {}
+
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.skipped_duplicates = 0
+        self.failed = 0   # rows evicted after a failed flush, never written
+        self.retries = 0  # failed flushes whose batch went back into the buffer
+        self.batches = 0
+        self.last_batch_rows = 0
+        self.last_flush_ms = 0.0
+        self._flush_seconds = 0.0
+        self._started_at: Optional[float] = None
+
+    # --- Producers (never block) ---
+
+    def submit(self, model, row: Dict[str, Any]) -> bool:
+        """Queue a row for ``model``; returns False if the buffer is full and the row was dropped."""
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return False
+        self._pending.append((model, row))
+        self.submitted += 1
+        if len(self._pending) >= self.batch_size:
+            self._batch_ready.set()
+        return True
+
+    def submit_opportunity(self, opportunity: Dict[str, Any]) -> bool:
+        key = (opportunity["symbol"], opportunity["buy_exchange"], opportunity["sell_exchange"])
+        now = time.monotonic()
+        last = self._last_opportunity.get(key)
+        if last is not None and now - last < self.opportunity_min_interval:
+            self.skipped_duplicates += 1
+            return False
+        self._last_opportunity[key] = now
+
+        row = {k: v for k, v in opportunity.items() if k in OPPORTUNITY_COLUMNS}
+        row.setdefault("opportunity_id", uuid.uuid4().hex)
+        row.pop("detected_at", None)  # detector emits ISO strings; use the column default
+        return self.submit(Opportunity, row)
+
+    def submit_trade(self, trade: Dict[str, Any]) -> bool:
+        row = {k: v for k, v in trade.items() if k in TRADE_COLUMNS}
+        row.setdefault("trade_id", uuid.uuid4().hex)
+        return self.submit(Trade, row)
+
+    def submit_risk_event(self, event_type: str, message: str,
+                          severity: RiskSeverity = RiskSeverity.WARNING,
+                          details: Optional[Dict[str, Any]] = None) -> bool:
+        return self.submit(RiskEvent, {
+            "event_type": event_type,
+            "severity": severity,
+            "message": message,
+            "details_json": details or {},
+        })
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        if self._task and not self._task.done():
+            return
+        self._running = True
+        self._stopping.clear()
+        self._started_at = time.monotonic()
+        self._task = asyncio.create_task(self._run(), name="write-behind")
+        logger.info(f"Write-behind persistence started (batch={self.batch_size}, interval={self.flush_interval}s)")
+
+    async def stop(self):
+        """Stop the flush loop and write everything still buffered."""
+        self._running = False
+        self._stopping.set()
+        self._batch_ready.set()
+        if self._task:
+            await self._task
+            self._task = None
+        failures = 0
+        while self._pending:
+            if await self.flush():
+                continue
+            failures += 1
+            if failures >= SHUTDOWN_RETRIES:
+                self.failed += len(self._pending)
+                logger.error(f"Write-behind: {len(self._pending)} rows not written at shutdown")
+                self._pending.clear()
+                break
+            await asyncio.sleep(self._backoff.next())
+        logger.info(f"Write-behind persistence stopped ({self.written} rows written, {self.dropped} dropped)")
+
+    async def _run(self):
+        while self._running:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            while self._pending and self._running:
+                if not await self.flush():
+                    # The batch is back at the head of the buffer; give the database time to recover
+                    try:
+                        await asyncio.wait_for(self._stopping.wait(), timeout=self._backoff.next())
+                    except asyncio.TimeoutError:
+                        pass
+                    break
+                if len(self._pending) < self.batch_size:
+                    break
+
+    async def flush(self) -> int:
+        """Write up to ``batch_size`` buffered rows in one transaction; returns rows written."""
+        if not self._pending:
+            return 0
+        take = min(len(self._pending), self.batch_size)
+        batch = [self._pending.popleft() for _ in range(take)]
+        by_model: Dict[Any, List[Dict[str, Any]]] = {}
+        for model, row in batch:
+            by_model.setdefault(model, []).append(row)
+
+        started = time.perf_counter()
+        try:
+            async with self.session_factory() as session:
+                async with session.begin():
+                    for model, rows in by_model.items():
+                        await session.execute(insert(model), rows)
+        except Exception as e:
+            self._requeue(batch)
+            self.retries += 1
+            logger.error(f"Write-behind flush of {take} rows failed, will retry: {e}")
+            return 0
+
+        self._backoff.reset()
+        elapsed = time.perf_counter() - started
+        self._flush_seconds += elapsed
+        self.last_flush_ms = elapsed * 1000
+        self.last_batch_rows = take
+        self.batches += 1
+        self.written += take
+        return take
+
+    def _requeue(self, batch: List[Tuple[Any, Dict[str, Any]]]):
+        """Put a failed batch back in front, evicting the oldest rows beyond ``max_pending``."""
+        self._pending.extendleft(reversed(batch))
+        evict = len(self._pending) - self.max_pending
+        for _ in range(max(0, evict)):
+            self._pending.popleft()
+        if evict > 0:
+            self.failed += evict
+            logger.warning(f"Write-behind buffer full, evicted {evict} unwritten rows")
+
+    def stats(self) -> Dict[str, Any]:
+        uptime = time.monotonic() - self._started_at if self._started_at else 0.0
+        return {
+            "pending": len(self._pending),
+            "max_pending": self.max_pending,
+            "submitted": self.submitted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "retries": self.retries,
+            "skipped_duplicates": self.skipped_duplicates,
+            "batches": self.batches,
+            "last_batch_rows": self.last_batch_rows,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "rows_per_sec": round(self.written / uptime, 1) if uptime else 0.0,
+            "write_rows_per_sec": round(self.written / self._flush_seconds, 1) if self._flush_seconds else 0.0,
+        }
@@ -0,0 +1,190 @@
+"""
+Columnar price book for Quantum Arbitrage Engine.
+
+Holds top-of-book quotes for every (exchange, symbol) pair in one contiguous
+float64 block shaped (field, exchange, symbol). Exchanges and symbols are
+interned to integer ids, so an update is a dictionary lookup plus a handful of
+scalar writes, and whole-market scans can operate on 2-D arrays directly.
+Missing quotes are NaN.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+FIELDS = ("bid", "ask", "bid_size", "ask_size", "timestamp")
+BID, ASK, BID_SIZE, ASK_SIZE, TIMESTAMP = range(len(FIELDS))
+
+
+def _num(value: Any) -> float:
+    return np.nan if value is None else float(value)
+
+
+def initial_version() -> int:
+    """
+    First version of a new book: the wall clock in microseconds.
+
+    A book restarts with its process; starting from the clock instead of 0
+    keeps a restarted book from reusing a version its predecessor already
+    handed out, so the version alone identifies a state (e.g. as an ETag).
+    """
+    return time.time_ns() // 1000
+
+
+@dataclass(frozen=True)
+class PriceBookSnapshot:
+    """
+    Read-only view of the grid at the time it was taken.
+
+    The arrays share memory with the live book (no copy), so values keep
+    moving underneath a reader; call ``copy()`` for a frozen, consistent grid.
+    """
+    exchanges: Tuple[str, ...]
+    symbols: Tuple[str, ...]
+    grid: np.ndarray
+    version: int
+
+    @property
+    def bid(self) -> np.ndarray:
+        return self.grid[BID]
+
+    @property
+    def ask(self) -> np.ndarray:
+        return self.grid[ASK]
+
+    @property
+    def bid_size(self) -> np.ndarray:
+        return self.grid[BID_SIZE]
+
+    @property
+    def ask_size(self) -> np.ndarray:
+        return self.grid[ASK_SIZE]
+
+    @property
+    def timestamp(self) -> np.ndarray:
+        return self.grid[TIMESTAMP]
+
+    def copy(self) -> "PriceBookSnapshot":
+        grid = self.grid.copy()
+        grid.flags.writeable = False
+        return PriceBookSnapshot(self.exchanges, self.symbols, grid, self.version)
+
+    def to_dict(self, mask: Optional[np.ndarray] = None) -> Dict[str, Dict[str, Dict[str, Optional[float]]]]:
+        """Nested {symbol: {exchange: quote}} of the quoted cells selected by ``mask`` (all if None)."""
+        quoted = ~np.isnan(self.timestamp)
+        if mask is not None:
+            quoted &= mask
+        result: Dict[str, Dict[str, Dict[str, Optional[float]]]] = {}
+        for e, s in zip(*np.nonzero(quoted)):
+            cell = self.grid[:, e, s].tolist()
+            result.setdefault(self.symbols[s], {})[self.exchanges[e]] = {
+                name: (None if value != value else value) for name, value in zip(FIELDS, cell)
+            }
+        return result
+
+
+class PriceBook:
+    """(exchange x symbol) grid of bid/ask/sizes/timestamp with O(1) updates."""
+
+    def __init__(self, exchanges: Iterable[str] = (), symbols: Iterable[str] = (),
+                 exchange_capacity: int = 8, symbol_capacity: int = 64):
+        self.exchanges: List[str] = []
+        self.symbols: List[str] = []
+        self.exchange_ids: Dict[str, int] = {}
+        self.symbol_ids: Dict[str, int] = {}
+        self.version = initial_version()
+        self._grid = np.full((len(FIELDS), exchange_capacity, symbol_capacity), np.nan)
+
+        for name in exchanges:
+            self.intern_exchange(name)
+        for symbol in symbols:
+            self.intern_symbol(symbol)
+
+    # --- Interning ---
+
+    def intern_exchange(self, name: str) -> int:
+        idx = self.exchange_ids.get(name)
+        if idx is None:
+            idx = len(self.exchanges)
+            if idx >= self._grid.shape[1]:
+                self._grow(exchanges=max(2 * idx, 1))
+            self.exchanges.append(name)
+            self.exchange_ids[name] = idx
+        return idx
+
+    def intern_symbol(self, symbol: str) -> int:
+        idx = self.symbol_ids.get(symbol)
+        if idx is None:
+            idx = len(self.symbols)
+            if idx >= self._grid.shape[2]:
+                self._grow(symbols=max(2 * idx, 1))
+            self.symbols.append(symbol)
+            self.symbol_ids[symbol] = idx
+        return idx
+
+    def _grow(self, exchanges: Optional[int] = None, symbols: Optional[int] = None):
+        # Existing snapshots keep referencing the old block; new ones see the new block
+        _, e_cap, s_cap = self._grid.shape
+        grid = np.full((len(FIELDS), exchanges or e_cap, symbols or s_cap), np.nan)
+        grid[:, :e_cap, :s_cap] = self._grid
+        self._grid = grid
+
+    # --- Writes ---
+
+    def update(self, exchange: str, symbol: str, bid: float, ask: float,
+               bid_size: float = np.nan, ask_size: float = np.nan,
+               timestamp: Optional[float] = None):
+        e = self.intern_exchange(exchange)
+        s = self.intern_symbol(symbol)
+        grid = self._grid
+        grid[BID, e, s] = bid
+        grid[ASK, e, s] = ask
+        grid[BID_SIZE, e, s] = bid_size
+        grid[ASK_SIZE, e, s] = ask_size
+        grid[TIMESTAMP, e, s] = time.time() * 1000 if timestamp is None else timestamp
+        self.version += 1
+
+    def update_ticker(self, exchange: str, ticker: Dict[str, Any]):
+        """Write a ccxt unified ticker; timestamps are epoch milliseconds."""
+        self.update(
+            exchange,
+            ticker["symbol"],
+            _num(ticker.get("bid")),
+            _num(ticker.get("ask")),
+            _num(ticker.get("bidVolume")),
+            _num(ticker.get("askVolume")),
+            ticker.get("timestamp"),
+        )
+
+    def apply_tickers(self, exchange: str, tickers: Iterable[Dict[str, Any]]):
+        for ticker in tickers:
+            self.update_ticker(exchange, ticker)
+
+    # --- Reads ---
+
+    def snapshot(self) -> PriceBookSnapshot:
+        """Zero-copy read-only view of the populated part of the grid."""
+        view = self._grid[:, :len(self.exchanges), :len(self.symbols)]
+        view.flags.writeable = False
+        return PriceBookSnapshot(tuple(self.exchanges), tuple(self.symbols), view, self.version)
+
+    def frozen_snapshot(self) -> PriceBookSnapshot:
+        """Private copy of the grid, safe to hand to another thread or process."""
+        return self.snapshot().copy()
+
+    def get(self, exchange: str, symbol: str) -> Optional[Dict[str, float]]:
+        e = self.exchange_ids.get(exchange)
+        s = self.symbol_ids.get(symbol)
+        if e is None or s is None or np.isnan(self._grid[TIMESTAMP, e, s]):
+            return None
+        return {name: float(self._grid[i, e, s]) for i, name in enumerate(FIELDS)}
+
+    def to_dict(self) -> Dict[str, Dict[str, Dict[str, Optional[float]]]]:
+        """Nested {symbol: {exchange: quote}} for API responses; empty cells are omitted."""
+        return self.snapshot().to_dict()
+
+    @property
+    def nbytes(self) -> int:
+        return self._grid.nbytes
@@ -0,0 +1,447 @@
+"""
+Deterministic replay of recorded ticks for Quantum Arbitrage Engine.
+
+Ticks written by ``TickStore`` are read back in receive order and pushed
+through stand-in exchange adapters into the same detection components the
+live app wires together: the columnar price book plus the incremental or
+vectorized detector, and optionally the triangular detector. Time comes
+from the recording instead of the wall clock, so a replay runs as fast as
+the detectors can go. The same recording and parameters always produce the
+same summary.
+
+Detected opportunities are turned into simulated trades. Each trade fills
+at the recorded quotes ``execution_delay_ms`` after detection. It is
+rejected if those prices moved by more than ``max_slippage_pct``, or if a
+scorer is configured and its score is below ``ai_decision_threshold``.
+
+Parameter sweeps run one replay per parameter set in a process pool:
+
+    python -m backend.services.replay --dir data/ticks --min-profit 0.1 0.2 0.3 --slippage 0.05 0.1
+"""
+
+import argparse
+import importlib
+import itertools
+import json
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.core.config import settings
+from backend.services.incremental_arbitrage import IncrementalArbitrageDetector
+from backend.services.price_book import PriceBook
+from backend.services.spread_scanner import DEFAULT_TAKER_FEE, SpreadScanner
+from backend.services.tick_store import TickStore
+from backend.services.triangular import TriangularDetector
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ReplayConfig:
+    """One replay run; defaults mirror the live settings."""
+    store_dir: str = settings.tick_store_dir
+    start_ms: Optional[int] = None
+    end_ms: Optional[int] = None
+    exchanges: Optional[Tuple[str, ...]] = None
+    symbols: Optional[Tuple[str, ...]] = None
+    scan_mode: str = "incremental"  # incremental | vectorized
+    scan_interval: float = settings.opportunity_scan_interval  # simulated seconds, vectorized mode
+    triangular: bool = False
+    min_profit_threshold_pct: float = settings.min_profit_threshold_pct
+    max_slippage_pct: float = settings.max_slippage_pct
+    ai_decision_threshold: float = settings.ai_decision_threshold
+    scorer: Optional[str] = None  # "module:function" taking an opportunity dict, returning 0..1
+    trade_size_usd: float = settings.default_trade_size_usd
+    quote_max_age: float = settings.quote_max_age_seconds  # measured against the recording's clock
+    execution_delay_ms: int = 250
+    taker_fees: Dict[str, float] = field(default_factory=dict)
+
+
+class SimulatedClock:
+    """Replay time, advanced to each recorded tick's receive time."""
+
+    def __init__(self):
+        self.now_ms = 0
+
+    def advance(self, ms: int):
+        if ms > self.now_ms:
+            self.now_ms = ms
+
+    def isoformat(self) -> str:
+        return datetime.utcfromtimestamp(self.now_ms / 1000).isoformat()
+
+
+class ReplayExchangeAdapter:
+    """Stand-in for ExchangeAdapter that emits recorded frames instead of reading a socket."""
+
+    def __init__(self, name: str, tick_taps: List[Callable[[str, List[dict]], None]]):
+        self.name = name
+        self.exchange_id = name.lower()
+        self.markets: Dict[str, Dict[str, Any]] = {}
+        self.order_books: Dict[str, Any] = {}
+        self.is_connected = True
+        self.state = "ready"
+        self.markets_source = "replay"
+        self.tick_taps = tick_taps
+
+    def add_market(self, symbol: str):
+        if symbol in self.markets or "/" not in symbol:
+            return
+        base, quote = symbol.split(":")[0].split("/")
+        self.markets[symbol] = {"symbol": symbol, "base": base, "quote": quote,
+                                "spot": True, "type": "spot", "active": True}
+
+    def emit(self, tickers: List[dict]):
+        for tap in self.tick_taps:
+            tap(self.name, tickers)
+
+
+class ReplayExchangeManager:
+    """Just enough of ExchangeManager for the detectors that look up adapters."""
+
+    def __init__(self):
+        self.adapters: Dict[str, ReplayExchangeAdapter] = {}
+        self.tick_taps: List[Callable[[str, List[dict]], None]] = []
+
+    def add_tick_tap(self, tap: Callable[[str, List[dict]], None]):
+        self.tick_taps.append(tap)
+
+    def adapter(self, name: str) -> ReplayExchangeAdapter:
+        adapter = self.adapters.get(name)
+        if adapter is None:
+            adapter = self.adapters[name] = ReplayExchangeAdapter(name, self.tick_taps)
+        return adapter
+
+    def get_adapter(self, name: str) -> Optional[ReplayExchangeAdapter]:
+        return self.adapters.get(name)
+
+    def get_all_adapters(self) -> Dict[str, ReplayExchangeAdapter]:
+        return self.adapters
+
+
+def _load_scorer(path: Optional[str]) -> Optional[Callable[[Dict[str, Any]], float]]:
+    if not path:
+        return None
+    module, _, name = path.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+class ReplaySession:
+    """Feeds one recording through the detectors and simulates execution."""
+
+    def __init__(self, config: ReplayConfig):
+        self.config = config
+        self.clock = SimulatedClock()
+        self.manager = ReplayExchangeManager()
+        self.scorer = _load_scorer(config.scorer)
+
+        self.price_book = PriceBook()
+        self.manager.add_tick_tap(self.price_book.apply_tickers)
+        self.scanner = SpreadScanner(
+            self.price_book,
+            taker_fees=config.taker_fees,
+            top_k=settings.arbitrage_top_k,
+            min_net_profit_pct=config.min_profit_threshold_pct,
+            trade_size_usd=config.trade_size_usd,
+            max_quote_age=config.quote_max_age,
+            clock=self._now_ms,
+        )
+        self.detector = IncrementalArbitrageDetector(
+            taker_fees=config.taker_fees,
+            min_net_profit_pct=config.min_profit_threshold_pct,
+            trade_size_usd=config.trade_size_usd,
+            max_quote_age=config.quote_max_age,
+            clock=self._now_ms,
+        )
+        if config.scan_mode == "incremental":
+            self.manager.add_tick_tap(self.detector.on_tickers)
+            self.detector.add_listener(self._on_opportunity)
+        elif config.scan_mode != "vectorized":
+            raise ValueError(f"Unsupported replay scan mode '{config.scan_mode}'")
+        self.triangular = TriangularDetector(
+            taker_fees=config.taker_fees,
+            min_net_profit_pct=config.min_profit_threshold_pct,
+            trade_size_usd=config.trade_size_usd,
+            exchange_manager=self.manager,
+        ) if config.triangular else None
+        if self.triangular:
+            self.manager.add_tick_tap(self.triangular.on_tickers)
+
+        self.fees = dict(self.scanner.taker_fees)
+        self._open_windows: Dict[Tuple[str, str, str], int] = {}
+        self._pending: List[Tuple[int, Dict[str, Any]]] = []
+        self.opportunity_events = 0
+        self.opportunity_windows = 0
+        self.by_symbol: Dict[str, int] = {}
+        self.trades: List[Dict[str, Any]] = []
+        self.rejected_ai = 0
+        self.rejected_slippage = 0
+        self.rejected_no_quote = 0
+        self.ticks = 0
+
+    # --- Detection ---
+
+    def _now_ms(self) -> float:
+        return float(self.clock.now_ms)
+
+    def _on_opportunity(self, opportunity: Dict[str, Any]):
+        opportunity["detected_at"] = self.clock.isoformat()
+        self.opportunity_events += 1
+        key = (opportunity["symbol"], opportunity["buy_exchange"], opportunity["sell_exchange"])
+        # A window stays open while the pair keeps being reported; one trade per window
+        last_seen = self._open_windows.get(key)
+        self._open_windows[key] = self.clock.now_ms
+        if last_seen is not None and self.clock.now_ms - last_seen <= self._window_gap_ms:
+            return
+        self.opportunity_windows += 1
+        self.by_symbol[key[0]] = self.by_symbol.get(key[0], 0) + 1
+
+        if self.scorer is not None:
+            opportunity["ai_score"] = float(self.scorer(opportunity))
+            if opportunity["ai_score"] < self.config.ai_decision_threshold:
+                self.rejected_ai += 1
+                return
+        self._pending.append((self.clock.now_ms + self.config.execution_delay_ms, opportunity))
+
+    @property
+    def _window_gap_ms(self) -> int:
+        if self.config.scan_mode == "vectorized":
+            return int(self.config.scan_interval * 1000 * 1.5)
+        return 1000
+
+    # --- Simulated execution ---
+
+    def _execute_due(self):
+        if not self._pending:
+            return
+        due = [p for p in self._pending if p[0] <= self.clock.now_ms]
+        if not due:
+            return
+        self._pending = [p for p in self._pending if p[0] > self.clock.now_ms]
+        for _, opp in due:
+            self._execute(opp)
+
+    def _execute(self, opp: Dict[str, Any]):
+        buy_quote = self.price_book.get(opp["buy_exchange"], opp["symbol"])
+        sell_quote = self.price_book.get(opp["sell_exchange"], opp["symbol"])
+        if not buy_quote or not sell_quote or not buy_quote["ask"] > 0 or not sell_quote["bid"] > 0:
+            self.rejected_no_quote += 1
+            return
+        ask, bid = buy_quote["ask"], sell_quote["bid"]
+        slippage_pct = max(ask / opp["buy_price"] - 1.0, 1.0 - bid / opp["sell_price"], 0.0) * 100.0
+        if slippage_pct > self.config.max_slippage_pct:
+            self.rejected_slippage += 1
+            return
+
+        buy_fee = self.fees.get(opp["buy_exchange"].lower(), DEFAULT_TAKER_FEE)
+        sell_fee = self.fees.get(opp["sell_exchange"].lower(), DEFAULT_TAKER_FEE)
+        size = self.config.trade_size_usd
+        quantity = size / ask
+        net = quantity * bid * (1.0 - sell_fee) - size * (1.0 + buy_fee)
+        self.trades.append({
+            "symbol": opp["symbol"],
+            "buy_exchange": opp["buy_exchange"],
+            "sell_exchange": opp["sell_exchange"],
+            "detected_at": opp["detected_at"],
+            "executed_at": self.clock.isoformat(),
+            "expected_profit_pct": opp["net_profit_pct"],
+            "buy_price": ask,
+            "sell_price": bid,
+            "quantity": quantity,
+            "slippage_pct": slippage_pct,
+            "net_profit": net,
+        })
+
+    # --- Driving ---
+
+    def run(self) -> Dict[str, Any]:
+        cfg = self.config
+        store = TickStore(cfg.store_dir)
+        exchange_filter = None
+        if cfg.exchanges:
+            exchange_filter = {store.exchange_id(e) for e in cfg.exchanges} - {None}
+        symbol_filter = None
+        if cfg.symbols:
+            symbol_filter = {store.symbol_id(s) for s in cfg.symbols} - {None}
+
+        self._register_markets(store, exchange_filter, symbol_filter)
+
+        started = time.perf_counter()
+        first_ms = last_ms = None
+        next_scan_ms = None
+        scan_step = int(cfg.scan_interval * 1000)
+
+        for records in store.iter_range(cfg.start_ms, cfg.end_ms):
+            if exchange_filter is not None:
+                records = records[np.isin(records["exchange"], list(exchange_filter))]
+            if symbol_filter is not None:
+                records = records[np.isin(records["symbol"], list(symbol_filter))]
+            if not len(records):
+                continue
+            # Frames: consecutive records with the same receive time and exchange
+            keys = records["recv_ms"] * 65536 + records["exchange"]
+            bounds = np.flatnonzero(np.diff(keys)) + 1
+            for frame in np.split(records, bounds):
+                recv_ms = int(frame["recv_ms"][0])
+                if first_ms is None:
+                    first_ms = recv_ms
+                    next_scan_ms = recv_ms + scan_step
+                last_ms = recv_ms
+                self.clock.advance(recv_ms)
+                self._execute_due()
+                if cfg.scan_mode == "vectorized":
+                    while recv_ms >= next_scan_ms:
+                        self._scan()
+                        next_scan_ms += scan_step
+                else:
+                    self.detector.expire_stale()
+                self._emit(store, frame)
+
+        # Let trades scheduled at the very end fill against the last known quotes
+        for _, opp in self._pending:
+            self._execute(opp)
+        self._pending.clear()
+        wall = time.perf_counter() - started
+        return self.summary(first_ms, last_ms, wall)
+
+    def _scan(self):
+        # Same work as SpreadScanner._run, but paced by the simulated clock
+        self.scanner.opportunities = self.scanner.scan()
+        for opportunity in self.scanner.opportunities:
+            self._on_opportunity(opportunity)
+
+    def _register_markets(self, store: TickStore, exchange_filter: Optional[set], symbol_filter: Optional[set]):
+        """
+        List every recorded symbol on every replayed exchange before the first frame.
+
+        Stands in for load_markets(): the triangular detector builds an
+        exchange's currency graph once, on its first tick, so markets must not
+        trickle in frame by frame.
+        """
+        for e, exchange in enumerate(store.exchanges):
+            if exchange_filter is not None and e not in exchange_filter:
+                continue
+            adapter = self.manager.adapter(exchange)
+            for s, symbol in enumerate(store.symbols):
+                if symbol_filter is None or s in symbol_filter:
+                    adapter.add_market(symbol)
+
+    def _emit(self, store: TickStore, frame: np.ndarray):
+        exchange = store.exchanges[int(frame["exchange"][0])]
+        adapter = self.manager.adapter(exchange)
+        tickers = []
+        for rec in frame.tolist():
+            _, ts_ms, _, sym, bid, ask, bid_size, ask_size, last = rec
+            tickers.append({
+                "symbol": store.symbols[sym],
+                "timestamp": ts_ms,
+                "bid": None if bid != bid else bid,
+                "ask": None if ask != ask else ask,
+                "bidVolume": None if bid_size != bid_size else bid_size,
+                "askVolume": None if ask_size != ask_size else ask_size,
+                "last": None if last != last else last,
+            })
+        self.ticks += len(tickers)
+        adapter.emit(tickers)
+
+    def summary(self, first_ms: Optional[int], last_ms: Optional[int], wall: float) -> Dict[str, Any]:
+        simulated = (last_ms - first_ms) / 1000 if first_ms is not None else 0.0
+        profits = [t["net_profit"] for t in self.trades]
+        params = asdict(self.config)
+        top_symbols = sorted(self.by_symbol.items(), key=lambda kv: kv[1], reverse=True)[:10]
+        return {
+            "params": params,
+            "ticks": self.ticks,
+            "simulated_seconds": simulated,
+            "wall_seconds": round(wall, 3),
+            "speedup": round(simulated / wall, 1) if wall else None,
+            "opportunities": {
+                "events": self.opportunity_events,
+                "windows": self.opportunity_windows,
+                "top_symbols": dict(top_symbols),
+                "triangular_active": len(self.triangular.active) if self.triangular else 0,
+            },
+            "trades": {
+                "executed": len(self.trades),
+                "rejected_slippage": self.rejected_slippage,
+                "rejected_ai": self.rejected_ai,
+                "rejected_no_quote": self.rejected_no_quote,
+                "wins": sum(1 for p in profits if p > 0),
+                "losses": sum(1 for p in profits if p <= 0),
+                "total_pnl_usd": round(sum(profits), 4),
+                "avg_pnl_usd": round(sum(profits) / len(profits), 4) if profits else 0.0,
+                "best_usd": round(max(profits), 4) if profits else 0.0,
+                "worst_usd": round(min(profits), 4) if profits else 0.0,
+            },
+        }
+
+
+def run_replay(config: ReplayConfig) -> Dict[str, Any]:
+    """Replay one recording with one parameter set."""
+    return ReplaySession(config).run()
+
+
+def run_sweep(configs: List[ReplayConfig], max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Replay several parameter sets in parallel, one process per run; results keep input order."""
+    if len(configs) == 1 or max_workers == 1:
+        return [run_replay(c) for c in configs]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(run_replay, configs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded ticks through the arbitrage detectors.")
+    parser.add_argument("--dir", default=settings.tick_store_dir, help="tick store directory")
+    parser.add_argument("--start-ms", type=int)
+    parser.add_argument("--end-ms", type=int)
+    parser.add_argument("--exchanges", nargs="+")
+    parser.add_argument("--symbols", nargs="+")
+    parser.add_argument("--mode", choices=["incremental", "vectorized"], default="incremental")
+    parser.add_argument("--triangular", action="store_true")
+    parser.add_argument("--min-profit", type=float, nargs="+", default=[settings.min_profit_threshold_pct])
+    parser.add_argument("--slippage", type=float, nargs="+", default=[settings.max_slippage_pct])
+    parser.add_argument("--ai-threshold", type=float, nargs="+", default=[settings.ai_decision_threshold])
+    parser.add_argument("--scorer", help="module:function scoring opportunities 0..1")
+    parser.add_argument("--delay-ms", type=int, default=250, help="detection-to-fill delay")
+    parser.add_argument("--max-quote-age", type=float, default=settings.quote_max_age_seconds,
+                        help="seconds before a quote is excluded (0 = never)")
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    base = ReplayConfig(
+        store_dir=args.dir,
+        start_ms=args.start_ms,
+        end_ms=args.end_ms,
+        exchanges=tuple(args.exchanges) if args.exchanges else None,
+        symbols=tuple(args.symbols) if args.symbols else None,
+        scan_mode=args.mode,
+        triangular=args.triangular,
+        scorer=args.scorer,
+        execution_delay_ms=args.delay_ms,
+        quote_max_age=args.max_quote_age,
+    )
+    configs = [
+        replace(base, min_profit_threshold_pct=p, max_slippage_pct=s, ai_decision_threshold=a)
+        for p, s, a in itertools.product(args.min_profit, args.slippage, args.ai_threshold)
+    ]
+    for result in run_sweep(configs, args.workers):
+        params, trades = result["params"], result["trades"]
+        print(json.dumps({
+            "min_profit_pct": params["min_profit_threshold_pct"],
+            "max_slippage_pct": params["max_slippage_pct"],
+            "ai_threshold": params["ai_decision_threshold"],
+            "ticks": result["ticks"],
+            "speedup": result["speedup"],
+            "windows": result["opportunities"]["windows"],
+            **trades,
+        }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+"""
+Shared-memory price book for the multi-process topology.
+
+Ingestion workers write exchange quotes into one ``multiprocessing.shared_memory``
+block; the engine (and anything else on the host) attaches by name and reads
+the same grid with no copies and no IPC round trip.
+
+Block layout (little-endian, 8-byte aligned sections):
+
+    header   "<4sHHIIQQQ" magic b"QSPB", layout version, n_fields, n_exchanges, n_symbols, names_len,
+                          base version (see price_book.initial_version), pid of the creating process
+    names    UTF-8 exchange then symbol names joined by "\\n", zero padded
+    seq      uint64[n_exchanges]            seqlock counter per exchange row
+    dropped  uint64[n_exchanges]            quotes for symbols outside the block, per row
+    grid     float64[n_fields][n_exchanges][n_symbols]   same fields as PriceBook; NaN = no quote
+
+Each exchange row has exactly one writer (the worker that owns that exchange).
+A writer makes the row's counter odd, writes a whole frame, then makes it even
+again. Readers that need a consistent grid copy it and re-read the rows whose
+counter was odd or moved meanwhile. That relies on plain stores becoming
+visible in program order, as on x86-64; weakly ordered CPUs (ARM) do not
+guarantee it. ``snapshot()`` stays zero-copy like PriceBook's and may observe
+a frame half-written.
+
+A row still being written after ``READ_TIMEOUT`` is never returned half-written:
+``frozen_snapshot()`` keeps the row from this process's previous frozen copy
+(NaN before the first), ``get()`` reads the quote from there, and the fallback
+is counted in ``stale_reads``.
+
+The exchange and symbol universe is fixed when the block is created; quotes
+for anything outside it are counted and dropped. Drops on an exchange's row
+are counted in the block, so every attached process sees them.
+
+``create()`` refuses a name whose block belongs to a running process, so a
+second engine started by mistake cannot take over the first one's feed; a
+block left behind by a process that is gone is replaced.
+
+A writer killed mid-frame leaves its row's counter odd. The next writer of
+that row calls ``claim()`` before writing, which rounds the counter back up
+to even.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from backend.services.price_book import (
+    ASK, ASK_SIZE, BID, BID_SIZE, FIELDS, TIMESTAMP, PriceBookSnapshot, _num, initial_version,
+)
+
+logger = logging.getLogger(__name__)
+
+BOOK_MAGIC = b"QSPB"
+BOOK_LAYOUT_VERSION = 4
+_HEADER = struct.Struct("<4sHHIIQQQ")
+# How long a reader waits for an in-flight frame to finish before falling back to the
+# row's last consistent copy (a preempted or killed writer can hold a row open indefinitely)
+READ_TIMEOUT = 0.02
+
+
+def _align(offset: int) -> int:
+    return offset + (-offset % 8)
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    shm = shared_memory.SharedMemory(name=name)
+    # Before 3.13 attaching registers the block with the resource tracker, which
+    # unlinks whatever is still registered when it exits. Children of the creating
+    # process share its tracker, so that only happens once the whole tree is gone;
+    # a process started on its own has a private tracker and must not own the block.
+    if multiprocessing.parent_process() is None:
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+    return shm
+
+
+def _process_alive(pid: int) -> bool:
+    if os.name == "nt":
+        # Windows frees a block with its last handle, so an existing one always has a live holder
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # alive, owned by another user
+    return True
+
+
+class SharedPriceBook:
+    """PriceBook-compatible (exchange x symbol) grid in shared memory, seqlocked per exchange row."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool = False):
+        self.shm = shm
+        self.owner = owner
+        (magic, layout, n_fields, n_exchanges, n_symbols, names_len,
+         self._base_version, self.creator_pid) = _HEADER.unpack_from(shm.buf)
+        if magic != BOOK_MAGIC or layout != BOOK_LAYOUT_VERSION or n_fields != len(FIELDS):
+            raise ValueError(f"Shared memory '{shm.name}' is not a price book (magic={magic!r}, layout={layout})")
+        offset = _HEADER.size
+        names = bytes(shm.buf[offset:offset + names_len]).decode().split("\n") if names_len else []
+        self.exchanges: List[str] = names[:n_exchanges]
+        self.symbols: List[str] = names[n_exchanges:]
+        self.exchange_ids: Dict[str, int] = {name: i for i, name in enumerate(self.exchanges)}
+        self.symbol_ids: Dict[str, int] = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+        offset = _align(offset + names_len)
+        self._seq = np.ndarray((n_exchanges,), dtype="<u8", buffer=shm.buf, offset=offset)
+        offset += self._seq.nbytes
+        self._dropped = np.ndarray((n_exchanges,), dtype="<u8", buffer=shm.buf, offset=offset)
+        offset += self._dropped.nbytes
+        self._grid = np.ndarray((len(FIELDS), n_exchanges, n_symbols), dtype="<f8", buffer=shm.buf, offset=offset)
+        self._unknown_exchange = 0  # quotes for exchanges outside the block, seen by this process
+        self.stale_reads = 0  # rows served from the last consistent copy while a writer was stuck mid-frame
+        self._frozen: Optional[PriceBookSnapshot] = None  # last frozen_snapshot(); every row consistent
+        self._frozen_seq = np.zeros(n_exchanges, dtype="<u8")
+
+    # --- Lifecycle ---
+
+    @staticmethod
+    def size_for(exchanges: Sequence[str], symbols: Sequence[str]) -> int:
+        names = "\n".join([*exchanges, *symbols]).encode()
+        return _align(_HEADER.size + len(names)) + 16 * len(exchanges) + 8 * len(FIELDS) * len(exchanges) * len(symbols)
+
+    @classmethod
+    def create(cls, name: str, exchanges: Sequence[str], symbols: Sequence[str]) -> "SharedPriceBook":
+        """Allocate and initialise the block (empty quotes); the caller owns and must unlink it."""
+        exchanges, symbols = list(dict.fromkeys(exchanges)), list(dict.fromkeys(symbols))
+        names = "\n".join([*exchanges, *symbols]).encode()
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=cls.size_for(exchanges, symbols))
+        except FileExistsError:
+            cls._remove_stale(name)
+            shm = shared_memory.SharedMemory(name=name, create=True, size=cls.size_for(exchanges, symbols))
+        _HEADER.pack_into(shm.buf, 0, BOOK_MAGIC, BOOK_LAYOUT_VERSION, len(FIELDS),
+                          len(exchanges), len(symbols), len(names), initial_version(), os.getpid())
+        shm.buf[_HEADER.size:_HEADER.size + len(names)] = names
+        book = cls(shm, owner=True)
+        book._seq[:] = 0
+        book._dropped[:] = 0
+        book._grid[:] = np.nan
+        logger.info(f"Shared price book '{name}' created: {len(exchanges)} exchanges x {len(symbols)} symbols, "
+                    f"{shm.size / 1024:.0f} KiB")
+        return book
+
+    @staticmethod
+    def _remove_stale(name: str):
+        """Unlink a block left behind by a crashed run; raise FileExistsError if its creator still runs."""
+        existing = shared_memory.SharedMemory(name=name)
+        header = bytes(existing.buf[:_HEADER.size])
+        existing.close()
+        magic, layout, *_, pid = _HEADER.unpack(header) if len(header) == _HEADER.size else (None, None, 0)
+        if magic != BOOK_MAGIC or layout != BOOK_LAYOUT_VERSION:
+            raise FileExistsError(f"Shared memory '{name}' exists and is not a price book of this version; "
+                                  f"remove it (/dev/shm/{name} on Linux) or set SHARED_PRICE_BOOK_NAME")
+        if _process_alive(pid):
+            raise FileExistsError(f"Shared price book '{name}' belongs to running process {pid}; "
+                                  f"stop that engine or set SHARED_PRICE_BOOK_NAME")
+        logger.warning(f"Shared price book '{name}' left behind by process {pid}, replacing it")
+        existing.unlink()
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedPriceBook":
+        return cls(_attach(name))
+
+    def close(self):
+        # Views into the buffer must go before the mapping can close
+        self._seq = self._dropped = self._grid = self._frozen = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # A zero-copy snapshot is still referenced; the mapping goes with the process
+            logger.debug(f"Shared price book '{self.shm.name}' still in use, left mapped")
+
+    def unlink(self):
+        if self.owner:
+            self.shm.unlink()
+
+    # --- Writes (one writer per exchange row) ---
+
+    def claim(self, exchanges: Iterable[str]):
+        """Become the writer of these rows, completing any frame a killed writer left open."""
+        for name in exchanges:
+            e = self.exchange_ids.get(name)
+            if e is not None and self._seq[e] % 2:
+                logger.warning(f"Shared price book: row {name} was left mid-write, reclaiming")
+                self._seq[e] += 1
+
+    def update(self, exchange: str, symbol: str, bid: float, ask: float,
+               bid_size: float = np.nan, ask_size: float = np.nan,
+               timestamp: Optional[float] = None):
+        e = self.exchange_ids.get(exchange)
+        s = self.symbol_ids.get(symbol)
+        if e is None:
+            self._unknown_exchange += 1
+            return
+        if s is None:
+            self._dropped[e] += 1
+            return
+        seq, grid = self._seq, self._grid
+        seq[e] += 1  # odd: row being written
+        grid[BID, e, s] = bid
+        grid[ASK, e, s] = ask
+        grid[BID_SIZE, e, s] = bid_size
+        grid[ASK_SIZE, e, s] = ask_size
+        grid[TIMESTAMP, e, s] = time.time() * 1000 if timestamp is None else timestamp
+        seq[e] += 1
+
+    def update_ticker(self, exchange: str, ticker: Dict[str, Any]):
+        self.apply_tickers(exchange, (ticker,))
+
+    def apply_tickers(self, exchange: str, tickers: Iterable[Dict[str, Any]]):
+        """Write a ccxt ticker frame under a single seqlock section."""
+        e = self.exchange_ids.get(exchange)
+        if e is None:
+            self._unknown_exchange += sum(1 for _ in tickers)
+            return
+        seq, grid, symbol_ids = self._seq, self._grid, self.symbol_ids
+        seq[e] += 1
+        dropped = 0
+        try:
+            for ticker in tickers:
+                s = symbol_ids.get(ticker["symbol"])
+                if s is None:
+                    dropped += 1
+                    continue
+                ts = ticker.get("timestamp")
+                grid[BID, e, s] = _num(ticker.get("bid"))
+                grid[ASK, e, s] = _num(ticker.get("ask"))
+                grid[BID_SIZE, e, s] = _num(ticker.get("bidVolume"))
+                grid[ASK_SIZE, e, s] = _num(ticker.get("askVolume"))
+                grid[TIMESTAMP, e, s] = time.time() * 1000 if ts is None else ts
+        finally:
+            seq[e] += 1
+            if dropped:
+                self._dropped[e] += dropped
+
+    # --- Reads ---
+
+    @property
+    def dropped(self) -> int:
+        """Quotes dropped by every writer of the block, plus this process's quotes for unknown exchanges."""
+        return int(self._dropped.sum()) + self._unknown_exchange
+
+    @property
+    def version(self) -> int:
+        """Base version plus completed row writes; changes whenever any quote does."""
+        return self._base_version + (int(self._seq.sum()) >> 1)
+
+    def snapshot(self) -> PriceBookSnapshot:
+        """Zero-copy read-only view of the shared grid (may include a frame being written)."""
+        view = self._grid.view()
+        view.flags.writeable = False
+        return PriceBookSnapshot(tuple(self.exchanges), tuple(self.symbols), view, self.version)
+
+    def frozen_snapshot(self) -> PriceBookSnapshot:
+        """Consistent private copy: every exchange row as of a completed frame."""
+        live, seq = self._grid, self._seq
+        before = seq.copy()
+        grid = live.copy()
+        after = seq.copy()
+        # Rows a writer touched during the bulk copy are re-read on their own
+        for e in np.flatnonzero((before != after) | (before % 2 == 1)):
+            deadline = time.perf_counter() + READ_TIMEOUT
+            while True:
+                start = int(seq[e])
+                grid[:, e] = live[:, e]
+                end = int(seq[e])
+                if start == end and start % 2 == 0:
+                    after[e] = end
+                    break
+                if time.perf_counter() > deadline:
+                    # Writer stuck mid-frame (or killed before claim()); never hand out the torn row
+                    self.stale_reads += 1
+                    logger.debug(f"Shared price book: row {self.exchanges[e]} still changing "
+                                 f"after {READ_TIMEOUT * 1000:g} ms, keeping its last consistent copy")
+                    grid[:, e], after[e] = self._last_row(e)
+                    break
+        grid.flags.writeable = False
+        self._frozen = PriceBookSnapshot(tuple(self.exchanges), tuple(self.symbols), grid,
+                                         self._base_version + (int(after.sum()) >> 1))
+        self._frozen_seq = after
+        return self._frozen
+
+    def _last_row(self, e: int):
+        """Row ``e`` of the previous frozen copy and its counter; NaN and 0 before the first."""
+        if self._frozen is None:
+            return np.full((len(FIELDS), len(self.symbols)), np.nan), 0
+        return self._frozen.grid[:, e], self._frozen_seq[e]
+
+    def get(self, exchange: str, symbol: str) -> Optional[Dict[str, float]]:
+        e = self.exchange_ids.get(exchange)
+        s = self.symbol_ids.get(symbol)
+        if e is None or s is None:
+            return None
+        deadline = time.perf_counter() + READ_TIMEOUT
+        while True:
+            before = int(self._seq[e])
+            cell = self._grid[:, e, s].tolist()
+            if before % 2 == 0 and before == int(self._seq[e]):
+                break
+            if time.perf_counter() > deadline:
+                self.stale_reads += 1
+                cell = self._last_row(e)[0][:, s].tolist()
+                break
+        if cell[TIMESTAMP] != cell[TIMESTAMP]:
+            return None
+        return dict(zip(FIELDS, cell))
+
+    def to_dict(self) -> Dict[str, Dict[str, Dict[str, Optional[float]]]]:
+        return self.frozen_snapshot().to_dict()
+
+    @property
+    def nbytes(self) -> int:
+        return self._grid.nbytes
+
+
+class SharedBookFollower:
+    """
+    Turns changes in a SharedPriceBook back into ticker batches.
+
+    Tick-driven consumers (the incremental and triangular detectors) run in
+    the engine process, which no longer sees the exchange streams. Every
+    ``interval`` the follower diffs a consistent copy of the grid against the
+    previous one and hands each exchange's changed cells to ``sink(exchange,
+    tickers)``, normally ``TickIngestQueue.publish``.
+    """
+
+    def __init__(self, book: SharedPriceBook, sink: Callable[[str, List[Dict[str, Any]]], None],
+                 interval: float = 0.01):
+        self.book = book
+        self.sink = sink
+        self.interval = interval
+        self._last: Optional[PriceBookSnapshot] = None
+        self._task: Optional[asyncio.Task] = None
+        self.polls = 0
+        self.tickers = 0
+
+    def poll(self) -> int:
+        """Forward cells changed since the previous poll; returns how many."""
+        prev = self._last
+        if prev is not None and prev.version == self.book.version:
+            return 0
+        snap = self.book.frozen_snapshot()
+        self._last = snap
+        self.polls += 1
+        quoted = ~np.isnan(snap.timestamp)
+        if prev is None:
+            changed = quoted
+        else:
+            same = (snap.grid == prev.grid) | (np.isnan(snap.grid) & np.isnan(prev.grid))
+            changed = ~same.all(axis=0) & quoted
+        forwarded = 0
+        for e in np.flatnonzero(changed.any(axis=1)):
+            tickers = []
+            for s in np.flatnonzero(changed[e]):
+                bid, ask, bid_size, ask_size, ts = snap.grid[:, e, s].tolist()
+                tickers.append({
+                    "symbol": snap.symbols[s],
+                    "bid": None if bid != bid else bid,
+                    "ask": None if ask != ask else ask,
+                    "bidVolume": None if bid_size != bid_size else bid_size,
+                    "askVolume": None if ask_size != ask_size else ask_size,
+                    "timestamp": ts,
+                })
+            # Received here when polled (the sink stamps it); worker-side queueing is not this process's latency
+            self.sink(snap.exchanges[e], tickers)
+            forwarded += len(tickers)
+        self.tickers += forwarded
+        return forwarded
+
+    async def start(self):
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run(), name="shared-book-follower")
+        logger.info(f"Following shared price book '{self.book.shm.name}' every {self.interval * 1000:.0f} ms")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Shared price book follow failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"book": self.book.shm.name, "version": self.book.version, "polls": self.polls,
+                "tickers_forwarded": self.tickers, "dropped_quotes": self.book.dropped,
+                "stale_reads": self.book.stale_reads}
@@ -0,0 +1,200 @@
+"""
+Versioned, pre-serialized snapshots for the hot REST endpoints.
+
+Engines bump a ``version`` counter whenever their state changes. A snapshot
+rebuilds and encodes its payload at most once per version and wire format,
+on the first request that sees the new version; every other request for that
+version is served the cached bytes, and a client that sends the ETag back in
+``If-None-Match`` gets an empty 304.
+
+Opportunities are kept sorted by ``net_profit_pct`` and encoded one by one,
+so a ``min_profit`` filter is a binary search plus a join of the encoded
+prefix rather than a filter and a fresh encode per request.
+"""
+
+import bisect
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response
+
+from backend.services.price_book import PriceBook, PriceBookSnapshot
+from backend.services.wire import (
+    COLUMNAR, ENCODERS, JSON, MEDIA_TYPES, MSGPACK, available, encode_price_grid, msgpack, negotiate,
+)
+
+@dataclass(frozen=True)
+class Encoded:
+    """One serialized response body and the ETag identifying it (None = not cacheable)."""
+    body: bytes
+    etag: Optional[str]
+    media_type: str = MEDIA_TYPES[JSON]
+
+
+def _etag(name: str, *parts: Any) -> str:
+    # Built from source versions only, which every API worker shares, so any worker can answer a 304
+    return '"' + "-".join([name, *map(str, parts)]) + '"'
+
+
+def not_modified(request: Request, etag: Optional[str]) -> bool:
+    header = request.headers.get("if-none-match")
+    if not etag or not header:
+        return False
+    tags = {t.strip().removeprefix("W/") for t in header.split(",")}
+    return etag in tags or "*" in tags
+
+
+def negotiate_format(request: Request, offered: Iterable[str]) -> str:
+    """Wire format from ``?format=`` or ``Accept``; 406 when none of ``offered`` is acceptable."""
+    offered = list(offered)
+    fmt = negotiate(request.headers.get("accept"), request.query_params.get("format"), offered)
+    if fmt is None:
+        raise HTTPException(status_code=406, detail=f"Available formats: {', '.join(available(offered))}")
+    return fmt
+
+
+def respond(request: Request, encoded: Encoded) -> Response:
+    """The cached body, or 304 when the client already has this version."""
+    headers = {"Cache-Control": "no-cache", "Vary": "Accept"}
+    if encoded.etag:
+        headers["ETag"] = encoded.etag
+    if not_modified(request, encoded.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=encoded.body, media_type=encoded.media_type, headers=headers)
+
+
+class PricesSnapshot:
+    """
+    ``{"prices": ..., "timestamp": ...}`` of a PriceBook, encoded once per book version and format.
+
+    Encodes from a frozen copy of the grid, so ``get()`` may run on a worker
+    thread while ticks keep arriving. The bodies of the current version are
+    published as one immutable ``(version, {format: Encoded})`` pair, which
+    ``cached()`` reads without the lock and never sees half updated.
+    """
+
+    formats = (JSON, MSGPACK, COLUMNAR)
+
+    def __init__(self, price_book: PriceBook):
+        self.price_book = price_book
+        self._lock = threading.Lock()
+        self._current: Tuple[Optional[int], Dict[str, Encoded]] = (None, {})
+        self._snap: Optional[PriceBookSnapshot] = None
+        self._payload: Optional[Dict[str, Any]] = None
+        self._built_at = 0.0
+        self.builds = 0
+        self.hits = 0
+
+    def cached(self, fmt: str = JSON) -> Optional[Encoded]:
+        """The body for the current book version if it is already encoded; never builds."""
+        version, encoded = self._current
+        encoded = encoded.get(fmt) if version == self.price_book.version else None
+        if encoded is not None:
+            self.hits += 1
+        return encoded
+
+    def get(self, fmt: str = JSON) -> Encoded:
+        with self._lock:
+            version, bodies = self._current
+            if self.price_book.version != version:
+                snap = self.price_book.frozen_snapshot()
+                version, bodies = snap.version, {}
+                self._current, self._snap, self._payload = (version, bodies), snap, None
+                # timestamp is when this version was first served, not per request
+                self._built_at = time.time()
+            encoded = bodies.get(fmt)
+            if encoded is not None:
+                self.hits += 1
+                return encoded
+
+            if fmt == COLUMNAR:
+                body = encode_price_grid(self._snap, self._built_at * 1000)
+            else:
+                if self._payload is None:
+                    self._payload = {
+                        "prices": self._snap.to_dict(),
+                        "timestamp": datetime.utcfromtimestamp(self._built_at).isoformat(),
+                    }
+                body = ENCODERS[fmt](self._payload)
+            encoded = Encoded(body, _etag("prices", version, fmt), MEDIA_TYPES[fmt])
+            self._current = (version, {**bodies, fmt: encoded})
+            self.builds += 1
+            return encoded
+
+    def stats(self) -> Dict[str, Any]:
+        version, bodies = self._current
+        return {"version": version, "builds": self.builds, "hits": self.hits,
+                "bytes": {fmt: len(e.body) for fmt, e in bodies.items()}}
+
+
+def _wrap_json(items: List[bytes]) -> bytes:
+    return b'{"opportunities":[' + b",".join(items) + b'],"count":' + str(len(items)).encode() + b"}"
+
+
+def _wrap_msgpack(items: List[bytes]) -> bytes:
+    packer = msgpack.Packer(use_bin_type=True)
+    return b"".join((
+        packer.pack_map_header(2), packer.pack("opportunities"),
+        packer.pack_array_header(len(items)), *items,
+        packer.pack("count"), packer.pack(len(items)),
+    ))
+
+
+_WRAPPERS = {JSON: _wrap_json, MSGPACK: _wrap_msgpack}
+
+
+class OpportunitiesSnapshot:
+    """
+    ``{"opportunities": [...], "count": n}`` filtered by ``min_profit``.
+
+    ``version()`` returns a hashable that changes whenever the source's result
+    may have; None means the source is unversioned and is rebuilt every call.
+    """
+
+    formats = (JSON, MSGPACK)
+
+    def __init__(self, source: Callable[[], Awaitable[Iterable[Dict[str, Any]]]],
+                 version: Callable[[], Optional[Hashable]]):
+        self.source = source
+        self.version = version
+        self._version: Optional[Hashable] = None
+        self._built = False
+        self._opportunities: List[Dict[str, Any]] = []
+        self._keys: List[float] = []               # -net_profit_pct, ascending
+        self._items: Dict[str, List[bytes]] = {}   # format -> encoded opportunities, same order
+        self._bodies: Dict[Tuple[str, int], bytes] = {}
+        self.builds = 0
+        self.hits = 0
+
+    async def _rebuild(self, version: Optional[Hashable]):
+        self._opportunities = sorted(await self.source(), key=lambda o: o["net_profit_pct"], reverse=True)
+        self._keys = [-o["net_profit_pct"] for o in self._opportunities]
+        self._items = {}
+        self._bodies = {}
+        self._version, self._built = version, True
+        self.builds += 1
+
+    async def get(self, min_profit: float = 0.0, fmt: str = JSON) -> Encoded:
+        version = self.version()
+        if version is None or not self._built or version != self._version:
+            await self._rebuild(version)
+        else:
+            self.hits += 1
+        count = bisect.bisect_right(self._keys, -min_profit)
+        body = self._bodies.get((fmt, count))
+        if body is None:
+            items = self._items.get(fmt)
+            if items is None:
+                encode = ENCODERS[fmt]
+                items = self._items[fmt] = [encode(o) for o in self._opportunities]
+            body = self._bodies[(fmt, count)] = _WRAPPERS[fmt](items[:count])
+        # The prefix length identifies the filtered body within a version
+        etag = _etag("opportunities", version, count, fmt) if version is not None else None
+        return Encoded(body, etag, MEDIA_TYPES[fmt])
+
+    def stats(self) -> Dict[str, Any]:
+        return {"version": None if self._version is None else str(self._version),
+                "builds": self.builds, "hits": self.hits, "opportunities": len(self._opportunities)}
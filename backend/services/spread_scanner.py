@@ -0,0 +1,278 @@
+"""
+Vectorized cross-exchange spread scanner for Quantum Arbitrage Engine.
+
+Evaluates every (buy exchange, sell exchange, symbol) combination at once from
+the price book: fee-adjusted asks (E x S) are broadcast against fee-adjusted
+bids (E x S) into an E x E x S matrix of net spreads, and the top-K are picked
+with argpartition instead of sorting everything.
+
+Quotes older than ``max_quote_age`` seconds are masked out before the
+broadcast, and symbols left with fewer than two fresh venues are dropped from
+the matrix altogether, so a feed that went quiet neither produces phantom
+spreads nor costs evaluation time.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from backend.models.tables import ExchangeConfig
+from backend.services.price_book import PriceBook, PriceBookSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Fallback taker fees (fraction) when no ExchangeConfig row exists
+DEFAULT_TAKER_FEES: Dict[str, float] = {
+    "binance": 0.001,
+    "kraken": 0.0026,
+    "bybit": 0.001,
+    "kucoin": 0.001,
+    "okx": 0.001,
+    "gate": 0.0015,
+    "mexc": 0.001,
+}
+DEFAULT_TAKER_FEE = 0.001
+
+
+async def load_taker_fees(session) -> Dict[str, float]:
+    """Read per-exchange taker fees from the exchange_configs table."""
+    result = await session.execute(select(ExchangeConfig.exchange_name, ExchangeConfig.taker_fee))
+    return {name.lower(): float(fee) for name, fee in result.all() if fee is not None}
+
+
+def net_spreads(fees: np.ndarray, bid: np.ndarray, ask: np.ndarray) -> np.ndarray:
+    """(E, E, S) net spread of buying at ``ask[i]`` and selling at ``bid[j]`` after taker fees; -inf when impossible."""
+    fees = fees[:, None]
+    cost = ask * (1.0 + fees)       # (E, S) effective buy price
+    proceeds = bid * (1.0 - fees)   # (E, S) effective sell price
+    with np.errstate(invalid="ignore", divide="ignore"):
+        net = proceeds[None, :, :] / cost[:, None, :] - 1.0
+    net[~np.isfinite(net)] = -np.inf
+    idx = np.arange(len(fees))
+    net[idx, idx, :] = -np.inf
+    return net
+
+
+def rank_spreads(fees: np.ndarray, bid: np.ndarray, ask: np.ndarray, threshold: float,
+                 top_k: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (buy, sell, column, net) of the top-K net spreads at or above ``threshold``, best first.
+
+    Pure array-in/array-out, so it can run in a worker thread or process.
+    """
+    net = net_spreads(fees, bid, ask)
+    flat = net.ravel()
+    candidates = np.flatnonzero(flat >= threshold)
+    if candidates.size > top_k:
+        part = np.argpartition(flat[candidates], -top_k)[-top_k:]
+        candidates = candidates[part]
+    order = candidates[np.argsort(flat[candidates])[::-1]]
+    buy, sell, col = np.unravel_index(order, net.shape)
+    return buy, sell, col, flat[order]
+
+
+def _same_opportunity(x: Dict[str, Any], y: Dict[str, Any]) -> bool:
+    return x.keys() == y.keys() and all(x[k] == y[k] for k in x if k != "detected_at")
+
+
+def same_opportunities(a: List[Dict[str, Any]], b: List[Dict[str, Any]]) -> bool:
+    """True when two opportunity lists differ at most in their ``detected_at`` stamps."""
+    return len(a) == len(b) and all(_same_opportunity(x, y) for x, y in zip(a, b))
+
+
+def changed_opportunities(previous: List[Dict[str, Any]], current: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Opportunities in ``current`` that are new, or changed beyond ``detected_at``, since ``previous``."""
+    before = {(o["symbol"], o["buy_exchange"], o["sell_exchange"]): o for o in previous}
+    changed = []
+    for opportunity in current:
+        prev = before.get((opportunity["symbol"], opportunity["buy_exchange"], opportunity["sell_exchange"]))
+        if prev is None or not _same_opportunity(prev, opportunity):
+            changed.append(opportunity)
+    return changed
+
+
+class SpreadScanner:
+    """Whole-market fee-aware spread scan over a PriceBook."""
+
+    def __init__(self, price_book: PriceBook, taker_fees: Optional[Dict[str, float]] = None,
+                 top_k: int = 20, min_net_profit_pct: float = 0.0, trade_size_usd: float = 100.0,
+                 max_quote_age: Optional[float] = None, clock: Optional[Callable[[], float]] = None):
+        self.price_book = price_book
+        self.taker_fees: Dict[str, float] = dict(DEFAULT_TAKER_FEES)
+        if taker_fees:
+            self.set_fees(taker_fees)
+        self.top_k = top_k
+        self.min_net_profit_pct = min_net_profit_pct
+        self.trade_size_usd = trade_size_usd
+        # Seconds before a quote is excluded (None/0 = never); ``clock`` returns epoch ms (replay passes its own)
+        self.max_quote_age = max_quote_age
+        self.clock = clock or (lambda: time.time() * 1000)
+
+        # Optional per-opportunity hook, e.g. DepthEstimator.enrich
+        self.enrich: Optional[Callable[[Dict[str, Any]], Any]] = None
+        # Optional ``offload(stage, fn, *args, pure=...)`` for the ranking, e.g. EngineRuntime.run
+        self.offload: Optional[Callable[..., Awaitable[Any]]] = None
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+        self.opportunities: List[Dict[str, Any]] = []
+        self.last_scan_ms = 0.0
+        self.scans = 0
+        self.stale_quotes = 0       # quoted cells excluded by the last scan
+        self.symbols_scanned = 0    # symbols with at least two fresh venues in the last scan
+        self.version = 0  # bumped whenever ``opportunities`` changes
+        self._task: Optional[asyncio.Task] = None
+
+    def set_fees(self, taker_fees: Dict[str, float]):
+        self.taker_fees.update({name.lower(): fee for name, fee in taker_fees.items()})
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]):
+        """Call ``listener(opportunity)`` for every new or changed opportunity found by the interval scan."""
+        self._listeners.append(listener)
+
+    def fee_vector(self, exchanges) -> np.ndarray:
+        return np.array([self.taker_fees.get(e.lower(), DEFAULT_TAKER_FEE) for e in exchanges])
+
+    def fresh_mask(self, snap: PriceBookSnapshot) -> Optional[np.ndarray]:
+        """(E, S) True where the quote is younger than ``max_quote_age``; None when ages are not checked."""
+        if not self.max_quote_age:
+            return None
+        # NaN timestamps (never quoted) compare False
+        return snap.timestamp >= self.clock() - self.max_quote_age * 1000.0
+
+    def net_spread_matrix(self, snap: PriceBookSnapshot, fresh: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Net spread (fraction) for buying on exchange i and selling on j, per symbol.
+
+        Shape (E, E, S); impossible, unquoted or (with ``fresh``) stale
+        combinations are -inf.
+        """
+        bid, ask = snap.bid, snap.ask
+        if fresh is not None:
+            bid, ask = np.where(fresh, bid, np.nan), np.where(fresh, ask, np.nan)
+        return net_spreads(self.fee_vector(snap.exchanges), bid, ask)
+
+    def _fresh_quotes(self, snap: PriceBookSnapshot) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(bid, ask, columns): quotes of the symbols with two fresh venues, stale cells NaN."""
+        columns = np.arange(len(snap.symbols))
+        fresh = self.fresh_mask(snap)
+        if fresh is None:
+            self.symbols_scanned = len(columns)
+            return snap.bid, snap.ask, columns
+        self.stale_quotes = int(np.count_nonzero(~fresh & ~np.isnan(snap.timestamp)))
+        # Only symbols with two fresh venues can produce a spread
+        columns = np.flatnonzero(np.count_nonzero(fresh, axis=0) >= 2)
+        self.symbols_scanned = len(columns)
+        return np.where(fresh, snap.bid, np.nan)[:, columns], np.where(fresh, snap.ask, np.nan)[:, columns], columns
+
+    def _opportunities(self, snap: PriceBookSnapshot, columns: np.ndarray, bid: np.ndarray, ask: np.ndarray,
+                       ranked: Optional[Tuple[np.ndarray, ...]]) -> List[Dict[str, Any]]:
+        results: List[Dict[str, Any]] = []
+        if ranked is None:
+            return results
+        detected_at = datetime.utcnow().isoformat()
+        for buy, sell, col, net in zip(*ranked):
+            buy_price = float(ask[buy, col])
+            sell_price = float(bid[sell, col])
+            net_pct = float(net) * 100.0
+            results.append({
+                "symbol": snap.symbols[columns[col]],
+                "arb_type": "cross_exchange",
+                "buy_exchange": snap.exchanges[buy],
+                "sell_exchange": snap.exchanges[sell],
+                "buy_price": buy_price,
+                "sell_price": sell_price,
+                "spread_pct": (sell_price / buy_price - 1.0) * 100.0,
+                "net_profit_pct": net_pct,
+                "estimated_profit_usd": self.trade_size_usd * net_pct / 100.0,
+                "detected_at": detected_at,
+            })
+        if self.enrich is not None:
+            for opportunity in results:
+                self.enrich(opportunity)
+        return results
+
+    def scan(self, snap: Optional[PriceBookSnapshot] = None, top_k: Optional[int] = None,
+             min_net_profit_pct: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Return the top-K net spreads at or above the profit threshold, best first."""
+        started = time.perf_counter()
+        snap = snap or self.price_book.snapshot()
+        top_k = self.top_k if top_k is None else top_k
+        threshold = (self.min_net_profit_pct if min_net_profit_pct is None else min_net_profit_pct) / 100.0
+
+        bid, ask, columns = self._fresh_quotes(snap)
+        ranked = None
+        if len(snap.exchanges) >= 2 and len(columns) and top_k > 0:
+            ranked = rank_spreads(self.fee_vector(snap.exchanges), bid, ask, threshold, top_k)
+        results = self._opportunities(snap, columns, bid, ask, ranked)
+
+        self.last_scan_ms = (time.perf_counter() - started) * 1000
+        self.scans += 1
+        return results
+
+    async def scan_offloaded(self) -> List[Dict[str, Any]]:
+        """``scan()`` with the spread ranking run through ``self.offload`` (e.g. EngineRuntime.run)."""
+        started = time.perf_counter()
+        # Frozen copy: the executor reads it while ticks keep landing in the live book
+        snap = self.price_book.frozen_snapshot()
+        bid, ask, columns = self._fresh_quotes(snap)
+        ranked = None
+        if len(snap.exchanges) >= 2 and len(columns) and self.top_k > 0:
+            ranked = await self.offload(
+                "scan", rank_spreads, self.fee_vector(snap.exchanges), bid, ask,
+                self.min_net_profit_pct / 100.0, self.top_k, pure=True,
+            )
+        results = self._opportunities(snap, columns, bid, ask, ranked)
+
+        self.last_scan_ms = (time.perf_counter() - started) * 1000
+        self.scans += 1
+        return results
+
+    # --- Interval scanning (same lifecycle as the other engines) ---
+
+    async def start(self, interval: float = 1.0):
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run(interval), name="spread-scanner")
+        logger.info(f"Vectorized spread scanner started (interval={interval}s, top_k={self.top_k})")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, interval: float):
+        while True:
+            try:
+                if self.offload is not None:
+                    results = await self.scan_offloaded()
+                else:
+                    results = self.scan()
+                previous = self.opportunities
+                # Unchanged results keep their version (and first detection time), so snapshots and ETags hold
+                if not same_opportunities(previous, results):
+                    self.opportunities = results
+                    self.version += 1
+                if self._listeners:
+                    for opportunity in changed_opportunities(previous, results):
+                        for listener in self._listeners:
+                            listener(opportunity)
+            except Exception as e:
+                logger.error(f"Spread scan failed: {e}")
+            await asyncio.sleep(interval)
+
+    async def get_opportunities(self) -> List[Dict[str, Any]]:
+        return self.opportunities
+
+    def stats(self) -> Dict[str, Any]:
+        return {"scans": self.scans, "last_scan_ms": round(self.last_scan_ms, 3),
+                "opportunities": len(self.opportunities), "symbols_scanned": self.symbols_scanned,
+                "stale_quotes": self.stale_quotes, "max_quote_age_sec": self.max_quote_age}
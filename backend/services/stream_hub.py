@@ -0,0 +1,421 @@
+"""
+Push-based market data streaming for Quantum Arbitrage Engine.
+
+One publish loop diffs every topic against what it last sent, serializes the
+delta once and puts the same encoded frame on the queue of every client
+subscribed to that topic. Each client has its own bounded queue and sender
+task, so a client that cannot keep up is disconnected instead of stalling the
+broadcast for everyone else.
+
+Topics:
+    prices         changed PriceBook cells, as {symbol: {exchange: quote}}
+    opportunities  new or changed opportunities keyed by "symbol|buy|sell", plus removed keys
+    system         the full status dict, whenever it changes
+
+Protocol (JSON text frames, or MessagePack binary frames with ?format=msgpack):
+    -> {"action": "subscribe", "topics": ["prices", "opportunities"]}
+    -> {"action": "unsubscribe", "topics": ["prices"]}
+    <- {"type": "snapshot", "topic": "prices", "seq": 41, "data": {...}}
+    <- {"type": "delta", "topic": "prices", "seq": 42, "data": {...}, "removed": [...]}
+
+Every subscribe is answered with a snapshot; deltas follow it in ``seq`` order.
+Each frame is encoded once per wire format that has subscribers.
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import numpy as np
+from fastapi import WebSocket, WebSocketDisconnect
+
+from backend.services.price_book import PriceBook, PriceBookSnapshot
+from backend.services.wire import JSON, MSGPACK, available, encode_json, encode_msgpack, msgpack
+
+logger = logging.getLogger(__name__)
+
+Delta = Tuple[Any, List[str]]
+Frame = Union[str, bytes]  # str goes out as a text frame, bytes as a binary frame
+
+
+async def _call(source: Callable) -> Any:
+    result = source()
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+def encode(message: Dict[str, Any], fmt: str = JSON) -> Frame:
+    if fmt == MSGPACK:
+        return encode_msgpack(message)
+    return encode_json(message).decode()
+
+
+def opportunity_key(opportunity: Dict[str, Any]) -> str:
+    return f"{opportunity['symbol']}|{opportunity['buy_exchange']}|{opportunity['sell_exchange']}"
+
+
+# --- Topics ---
+
+class Topic(ABC):
+    """
+    A named stream of state.
+
+    ``poll()`` returns what changed since the previous poll (or None) and
+    ``state()`` the full state as of the last poll, which is what a new
+    subscriber's snapshot contains.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.seq = 0
+        self.lock = asyncio.Lock()
+        self._snapshot_seq = -1
+        self._snapshot_message: Optional[Dict[str, Any]] = None
+        self._snapshot_frames: Dict[str, Frame] = {}
+
+    @abstractmethod
+    async def poll(self) -> Optional[Delta]:
+        ...
+
+    @abstractmethod
+    def state(self) -> Any:
+        ...
+
+    def snapshot_frame(self, fmt: str = JSON) -> Frame:
+        """Encoded snapshot at the current seq; built once per seq and format however many clients join."""
+        if self._snapshot_seq != self.seq:
+            self._snapshot_seq = self.seq
+            self._snapshot_message = {
+                "type": "snapshot",
+                "topic": self.name,
+                "seq": self.seq,
+                "data": self.state(),
+                "timestamp": datetime.utcnow().isoformat(),
+            }
+            self._snapshot_frames = {}
+        frame = self._snapshot_frames.get(fmt)
+        if frame is None:
+            frame = self._snapshot_frames[fmt] = encode(self._snapshot_message, fmt)
+        return frame
+
+
+class PriceTopic(Topic):
+    """PriceBook cells whose bid/ask/sizes/timestamp changed since the last poll."""
+
+    def __init__(self, price_book: PriceBook, name: str = "prices"):
+        super().__init__(name)
+        self.price_book = price_book
+        self._last: Optional[PriceBookSnapshot] = None
+
+    async def poll(self) -> Optional[Delta]:
+        prev = self._last
+        if prev is not None and prev.version == self.price_book.version:
+            return None
+        snap = self.price_book.frozen_snapshot()
+        self._last = snap
+        if prev is None:
+            changed = None
+        else:
+            # The book may have grown since the last poll; new cells compare against NaN
+            old = np.full_like(snap.grid, np.nan)
+            _, e, s = prev.grid.shape
+            old[:, :e, :s] = prev.grid
+            same = (snap.grid == old) | (np.isnan(snap.grid) & np.isnan(old))
+            changed = ~same.all(axis=0)
+            if not changed.any():
+                return None
+        cells = snap.to_dict(changed)
+        return (cells, []) if cells else None
+
+    def state(self) -> Dict[str, Any]:
+        return self._last.to_dict() if self._last is not None else {}
+
+
+class KeyedTopic(Topic):
+    """A list of records (e.g. opportunities) diffed per key."""
+
+    def __init__(self, name: str, source: Callable[[], Iterable[Dict[str, Any]]],
+                 key: Callable[[Dict[str, Any]], str]):
+        super().__init__(name)
+        self.source = source
+        self.key = key
+        self._state: Dict[str, Dict[str, Any]] = {}
+
+    async def poll(self) -> Optional[Delta]:
+        # Copies, because producers may update their records in place
+        current = {self.key(item): dict(item) for item in await _call(self.source)}
+        previous = self._state
+        changed = {k: v for k, v in current.items() if previous.get(k) != v}
+        removed = [k for k in previous if k not in current]
+        self._state = current
+        return (changed, removed) if changed or removed else None
+
+    def state(self) -> Dict[str, Dict[str, Any]]:
+        return self._state
+
+
+class StateTopic(Topic):
+    """A single value, resent in full whenever it changes."""
+
+    def __init__(self, name: str, source: Callable[[], Any]):
+        super().__init__(name)
+        self.source = source
+        self._state: Any = None
+
+    async def poll(self) -> Optional[Delta]:
+        value = await _call(self.source)
+        if value == self._state:
+            return None
+        self._state = value
+        return value, []
+
+    def state(self) -> Any:
+        return self._state
+
+
+# --- Clients ---
+
+class _Client:
+    __slots__ = ("websocket", "format", "queue", "topics", "task", "sent", "connected_at")
+
+    def __init__(self, websocket: WebSocket, fmt: str, queue_size: int):
+        self.websocket = websocket
+        self.format = fmt
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.topics: Set[str] = set()
+        self.task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.connected_at = time.monotonic()
+
+
+class StreamHub:
+    """Fan-out of encoded topic deltas to WebSocket subscribers."""
+
+    formats = (JSON, MSGPACK)
+
+    def __init__(self, interval: float = 0.5, queue_size: int = 64):
+        self.interval = interval
+        self.queue_size = queue_size
+        self.topics: Dict[str, Topic] = {}
+        self.clients: Set[_Client] = set()
+        self._subscribers: Dict[str, Set[_Client]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        self._closing: Set[asyncio.Task] = set()  # closes of dropped clients, referenced until done
+
+        self.published = 0
+        self.frames_queued = 0
+        self.bytes_encoded: Dict[str, int] = {}
+        self.dropped_clients = 0
+        self.last_publish_ms = 0.0
+        # Optional ``record(nanos)`` sink for publish time, e.g. EngineRuntime.stage("stream")
+        self.busy: Optional[Any] = None
+
+    def add_topic(self, topic: Topic):
+        self.topics[topic.name] = topic
+        self._subscribers[topic.name] = set()
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        if self._task and not self._task.done():
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._run(), name="stream-hub")
+        logger.info(f"Stream hub started (topics={', '.join(self.topics)}, interval={self.interval}s)")
+
+    async def stop(self):
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for client in list(self.clients):
+            self._remove(client)
+            await self._close(client, 1001)
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+    async def _run(self):
+        while self._running:
+            await asyncio.sleep(self.interval)
+            started = time.perf_counter_ns()
+            try:
+                await self.publish()
+            except Exception as e:
+                logger.error(f"Stream publish failed: {e}")
+            elapsed = time.perf_counter_ns() - started
+            self.last_publish_ms = elapsed / 1e6
+            if self.busy is not None:
+                self.busy.record(elapsed)
+
+    async def publish(self):
+        """Poll every topic that has subscribers and fan each delta out once encoded."""
+        for name, topic in self.topics.items():
+            if not self._subscribers[name]:
+                continue
+            async with topic.lock:
+                try:
+                    delta = await topic.poll()
+                except Exception as e:
+                    logger.error(f"Stream topic '{name}' poll failed: {e}")
+                    continue
+                if delta is None:
+                    continue
+                topic.seq += 1
+                data, removed = delta
+                message = {
+                    "type": "delta",
+                    "topic": name,
+                    "seq": topic.seq,
+                    "data": data,
+                    "removed": removed,
+                    "timestamp": datetime.utcnow().isoformat(),
+                }
+                self.published += 1
+                frames: Dict[str, Frame] = {}
+                for client in list(self._subscribers[name]):
+                    frame = frames.get(client.format)
+                    if frame is None:
+                        frame = frames[client.format] = encode(message, client.format)
+                        self.bytes_encoded[client.format] = self.bytes_encoded.get(client.format, 0) + len(frame)
+                    self._enqueue(client, frame)
+
+    # --- Per-client ---
+
+    def _error(self, client: _Client, message: str):
+        self._enqueue(client, encode({"type": "error", "message": message}, client.format))
+
+    def _enqueue(self, client: _Client, frame: Frame):
+        try:
+            client.queue.put_nowait(frame)
+            self.frames_queued += 1
+        except asyncio.QueueFull:
+            # Never wait for a slow reader; it reconnects and starts from a fresh snapshot
+            logger.warning(f"Stream client dropped: send queue full ({self.queue_size} frames)")
+            self.dropped_clients += 1
+            self._remove(client)
+            task = asyncio.create_task(self._close(client, 1013))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+    async def subscribe(self, client: _Client, names: Iterable[str]):
+        for name in names:
+            topic = self.topics.get(name)
+            if topic is None:
+                self._error(client, f"unknown topic '{name}'")
+                continue
+            if name in client.topics:
+                continue
+            async with topic.lock:
+                if not self._subscribers[name]:
+                    # Nobody has been polling this topic; bring its state up to date first
+                    try:
+                        if await topic.poll() is not None:
+                            topic.seq += 1
+                    except Exception as e:
+                        logger.error(f"Stream topic '{name}' poll failed: {e}")
+                client.topics.add(name)
+                self._subscribers[name].add(client)
+                self._enqueue(client, topic.snapshot_frame(client.format))
+
+    def unsubscribe(self, client: _Client, names: Iterable[str]):
+        for name in names:
+            client.topics.discard(name)
+            self._subscribers.get(name, set()).discard(client)
+
+    def _remove(self, client: _Client):
+        if client not in self.clients:
+            return
+        self.clients.discard(client)
+        self.unsubscribe(client, list(client.topics))
+        if client.task and client.task is not asyncio.current_task():
+            client.task.cancel()
+
+    @staticmethod
+    async def _close(client: _Client, code: int):
+        try:
+            await client.websocket.close(code=code)
+        except Exception:
+            pass
+
+    async def _sender(self, client: _Client):
+        try:
+            while True:
+                frame = await client.queue.get()
+                if isinstance(frame, str):
+                    await client.websocket.send_text(frame)
+                else:
+                    await client.websocket.send_bytes(frame)
+                client.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Connection is gone; the receive loop in serve() notices as well
+            self._remove(client)
+
+    async def serve(self, websocket: WebSocket, topics: Iterable[str] = (), fmt: Optional[str] = JSON):
+        """Run one WebSocket connection until the client leaves or is dropped."""
+        await websocket.accept()
+        if fmt not in available(self.formats):
+            await websocket.send_text(encode({"type": "error", "message": f"unsupported format, use one of "
+                                                                          f"{', '.join(available(self.formats))}"}))
+            await websocket.close(code=1003)
+            return
+        client = _Client(websocket, fmt, self.queue_size)
+        self.clients.add(client)
+        client.task = asyncio.create_task(self._sender(client))
+        try:
+            await self.subscribe(client, topics)
+            while client in self.clients:
+                received = await websocket.receive()
+                if received["type"] == "websocket.disconnect":
+                    break
+                try:
+                    if received.get("bytes") is not None:
+                        request = msgpack.unpackb(received["bytes"]) if msgpack is not None else None
+                    else:
+                        request = json.loads(received.get("text") or "")
+                    action, names = request.get("action"), request.get("topics") or []
+                except Exception:
+                    self._error(client, "expected a JSON or MessagePack object")
+                    continue
+                if isinstance(names, str):
+                    names = [names]
+                if action == "subscribe":
+                    await self.subscribe(client, names)
+                elif action == "unsubscribe":
+                    self.unsubscribe(client, names)
+                else:
+                    self._error(client, f"unknown action '{action}'")
+        except WebSocketDisconnect:
+            pass
+        except Exception as e:
+            logger.warning(f"Stream client error: {e}")
+        finally:
+            self._remove(client)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "clients": len(self.clients),
+            "topics": {
+                name: {"subscribers": len(self._subscribers[name]), "seq": topic.seq}
+                for name, topic in self.topics.items()
+            },
+            "published": self.published,
+            "frames_queued": self.frames_queued,
+            "bytes_encoded": self.bytes_encoded,
+            "dropped_clients": self.dropped_clients,
+            "queue_size": self.queue_size,
+            "max_queue_depth": max((c.queue.qsize() for c in self.clients), default=0),
+            "last_publish_ms": round(self.last_publish_ms, 3),
+        }
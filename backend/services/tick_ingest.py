@@ -0,0 +1,228 @@
+"""
+Tick ingestion stage for Quantum Arbitrage Engine.
+
+Sits between the exchange WebSocket readers and the market data engine. The
+readers publish whole frames synchronously into a bounded per-exchange buffer
+and go straight back to the socket; a single drain task delivers the buffered
+ticks to the registered handlers in batches. Everything runs on the event loop
+thread, so the buffers need no locks.
+
+Each buffered ticker carries the ``time.perf_counter_ns()`` at which its
+frame was published, kept beside it rather than in the exchange's dict;
+listeners registered with ``received=True`` get those times with each batch.
+
+Coalescing policies:
+    latest       keep only the newest ticker per symbol (older updates are replaced)
+    drop_oldest  keep every ticker in arrival order; when full, the oldest is evicted
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+POLICY_LATEST = "latest"
+POLICY_DROP_OLDEST = "drop_oldest"
+POLICIES = (POLICY_LATEST, POLICY_DROP_OLDEST)
+
+
+class _ExchangeBuffer:
+    """Bounded buffer and counters for one exchange."""
+
+    __slots__ = ("policy", "max_depth", "latest", "received", "fifo", "handler", "batch_handler",
+                 "enqueued", "delivered", "dropped", "coalesced", "batches", "peak_depth")
+
+    def __init__(self, policy: str, max_depth: int):
+        self.policy = policy
+        self.max_depth = max_depth
+        self.latest: Dict[str, dict] = {}
+        self.received: Dict[str, int] = {}  # symbol -> receive time of its buffered ticker
+        self.fifo: Deque[Tuple[dict, int]] = deque()
+        self.handler: Optional[Callable] = None
+        self.batch_handler: bool = False
+        self.enqueued = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.peak_depth = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self.latest) if self.policy == POLICY_LATEST else len(self.fifo)
+
+    def put(self, ticker: dict, received_ns: int):
+        self.enqueued += 1
+        if self.policy == POLICY_LATEST:
+            symbol = ticker.get("symbol")
+            if symbol in self.latest:
+                # Re-insert so the symbol moves to the back of the delivery order
+                del self.latest[symbol]
+                self.coalesced += 1
+            elif len(self.latest) >= self.max_depth:
+                evicted = next(iter(self.latest))
+                del self.latest[evicted]
+                del self.received[evicted]
+                self.dropped += 1
+            self.latest[symbol] = ticker
+            self.received[symbol] = received_ns
+        else:
+            if len(self.fifo) >= self.max_depth:
+                self.fifo.popleft()
+                self.dropped += 1
+            self.fifo.append((ticker, received_ns))
+
+        depth = self.depth
+        if depth > self.peak_depth:
+            self.peak_depth = depth
+
+    def take(self, limit: int) -> Tuple[List[dict], List[int]]:
+        """Up to ``limit`` tickers and their receive times."""
+        batch, received = [], []
+        if self.policy == POLICY_LATEST:
+            while self.latest and len(batch) < limit:
+                symbol = next(iter(self.latest))
+                batch.append(self.latest.pop(symbol))
+                received.append(self.received.pop(symbol))
+        else:
+            while self.fifo and len(batch) < limit:
+                ticker, received_ns = self.fifo.popleft()
+                batch.append(ticker)
+                received.append(received_ns)
+        return batch, received
+
+
+class TickIngestQueue:
+    """Bounded, batched hand-off of tickers from exchange streams to consumers."""
+
+    def __init__(self, policy: str = POLICY_LATEST, max_depth: int = 1000, batch_size: int = 256):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown ingest policy '{policy}', expected one of {POLICIES}")
+        self.policy = policy
+        self.max_depth = max_depth
+        self.batch_size = batch_size
+        self._buffers: Dict[str, _ExchangeBuffer] = {}
+        self._listeners: List[Tuple[Callable[..., None], bool]] = []
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+    def _buffer(self, exchange: str) -> _ExchangeBuffer:
+        buf = self._buffers.get(exchange)
+        if buf is None:
+            buf = self._buffers[exchange] = _ExchangeBuffer(self.policy, self.max_depth)
+        return buf
+
+    def register(self, exchange: str, handler: Callable, batch: bool = False):
+        """
+        Set the consumer for an exchange's ticks.
+
+        ``handler(ticker)`` is called per ticker, or ``handler(tickers)`` once per
+        batch when ``batch`` is True. Either form may be sync or async.
+        """
+        buf = self._buffer(exchange)
+        buf.handler = handler
+        buf.batch_handler = batch
+
+    def add_listener(self, listener: Callable[..., None], received: bool = False):
+        """
+        Register a synchronous ``listener(exchange, tickers)`` that sees every delivered batch.
+
+        With ``received`` it is called as ``listener(exchange, tickers, received_ns)``,
+        where ``received_ns[i]`` is when ``tickers[i]`` was published.
+        """
+        self._listeners.append((listener, received))
+
+    def publish(self, exchange: str, tickers: Iterable[dict], received_ns: Optional[int] = None):
+        """Enqueue tickers without blocking; called from the stream reader when a frame arrives."""
+        if received_ns is None:
+            received_ns = time.perf_counter_ns()
+        buf = self._buffer(exchange)
+        for ticker in tickers:
+            buf.put(ticker, received_ns)
+        self._wakeup.set()
+
+    async def start(self):
+        if self._task and not self._task.done():
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._drain_loop(), name="tick-ingest")
+        logger.info(f"Tick ingestion started (policy={self.policy}, depth={self.max_depth}, batch={self.batch_size})")
+
+    async def stop(self):
+        self._running = False
+        self._wakeup.set()
+        if self._task:
+            try:
+                await asyncio.wait_for(self._task, timeout=5)
+            except asyncio.TimeoutError:
+                self._task.cancel()
+            self._task = None
+
+    async def _drain_loop(self):
+        while self._running:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await self.drain()
+
+    async def drain(self) -> int:
+        """Deliver everything currently buffered, one batch per exchange per round."""
+        delivered = 0
+        while True:
+            progressed = False
+            for exchange, buf in list(self._buffers.items()):
+                if not buf.depth or (buf.handler is None and not self._listeners):
+                    continue
+                batch, received = buf.take(self.batch_size)
+                progressed = True
+                buf.batches += 1
+                for listener, wants_received in self._listeners:
+                    try:
+                        if wants_received:
+                            listener(exchange, batch, received)
+                        else:
+                            listener(exchange, batch)
+                    except Exception as e:
+                        logger.error(f"[{exchange}] Tick listener error: {e}")
+                if buf.handler is not None:
+                    try:
+                        await self._dispatch(buf, batch)
+                    except Exception as e:
+                        logger.error(f"[{exchange}] Tick consumer error: {e}")
+                buf.delivered += len(batch)
+                delivered += len(batch)
+            if not progressed:
+                return delivered
+            # Let stream readers run between rounds
+            await asyncio.sleep(0)
+
+    @staticmethod
+    async def _dispatch(buf: _ExchangeBuffer, batch: List[dict]):
+        if buf.batch_handler:
+            result = buf.handler(batch)
+            if inspect.isawaitable(result):
+                await result
+            return
+        for ticker in batch:
+            result = buf.handler(ticker)
+            if inspect.isawaitable(result):
+                await result
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-exchange queue depth and counters."""
+        return {
+            exchange: {
+                "depth": buf.depth,
+                "peak_depth": buf.peak_depth,
+                "enqueued": buf.enqueued,
+                "delivered": buf.delivered,
+                "dropped": buf.dropped,
+                "coalesced": buf.coalesced,
+                "batches": buf.batches,
+            }
+            for exchange, buf in self._buffers.items()
+        }
@@ -0,0 +1,331 @@
+"""
+Tick history store for Quantum Arbitrage Engine.
+
+Every raw ticker from the exchange streams is appended as a fixed-width
+record to a partition file (one per UTC day or hour) under ``data/ticks/``.
+Exchange and symbol names are stored as small integer ids, with the name
+table kept in ``ids.json`` next to the partitions.
+
+``record()`` only appends a tuple to an in-memory list. A background task
+hands the list to a worker thread, which packs it into a NumPy structured
+array and writes it with one ``write()`` per partition, so disk I/O never
+runs on the event loop.
+
+Partitions are read back with ``np.memmap``. Records within a partition are
+ordered by ``recv_ms``, so a time window is a binary search and a slice of
+the mapped file, with no copying. A new store continues from the newest
+record on disk, so a wall clock stepped back across a restart cannot break
+that order.
+
+A directory has a single writer: ``start()`` takes an exclusive lock on
+``writer.lock`` (where ``fcntl`` exists) and fails if another process holds
+it, since two writers would interleave partitions and clobber ``ids.json``.
+Any number of readers may open the directory at the same time.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: one writer per directory by convention only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+RECORD_DTYPE = np.dtype([
+    ("recv_ms", "<i8"),    # local receive time, non-decreasing within the store
+    ("ts_ms", "<i8"),      # exchange timestamp (recv_ms when the exchange sends none)
+    ("exchange", "<u2"),
+    ("symbol", "<u4"),
+    ("bid", "<f8"),
+    ("ask", "<f8"),
+    ("bid_size", "<f8"),
+    ("ask_size", "<f8"),
+    ("last", "<f8"),
+])
+
+PARTITIONS = {"day": ("%Y%m%d", 86_400_000), "hour": ("%Y%m%d%H", 3_600_000)}
+IDS_FILE = "ids.json"
+LOCK_FILE = "writer.lock"
+
+
+def _float(value) -> float:
+    return float(value) if value is not None else np.nan
+
+
+class TickStore:
+    """Append-only, time-partitioned tick recorder with memory-mapped range reads."""
+
+    def __init__(self, directory: str = "data/ticks", partition: str = "day",
+                 flush_interval: float = 1.0, max_pending: int = 500_000):
+        if partition not in PARTITIONS:
+            raise ValueError(f"Unknown partition '{partition}', expected one of {sorted(PARTITIONS)}")
+        self.directory = Path(directory)
+        self.partition = partition
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self.exchanges: List[str] = []
+        self.symbols: List[str] = []
+        self._exchange_ids: Dict[str, int] = {}
+        self._symbol_ids: Dict[str, int] = {}
+        self._ids_dirty = False
+        self._load_ids()
+
+        self._pending: List[Tuple] = []
+        self._last_recv_ms = self._last_written_ms()
+        self._task: Optional[asyncio.Task] = None
+        self._lock = None
+        self._stopping = asyncio.Event()
+
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.bytes_written = 0
+        self.last_flush_ms = 0.0
+
+    # --- Id maps ---
+
+    def _load_ids(self):
+        path = self.directory / IDS_FILE
+        if not path.exists():
+            return
+        ids = json.loads(path.read_text())
+        self.exchanges = list(ids.get("exchanges", []))
+        self.symbols = list(ids.get("symbols", []))
+        self._exchange_ids = {name: i for i, name in enumerate(self.exchanges)}
+        self._symbol_ids = {name: i for i, name in enumerate(self.symbols)}
+
+    def _intern(self, names: List[str], ids: Dict[str, int], name: str) -> int:
+        i = ids.get(name)
+        if i is None:
+            i = ids[name] = len(names)
+            names.append(name)
+            self._ids_dirty = True
+        return i
+
+    def _last_written_ms(self) -> int:
+        """``recv_ms`` of the newest record on disk (0 when empty)."""
+        for path in reversed(self.partitions()):
+            records = self.open_partition(path)
+            if len(records):
+                return int(records["recv_ms"][-1])
+        return 0
+
+    def exchange_id(self, name: str) -> Optional[int]:
+        return self._exchange_ids.get(name)
+
+    def symbol_id(self, name: str) -> Optional[int]:
+        return self._symbol_ids.get(name)
+
+    # --- Recording (event loop, never blocks) ---
+
+    def record(self, exchange: str, tickers: List[dict]):
+        """Tick tap: buffer raw ccxt tickers for the next background flush."""
+        if len(self._pending) + len(tickers) > self.max_pending:
+            self.dropped += len(tickers)
+            return
+        recv_ms = max(int(time.time() * 1000), self._last_recv_ms)
+        self._last_recv_ms = recv_ms
+        e = self._intern(self.exchanges, self._exchange_ids, exchange)
+        before = len(self._pending)
+        for t in tickers:
+            symbol = t.get("symbol")
+            if not symbol:
+                continue
+            self._pending.append((
+                recv_ms,
+                int(t.get("timestamp") or recv_ms),
+                e,
+                self._intern(self.symbols, self._symbol_ids, symbol),
+                _float(t.get("bid")),
+                _float(t.get("ask")),
+                _float(t.get("bidVolume")),
+                _float(t.get("askVolume")),
+                _float(t.get("last")),
+            ))
+        self.recorded += len(self._pending) - before
+
+    # --- Background flushing ---
+
+    async def start(self):
+        if self._task and not self._task.done():
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._acquire_lock()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run(), name="tick-store")
+        logger.info(f"Tick store recording to {self.directory} ({self.partition} partitions)")
+
+    async def stop(self):
+        """Stop the flush loop (never mid-write) and write what is still buffered."""
+        self._stopping.set()
+        if self._task:
+            await self._task
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Tick store final flush failed: {e}")
+        if self._lock is not None:
+            self._lock.close()  # releases the flock
+            self._lock = None
+        logger.info(f"Tick store stopped ({self.written} ticks written, {self.dropped} dropped)")
+
+    def _acquire_lock(self):
+        if self._lock is not None:
+            return
+        lock = open(self.directory / LOCK_FILE, "a")
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock.close()
+                raise RuntimeError(f"Tick store {self.directory} is already being written by another process")
+        self._lock = lock
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Tick store flush failed: {e}")
+
+    async def flush(self) -> int:
+        """Write everything buffered so far from a worker thread; returns ticks written."""
+        if not self._pending:
+            return 0
+        rows, self._pending = self._pending, []
+        ids = None
+        if self._ids_dirty:
+            ids = {"exchanges": list(self.exchanges), "symbols": list(self.symbols)}
+            self._ids_dirty = False
+        started = time.perf_counter()
+        try:
+            written = await asyncio.to_thread(self._write, rows, ids)
+        except Exception:
+            self.dropped += len(rows)
+            self._ids_dirty = self._ids_dirty or ids is not None
+            raise
+        self.last_flush_ms = (time.perf_counter() - started) * 1000
+        self.written += len(rows)
+        self.bytes_written += written
+        return len(rows)
+
+    def _write(self, rows: List[Tuple], ids: Optional[Dict[str, List[str]]]) -> int:
+        # The id map goes first so every id on disk always resolves
+        if ids is not None:
+            tmp = self.directory / f"{IDS_FILE}.tmp"
+            tmp.write_text(json.dumps(ids))
+            os.replace(tmp, self.directory / IDS_FILE)
+
+        records = np.array(rows, dtype=RECORD_DTYPE)
+        span = PARTITIONS[self.partition][1]
+        keys = records["recv_ms"] // span
+        bounds = np.flatnonzero(np.diff(keys)) + 1
+        written = 0
+        for chunk in np.split(records, bounds):
+            with open(self.partition_path(int(chunk["recv_ms"][0])), "ab") as f:
+                f.write(chunk.tobytes())
+            written += chunk.nbytes
+        return written
+
+    # --- Reading ---
+
+    def partition_path(self, ms: int) -> Path:
+        fmt = PARTITIONS[self.partition][0]
+        stamp = datetime.fromtimestamp(ms / 1000, tz=timezone.utc).strftime(fmt)
+        return self.directory / f"ticks-{stamp}.bin"
+
+    def partitions(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> List[Path]:
+        """Partition files that may hold records in [start_ms, end_ms), oldest first."""
+        paths = []
+        for path in sorted(self.directory.glob("ticks-*.bin")):
+            stamp = path.stem.split("-", 1)[1]
+            fmt, span = PARTITIONS["hour" if len(stamp) == 10 else "day"]
+            begin = int(datetime.strptime(stamp, fmt).replace(tzinfo=timezone.utc).timestamp() * 1000)
+            if end_ms is not None and begin >= end_ms:
+                continue
+            if start_ms is not None and begin + span <= start_ms:
+                continue
+            paths.append(path)
+        return paths
+
+    @staticmethod
+    def open_partition(path: Path) -> np.ndarray:
+        """Read-only memory map of a partition (a partly written trailing record is ignored)."""
+        count = path.stat().st_size // RECORD_DTYPE.itemsize
+        if count == 0:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return np.memmap(path, dtype=RECORD_DTYPE, mode="r", shape=(count,))
+
+    def iter_range(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None,
+                   symbol: Optional[str] = None, exchange: Optional[str] = None) -> Iterator[np.ndarray]:
+        """
+        Yield matching records per partition.
+
+        Time-only queries yield slices of the memory map itself; a symbol or
+        exchange filter selects rows from the slice and so yields copies.
+        """
+        sym_id = exch_id = None
+        if symbol is not None:
+            sym_id = self.symbol_id(symbol)
+            if sym_id is None:
+                return
+        if exchange is not None:
+            exch_id = self.exchange_id(exchange)
+            if exch_id is None:
+                return
+
+        for path in self.partitions(start_ms, end_ms):
+            records = self.open_partition(path)
+            if not len(records):
+                continue
+            recv = records["recv_ms"]
+            lo = int(np.searchsorted(recv, start_ms, side="left")) if start_ms is not None else 0
+            hi = int(np.searchsorted(recv, end_ms, side="left")) if end_ms is not None else len(records)
+            window = records[lo:hi]
+            if sym_id is not None or exch_id is not None:
+                mask = np.ones(len(window), dtype=bool)
+                if sym_id is not None:
+                    mask &= window["symbol"] == sym_id
+                if exch_id is not None:
+                    mask &= window["exchange"] == exch_id
+                window = window[mask]
+            if len(window):
+                yield window
+
+    def query(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None,
+              symbol: Optional[str] = None, exchange: Optional[str] = None) -> np.ndarray:
+        """All records in [start_ms, end_ms) for the given symbol/exchange (None = any)."""
+        parts = list(self.iter_range(start_ms, end_ms, symbol, exchange))
+        if not parts:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "directory": str(self.directory),
+            "partition": self.partition,
+            "pending": len(self._pending),
+            "recorded": self.recorded,
+            "written": self.written,
+            "dropped": self.dropped,
+            "bytes_written": self.bytes_written,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "exchanges": len(self.exchanges),
+            "symbols": len(self.symbols),
+        }
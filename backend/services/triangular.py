@@ -0,0 +1,232 @@
+"""
+Triangular arbitrage detection for Quantum Arbitrage Engine.
+
+For each exchange the spot markets are turned into a directed currency graph
+once, when markets are loaded: market BASE/QUOTE contributes an edge
+QUOTE -> BASE (buy at the ask) and an edge BASE -> QUOTE (sell at the bid).
+Edge weights are log conversion rates net of the taker fee, so a cycle is
+profitable when its three weights sum above log(1 + threshold). Every 3-cycle
+is enumerated up front and indexed by market, so a tick only re-sums the
+cycles that pass through the ticked market.
+"""
+
+import logging
+import math
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from backend.core.metrics import LatencyRecorder
+from backend.services.spread_scanner import DEFAULT_TAKER_FEE, DEFAULT_TAKER_FEES
+
+logger = logging.getLogger(__name__)
+
+
+class CurrencyGraph:
+    """Precomputed 3-cycles over one exchange's spot markets."""
+
+    def __init__(self, exchange: str, markets: Dict[str, Any], taker_fee: float):
+        self.exchange = exchange
+        self.log_fee = math.log1p(-taker_fee)
+        self.currencies: List[str] = []
+        self.market_ids: Dict[str, int] = {}
+        self.market_symbols: List[str] = []
+
+        currency_ids: Dict[str, int] = {}
+        adjacency: Dict[int, Dict[int, int]] = {}
+        edge_market: List[int] = []
+        edge_from: List[int] = []
+        edge_sell: List[bool] = []  # True: base -> quote at the bid; False: quote -> base at the ask
+
+        def currency_id(code: str) -> int:
+            if code not in currency_ids:
+                currency_ids[code] = len(self.currencies)
+                self.currencies.append(code)
+            return currency_ids[code]
+
+        for symbol, market in markets.items():
+            if not market.get("spot", market.get("type") == "spot") or market.get("active") is False:
+                continue
+            base, quote = market.get("base"), market.get("quote")
+            if not base or not quote or base == quote:
+                continue
+            b, q = currency_id(base), currency_id(quote)
+            if b in adjacency.get(q, {}) or q in adjacency.get(b, {}):
+                continue  # one market per currency pair
+            m = self.market_ids[symbol] = len(self.market_symbols)
+            self.market_symbols.append(symbol)
+            adjacency.setdefault(q, {})[b] = len(edge_market)
+            edge_market.append(m)
+            edge_from.append(q)
+            edge_sell.append(False)
+            adjacency.setdefault(b, {})[q] = len(edge_market)
+            edge_market.append(m)
+            edge_from.append(b)
+            edge_sell.append(True)
+
+        # Each market owns edges 2m (buy) and 2m + 1 (sell)
+        self.edge_market = np.array(edge_market, dtype=np.int32)
+        self.edge_from = np.array(edge_from, dtype=np.int32)
+        self.edge_sell = np.array(edge_sell, dtype=bool)
+        self.weights = np.full(len(edge_market), -np.inf)
+
+        cycles = []
+        for a, out_a in adjacency.items():
+            for b, e1 in out_a.items():
+                if b < a:
+                    continue
+                for c, e2 in adjacency.get(b, {}).items():
+                    if c <= a or c == b:
+                        continue
+                    e3 = adjacency.get(c, {}).get(a)
+                    if e3 is not None:
+                        cycles.append((e1, e2, e3))
+        self.cycles = np.array(cycles, dtype=np.int32).reshape(-1, 3)
+
+        by_market: List[List[int]] = [[] for _ in self.market_symbols]
+        for i, edges in enumerate(self.cycles):
+            for m in {int(self.edge_market[e]) for e in edges}:
+                by_market[m].append(i)
+        self.market_cycles = [np.array(ids, dtype=np.int32) for ids in by_market]
+        self.active_mask = np.zeros(len(self.cycles), dtype=bool)
+
+    def update(self, symbol: str, bid: Optional[float], ask: Optional[float]) -> Optional[np.ndarray]:
+        """Refresh a market's edge weights; returns the ids of cycles touching it."""
+        m = self.market_ids.get(symbol)
+        if m is None:
+            return None
+        self.weights[2 * m] = -math.log(ask) + self.log_fee if ask and ask > 0 else -np.inf
+        self.weights[2 * m + 1] = math.log(bid) + self.log_fee if bid and bid > 0 else -np.inf
+        return self.market_cycles[m]
+
+    def cycle_returns(self, cycle_ids: np.ndarray) -> np.ndarray:
+        """Log return of each cycle (sum of its edge weights)."""
+        return self.weights[self.cycles[cycle_ids]].sum(axis=1)
+
+    def path(self, cycle_id: int) -> List[str]:
+        """Currencies visited by a cycle, ending where it started."""
+        codes = [self.currencies[self.edge_from[e]] for e in self.cycles[cycle_id]]
+        return codes + codes[:1]
+
+    def describe(self, cycle_id: int) -> List[Dict[str, Any]]:
+        legs = []
+        for e in self.cycles[cycle_id]:
+            m = int(self.edge_market[e])
+            sell = bool(self.edge_sell[e])
+            rate = math.exp(self.weights[e] - self.log_fee)
+            legs.append({
+                "symbol": self.market_symbols[m],
+                "side": "sell" if sell else "buy",
+                "price": rate if sell else 1.0 / rate,
+            })
+        return legs
+
+
+class TriangularDetector:
+    """Per-tick triangular opportunity detection across exchanges."""
+
+    def __init__(self, taker_fees: Optional[Dict[str, float]] = None,
+                 min_net_profit_pct: float = 0.0, trade_size_usd: float = 100.0,
+                 exchange_manager=None):
+        self.exchange_manager = exchange_manager
+        self.taker_fees: Dict[str, float] = dict(DEFAULT_TAKER_FEES)
+        if taker_fees:
+            self.set_fees(taker_fees)
+        self.min_net_profit_pct = min_net_profit_pct
+        self.trade_size_usd = trade_size_usd
+        self._log_threshold = math.log1p(min_net_profit_pct / 100.0)
+
+        self.graphs: Dict[str, CurrencyGraph] = {}
+        self.active: Dict[str, Dict[str, Any]] = {}
+        self.latency = LatencyRecorder()
+        self.ticks = 0
+        self.version = 0  # bumped whenever ``active`` changes
+
+    def set_fees(self, taker_fees: Dict[str, float]):
+        """Update fees; applies to graphs built afterwards."""
+        self.taker_fees.update({name.lower(): fee for name, fee in taker_fees.items()})
+
+    def build(self, exchange: str, markets: Dict[str, Any]) -> CurrencyGraph:
+        """Build (or rebuild) an exchange's currency graph from its loaded markets."""
+        started = time.perf_counter()
+        fee = self.taker_fees.get(exchange.lower(), DEFAULT_TAKER_FEE)
+        graph = self.graphs[exchange] = CurrencyGraph(exchange, markets, fee)
+        logger.info(
+            f"[{exchange}] Triangular graph: {len(graph.currencies)} currencies, "
+            f"{len(graph.market_symbols)} markets, {len(graph.cycles)} cycles "
+            f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+        return graph
+
+    def build_all(self):
+        """Build graphs for every adapter whose markets are loaded."""
+        if self.exchange_manager is None:
+            return
+        for name, adapter in self.exchange_manager.get_all_adapters().items():
+            if adapter.markets and name not in self.graphs:
+                self.build(name, adapter.markets)
+
+    def _graph_for(self, exchange: str) -> Optional[CurrencyGraph]:
+        graph = self.graphs.get(exchange)
+        if graph is None and self.exchange_manager is not None:
+            # Exchanges that finished connecting after startup get their graph on first tick
+            adapter = self.exchange_manager.get_adapter(exchange)
+            if adapter is not None and adapter.markets:
+                graph = self.build(exchange, adapter.markets)
+        return graph
+
+    def on_tick(self, exchange: str, symbol: str, bid: Optional[float], ask: Optional[float]):
+        graph = self._graph_for(exchange)
+        if graph is None:
+            return
+        started = time.perf_counter_ns()
+        self.ticks += 1
+        cycle_ids = graph.update(symbol, bid, ask)
+        if cycle_ids is None or not cycle_ids.size:
+            return
+
+        returns = graph.cycle_returns(cycle_ids)
+        profitable = returns >= self._log_threshold
+        expired = cycle_ids[graph.active_mask[cycle_ids] & ~profitable]
+        for cycle_id in expired.tolist():
+            self.active.pop(f"{exchange}:{cycle_id}", None)
+        graph.active_mask[cycle_ids] = profitable
+        if expired.size or profitable.any():
+            self.version += 1
+
+        for cycle_id, log_return in zip(cycle_ids[profitable].tolist(), returns[profitable].tolist()):
+            net_pct = math.expm1(log_return) * 100.0
+            path = graph.path(cycle_id)
+            self.active[f"{exchange}:{cycle_id}"] = {
+                "symbol": "->".join(path),
+                "path": path,
+                "arb_type": "triangular",
+                "buy_exchange": exchange,
+                "sell_exchange": exchange,
+                "legs": graph.describe(cycle_id),
+                "net_profit_pct": net_pct,
+                "estimated_profit_usd": self.trade_size_usd * net_pct / 100.0,
+                "detected_at": datetime.utcnow().isoformat(),
+            }
+        self.latency.record(time.perf_counter_ns() - started)
+
+    def on_tickers(self, exchange: str, tickers: Iterable[Dict[str, Any]]):
+        """Tick-ingest listener."""
+        for ticker in tickers:
+            self.on_tick(exchange, ticker["symbol"], ticker.get("bid"), ticker.get("ask"))
+
+    async def get_opportunities(self) -> List[Dict[str, Any]]:
+        return sorted(self.active.values(), key=lambda o: o["net_profit_pct"], reverse=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "exchanges": {
+                name: {"markets": len(g.market_symbols), "cycles": int(len(g.cycles))}
+                for name, g in self.graphs.items()
+            },
+            "ticks": self.ticks,
+            "active": len(self.active),
+            "per_tick": self.latency.summary(),
+        }
@@ -0,0 +1,154 @@
+"""
+Wire formats for the market data APIs.
+
+    json      application/json                  every endpoint and /ws/market (text frames)
+    msgpack   application/msgpack               every endpoint and /ws/market (binary frames);
+                                                same structure as the JSON, smaller and cheaper to encode
+    columnar  application/vnd.qae.price-grid    /api/v1/market/prices only; the PriceBook grid as raw float64
+
+A REST client picks a format with the ``Accept`` header or ``?format=``; the
+stream takes ``?format=`` only. ``?format=`` wins over ``Accept``.
+
+Columnar layout (little-endian):
+
+    offset  type       field
+    0       4s         magic b"QPG1"
+    4       u16        layout version (1)
+    6       u16        n_fields
+    8       u32        n_exchanges
+    12      u32        n_symbols
+    16      u64        price book version
+    24      f64        generated_at, epoch milliseconds
+    32      u32        names_len
+    36      names_len  UTF-8 names joined by "\\n": fields, then exchanges, then symbols
+    ...                zero padding to a multiple of 8 bytes
+    ...                float64 grid [field][exchange][symbol] (C order); NaN = no quote
+
+The grid is 8-byte aligned, so ``np.frombuffer`` or a JS ``Float64Array`` can
+view it without copying (``decode_price_grid`` does the former).
+"""
+
+import struct
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.services.price_book import FIELDS, PriceBookSnapshot
+
+try:
+    import orjson
+
+    def encode_json(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    import json
+
+    def encode_json(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), default=str).encode()
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack is in requirements.txt
+    msgpack = None
+
+JSON, MSGPACK, COLUMNAR = "json", "msgpack", "columnar"
+
+MEDIA_TYPES = {
+    JSON: "application/json",
+    MSGPACK: "application/msgpack",
+    COLUMNAR: "application/vnd.qae.price-grid",
+}
+_FORMAT_BY_MEDIA = {
+    **{media: fmt for fmt, media in MEDIA_TYPES.items()},
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+}
+
+GRID_MAGIC = b"QPG1"
+GRID_LAYOUT_VERSION = 1
+_GRID_HEADER = struct.Struct("<4sHHIIQdI")
+
+
+def encode_msgpack(obj: Any) -> bytes:
+    return msgpack.packb(obj, default=str, use_bin_type=True)
+
+
+ENCODERS: Dict[str, Callable[[Any], bytes]] = {JSON: encode_json}
+if msgpack is not None:
+    ENCODERS[MSGPACK] = encode_msgpack
+
+
+def available(formats: Sequence[str]) -> List[str]:
+    """The subset of ``formats`` that can be produced here (msgpack needs the package)."""
+    return [f for f in formats if f != MSGPACK or msgpack is not None]
+
+
+def negotiate(accept: Optional[str], requested: Optional[str], offered: Sequence[str]) -> Optional[str]:
+    """
+    Pick a format from ``offered`` (most preferred first).
+
+    ``requested`` is the ``?format=`` value and must be offered exactly.
+    Otherwise the ``Accept`` media types are tried by descending q; an absent
+    header or a wildcard gets the first offered format. None means 406.
+    """
+    offered = available(offered)
+    if requested:
+        requested = requested.lower()
+        return requested if requested in offered else None
+    if not accept:
+        return offered[0] if offered else None
+
+    ranges: List[Tuple[float, int, str]] = []
+    for i, part in enumerate(accept.split(",")):
+        media, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            ranges.append((-q, i, media.lower()))
+    for _, _, media in sorted(ranges):
+        if media in ("*/*", "application/*"):
+            return offered[0] if offered else None
+        fmt = _FORMAT_BY_MEDIA.get(media)
+        if fmt in offered:
+            return fmt
+    return None
+
+
+# --- Columnar price grid ---
+
+def encode_price_grid(snap: PriceBookSnapshot, generated_at_ms: Optional[float] = None) -> bytes:
+    names = "\n".join([*FIELDS, *snap.exchanges, *snap.symbols]).encode()
+    header = _GRID_HEADER.pack(
+        GRID_MAGIC, GRID_LAYOUT_VERSION, len(FIELDS), len(snap.exchanges), len(snap.symbols),
+        snap.version, time.time() * 1000 if generated_at_ms is None else generated_at_ms, len(names),
+    )
+    pad = -(len(header) + len(names)) % 8
+    grid = np.ascontiguousarray(snap.grid, dtype="<f8")
+    return b"".join((header, names, b"\0" * pad, grid.tobytes()))
+
+
+def decode_price_grid(data: bytes) -> Dict[str, Any]:
+    """Inverse of ``encode_price_grid``; ``grid`` is a read-only view into ``data``."""
+    magic, layout, n_fields, n_exchanges, n_symbols, version, generated_at, names_len = \
+        _GRID_HEADER.unpack_from(data)
+    if magic != GRID_MAGIC or layout != GRID_LAYOUT_VERSION:
+        raise ValueError(f"Not a price grid (magic={magic!r}, layout={layout})")
+    offset = _GRID_HEADER.size
+    names = data[offset:offset + names_len].decode().split("\n") if names_len else []
+    offset += names_len
+    offset += -offset % 8
+    grid = np.frombuffer(data, dtype="<f8", count=n_fields * n_exchanges * n_symbols, offset=offset)
+    return {
+        "fields": names[:n_fields],
+        "exchanges": names[n_fields:n_fields + n_exchanges],
+        "symbols": names[n_fields + n_exchanges:],
+        "version": version,
+        "generated_at": generated_at,
+        "grid": grid.reshape(n_fields, n_exchanges, n_symbols),
+    }
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+End-to-end throughput benchmark against the local mock exchange.
+
+Starts ``backend.exchanges.mock_server`` in a subprocess, connects real
+ExchangeAdapters (ccxt.pro) to it and runs the ingest -> price book ->
+incremental detector pipeline, reporting:
+
+    ticks/s         tickers delivered by the adapters
+    tick->opp       exchange event time to opportunity emitted (network + parse + queue + detect)
+    opp->API        time to build the opportunities payload the REST endpoint returns
+
+    python benchmarks/bench_end_to_end.py --venues 3 --symbols 100 --rate 20 --seconds 20
+
+Against a running app started with MOCK_EXCHANGE_URL=http://127.0.0.1:8765 and
+ARBITRAGE_SCAN_MODE=incremental, ``--api-url http://127.0.0.1:8000`` also polls
+``/api/v1/arbitrage/opportunities`` and reports request latency and how old
+the freshest returned opportunity is.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import aiohttp
+
+from backend.core.metrics import LatencyRecorder
+from backend.exchanges.adapter import ExchangeManager
+from backend.exchanges.mock_server import mock_overrides
+from backend.services.incremental_arbitrage import IncrementalArbitrageDetector
+from backend.services.price_book import PriceBook
+from backend.services.tick_ingest import TickIngestQueue
+
+VENUES = ["binance", "kraken", "bybit", "kucoin", "okx", "gate", "mexc"]
+
+
+def start_mock(args) -> subprocess.Popen:
+    cmd = [sys.executable, "-m", "backend.exchanges.mock_server", "--port", str(args.port),
+           "--symbols", str(args.symbols), "--rate", str(args.rate), "--jitter-ms", str(args.jitter_ms)]
+    if args.disconnect_every:
+        cmd += ["--disconnect-every", str(args.disconnect_every)]
+    return subprocess.Popen(cmd, cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def wait_for_mock(url: str, timeout: float = 15.0):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(f"{url}/v/binance/api/v3/ping") as resp:
+                    if resp.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"mock exchange did not start on {url}")
+
+
+async def poll_api(api_url: str, stop: asyncio.Event, request_lat: LatencyRecorder, freshness: list):
+    async with aiohttp.ClientSession() as session:
+        while not stop.is_set():
+            started = time.perf_counter_ns()
+            async with session.get(f"{api_url}/api/v1/arbitrage/opportunities") as resp:
+                body = await resp.json()
+            request_lat.record(time.perf_counter_ns() - started)
+            stamps = [o["detected_at"] for o in body.get("opportunities", []) if o.get("detected_at")]
+            if stamps:
+                newest = max(datetime.fromisoformat(s) for s in stamps)
+                freshness.append((datetime.utcnow() - newest).total_seconds() * 1000)
+            await asyncio.sleep(0.05)
+
+
+async def run(args):
+    mock_url = f"http://127.0.0.1:{args.port}"
+    mock = start_mock(args)
+    try:
+        await wait_for_mock(mock_url)
+
+        ingest = TickIngestQueue(policy=args.policy)
+        manager = ExchangeManager(ingest=ingest)
+        venues = (VENUES * (args.venues // len(VENUES) + 1))[:args.venues]
+        venues = [f"{v}{i // len(VENUES) or ''}" for i, v in enumerate(venues)]
+        for venue in venues:
+            manager.add_exchange(venue, {"load_markets_timeout": 15, **mock_overrides(mock_url, venue)})
+        started = time.perf_counter()
+        ready = await manager.initialize_all(wait_timeout=30)
+        print(f"Connected {len(ready)}/{len(venues)} venues in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+        book = PriceBook()
+        detector = IncrementalArbitrageDetector(min_net_profit_pct=args.min_profit)
+        tick_to_opp = LatencyRecorder(size=100_000)
+        payload = LatencyRecorder(size=10_000)
+        ticks = [0]
+
+        def count(exchange, tickers):
+            ticks[0] += len(tickers)
+
+        def on_tickers(exchange, tickers, received_ns):
+            for ticker, received in zip(tickers, received_ns):
+                emitted = detector.emitted
+                detector.on_tick(exchange, ticker["symbol"], ticker.get("bid"), ticker.get("ask"),
+                                 received_ns=received)
+                event_ms = ticker.get("timestamp")
+                if detector.emitted > emitted and event_ms:
+                    # Exchange event time -> opportunity emitted
+                    tick_to_opp.record(int((time.time() * 1000 - event_ms) * 1_000_000))
+
+        manager.add_tick_tap(count)
+        ingest.add_listener(book.apply_tickers)
+        ingest.add_listener(on_tickers, received=True)
+        await ingest.start()
+
+        async def noop(ticker):
+            pass
+
+        symbols = [m for m in manager.get_adapter(venues[0]).markets][:args.symbols]
+        tasks = [asyncio.create_task(a.watch_tickers(symbols, noop)) for a in manager.get_all_adapters().values()]
+
+        stop = asyncio.Event()
+        request_lat, freshness = LatencyRecorder(), []
+        poller = asyncio.create_task(poll_api(args.api_url, stop, request_lat, freshness)) if args.api_url else None
+
+        await asyncio.sleep(args.warmup)
+        ticks[0] = 0
+        measure_start = time.perf_counter()
+        while time.perf_counter() - measure_start < args.seconds:
+            await asyncio.sleep(0.1)
+            t0 = time.perf_counter_ns()
+            json.dumps({"opportunities": await detector.get_opportunities()}, default=str)
+            payload.record(time.perf_counter_ns() - t0)
+        elapsed = time.perf_counter() - measure_start
+        stop.set()
+
+        print(f"ticks/s:    {ticks[0] / elapsed:,.0f} ({ticks[0]} over {elapsed:.1f}s)")
+        print(f"tick->opp:  {tick_to_opp.summary()}")
+        print(f"opp->API:   {payload.summary()}  ({len(detector.active)} active opportunities)")
+        print(f"recv->opp:  {detector.latency.summary()}")
+        print(f"detector:   {detector.evaluation.summary()}")
+        print(f"ingest:     {json.dumps(ingest.stats())}")
+        if poller:
+            await poller
+            print(f"API GET:    {request_lat.summary()}")
+            if freshness:
+                print(f"API age:    p50={np.percentile(freshness, 50):.1f} ms  p99={np.percentile(freshness, 99):.1f} ms")
+
+        for task in tasks:
+            task.cancel()
+        await ingest.stop()
+        await manager.close_all()
+    finally:
+        mock.terminate()
+        mock.wait(timeout=5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--venues", type=int, default=3)
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=10.0, help="updates per symbol per second")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--disconnect-every", type=float)
+    parser.add_argument("--policy", default="latest", choices=["latest", "drop_oldest"])
+    parser.add_argument("--min-profit", type=float, default=-1.0,
+                        help="detector threshold; negative keeps every pair active")
+    parser.add_argument("--seconds", type=float, default=15.0)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--api-url", help="also poll a running app's opportunities endpoint")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Cold vs warm startup benchmark for the market metadata cache.
+
+Cold start downloads markets with ``load_markets()``; warm start reads them
+from ``data/market_cache``. Run against live exchanges:
+
+    python benchmarks/bench_market_cache.py binance kraken okx
+
+or without network access, using synthetic market definitions:
+
+    python benchmarks/bench_market_cache.py --offline --markets 3000
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.exchanges.market_cache import MarketCache
+
+
+def synthetic_markets(count: int) -> dict:
+    """Build market dicts shaped like ccxt's unified market structure."""
+    markets = {}
+    for i in range(count):
+        base, quote = f"C{i:05d}", ("USDT", "BTC", "ETH")[i % 3]
+        symbol = f"{base}/{quote}"
+        markets[symbol] = {
+            "id": f"{base}{quote}", "symbol": symbol, "base": base, "quote": quote,
+            "baseId": base, "quoteId": quote, "type": "spot", "spot": True, "active": True,
+            "taker": 0.001, "maker": 0.001, "contract": False, "linear": None, "inverse": None,
+            "precision": {"amount": 1e-8, "price": 1e-8},
+            "limits": {"amount": {"min": 1e-5, "max": 9e6}, "price": {"min": 1e-8, "max": 1e6},
+                       "cost": {"min": 5.0, "max": None}},
+            "info": {"symbol": f"{base}{quote}", "status": "TRADING", "filters": [
+                {"filterType": "PRICE_FILTER", "minPrice": "0.00000001", "tickSize": "0.00000001"},
+                {"filterType": "LOT_SIZE", "minQty": "0.00001", "stepSize": "0.00001"},
+            ]},
+        }
+    return markets
+
+
+def bench_offline(count: int, repeats: int):
+    markets = synthetic_markets(count)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = MarketCache(tmp, library_version="bench")
+        t0 = time.perf_counter()
+        path = cache.save("synthetic", markets)
+        save_ms = (time.perf_counter() - t0) * 1000
+
+        load_times = []
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            entry = cache.load("synthetic")
+            load_times.append((time.perf_counter() - t0) * 1000)
+        assert entry is not None and len(entry.markets) == count
+
+        size_kb = path.stat().st_size / 1024
+    print(f"markets={count} file={size_kb:.0f} KiB save={save_ms:.1f} ms "
+          f"warm load min={min(load_times):.1f} ms avg={sum(load_times) / len(load_times):.1f} ms")
+
+
+async def bench_live(exchanges, repeats: int):
+    from backend.exchanges.adapter import ExchangeAdapter
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = MarketCache(tmp)
+        print(f"{'exchange':<10} {'markets':>8} {'cold ms':>10} {'warm ms':>10}")
+        for name in exchanges:
+            cold = ExchangeAdapter(name, {}, market_cache=cache)
+            await cold.connect()
+            await cold.close()
+            if not cold.is_connected:
+                print(f"{name:<10} failed: {cold.last_error}")
+                continue
+            if cold._cache_task:
+                await cold._cache_task
+
+            warm_times = []
+            for _ in range(repeats):
+                warm = ExchangeAdapter(name, {}, market_cache=cache)
+                await warm.connect()
+                await warm.close()
+                warm_times.append(warm.connect_time_ms)
+            print(f"{name:<10} {len(cold.markets):>8} {cold.connect_time_ms:>10.0f} {min(warm_times):>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("exchanges", nargs="*", default=["binance"])
+    parser.add_argument("--offline", action="store_true", help="use synthetic markets, no network")
+    parser.add_argument("--markets", type=int, default=3000, help="synthetic market count")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.offline:
+        bench_offline(args.markets, args.repeats)
+    else:
+        asyncio.run(bench_live(args.exchanges, args.repeats))
+
+
+if __name__ == "__main__":
+    main()
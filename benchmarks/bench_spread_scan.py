@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Arbitrage scan latency benchmark: pairwise Python loops vs the vectorized scanner.
+
+    python benchmarks/bench_spread_scan.py
+    python benchmarks/bench_spread_scan.py --symbols 10 100 1000 --exchanges 7
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.services.price_book import PriceBook
+from backend.services.spread_scanner import DEFAULT_TAKER_FEES, SpreadScanner
+
+EXCHANGES = ["binance", "kraken", "bybit", "kucoin", "okx", "gate", "mexc"]
+
+
+def build_book(n_exchanges: int, n_symbols: int, seed: int = 7) -> PriceBook:
+    rng = np.random.default_rng(seed)
+    exchanges = (EXCHANGES * (n_exchanges // len(EXCHANGES) + 1))[:n_exchanges]
+    exchanges = [f"{e}{i // len(EXCHANGES) or ''}" for i, e in enumerate(exchanges)]
+    symbols = [f"C{i:04d}/USDT" for i in range(n_symbols)]
+    book = PriceBook(exchanges, symbols)
+    mids = rng.uniform(0.1, 50_000, n_symbols)
+    for e in exchanges:
+        noise = 1 + rng.normal(0, 0.003, n_symbols)
+        for s, mid in zip(symbols, mids * noise):
+            book.update(e, s, mid * 0.9995, mid * 1.0005, 1.0, 1.0, 0.0)
+    return book
+
+
+def pairwise_scan(book: PriceBook, fees: dict, threshold: float):
+    """Reference implementation: nested Python loops over symbols and exchange pairs."""
+    found = []
+    for symbol in book.symbols:
+        quotes = {e: book.get(e, symbol) for e in book.exchanges}
+        for buy, bq in quotes.items():
+            for sell, sq in quotes.items():
+                if buy == sell or bq is None or sq is None:
+                    continue
+                cost = bq["ask"] * (1 + fees.get(buy, 0.001))
+                proceeds = sq["bid"] * (1 - fees.get(sell, 0.001))
+                net = proceeds / cost - 1
+                if net >= threshold:
+                    found.append((net, symbol, buy, sell))
+    found.sort(reverse=True)
+    return found
+
+
+def timeit(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--exchanges", type=int, default=7)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'symbols':>8} {'exchanges':>10} {'pairwise ms':>12} {'vectorized ms':>14} {'speedup':>8}")
+    for n in args.symbols:
+        book = build_book(args.exchanges, n)
+        scanner = SpreadScanner(book, top_k=20, min_net_profit_pct=0.0)
+        pairwise_ms = timeit(lambda: pairwise_scan(book, DEFAULT_TAKER_FEES, 0.0), args.repeats)
+        vector_ms = timeit(lambda: scanner.scan(), args.repeats)
+        print(f"{n:>8} {args.exchanges:>10} {pairwise_ms:>12.3f} {vector_ms:>14.3f} {pairwise_ms / vector_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
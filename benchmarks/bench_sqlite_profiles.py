@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+SQLite storage profile benchmark: insert and query throughput on the real tables.
+
+Each profile gets a fresh database file. Inserts go through the writer engine
+both row-per-transaction (how an unbatched caller behaves) and batched
+executemany (how WriteBehindWriter flushes); queries run on the reader pool
+while a writer keeps inserting.
+
+    python benchmarks/bench_sqlite_profiles.py
+    python benchmarks/bench_sqlite_profiles.py --profiles balanced fast --rows 50000
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from sqlalchemy import func, insert, select
+
+from backend.core.database import Base, STORAGE_PROFILES, create_engines
+from backend.models.tables import Opportunity, OpportunityStatus, RiskEvent, RiskSeverity
+
+EXCHANGES = ["binance", "kraken", "bybit", "kucoin", "okx", "gate", "mexc"]
+SYMBOLS = [f"C{i:03d}/USDT" for i in range(200)]
+
+
+def opportunity_row(rng: random.Random) -> dict:
+    buy, sell = rng.sample(EXCHANGES, 2)
+    price = rng.uniform(0.1, 50_000)
+    spread = rng.uniform(0.0, 1.0)
+    return {
+        "opportunity_id": uuid.uuid4().hex,
+        "symbol": rng.choice(SYMBOLS),
+        "arb_type": "cross_exchange",
+        "buy_exchange": buy,
+        "sell_exchange": sell,
+        "buy_price": price,
+        "sell_price": price * (1 + spread / 100),
+        "spread_pct": spread,
+        "net_profit_pct": spread - 0.2,
+        "estimated_profit_usd": spread - 0.2,
+        "status": rng.choice(list(OpportunityStatus)),
+    }
+
+
+async def bench_profile(profile: str, rows: int, single_rows: int, batch_size: int,
+                        queries: int, directory: Path) -> dict:
+    url = f"sqlite+aiosqlite:///{directory / f'{profile}.db'}"
+    writer, reader = create_engines(url, profile=profile)
+    rng = random.Random(11)
+    result = {"profile": profile}
+    try:
+        async with writer.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        # Row-per-transaction inserts
+        started = time.perf_counter()
+        for _ in range(single_rows):
+            async with writer.begin() as conn:
+                await conn.execute(insert(RiskEvent), {
+                    "event_type": "bench", "severity": RiskSeverity.INFO, "message": "tick",
+                })
+        result["single_rows_per_sec"] = single_rows / (time.perf_counter() - started)
+
+        # Batched executemany inserts
+        batches = [[opportunity_row(rng) for _ in range(batch_size)] for _ in range(rows // batch_size)]
+        started = time.perf_counter()
+        for batch in batches:
+            async with writer.begin() as conn:
+                await conn.execute(insert(Opportunity), batch)
+        result["batch_rows_per_sec"] = len(batches) * batch_size / (time.perf_counter() - started)
+
+        # Indexed dashboard-style reads on the reader pool, with a concurrent writer
+        stop = asyncio.Event()
+
+        async def background_writes():
+            while not stop.is_set():
+                async with writer.begin() as conn:
+                    await conn.execute(insert(Opportunity), [opportunity_row(rng) for _ in range(batch_size)])
+                await asyncio.sleep(0)
+
+        async def read_once(i: int):
+            symbol = SYMBOLS[i % len(SYMBOLS)]
+            async with reader.connect() as conn:
+                await conn.execute(
+                    select(Opportunity.symbol, Opportunity.net_profit_pct)
+                    .where(Opportunity.status == OpportunityStatus.ACTIVE)
+                    .order_by(Opportunity.detected_at.desc())
+                    .limit(50)
+                )
+                await conn.execute(select(func.count()).where(Opportunity.symbol == symbol))
+
+        writes = asyncio.create_task(background_writes())
+        started = time.perf_counter()
+        for chunk in range(0, queries, 8):
+            await asyncio.gather(*(read_once(i) for i in range(chunk, min(chunk + 8, queries))))
+        result["queries_per_sec"] = queries / (time.perf_counter() - started)
+        stop.set()
+        await writes
+    finally:
+        await writer.dispose()
+        if reader is not writer:
+            await reader.dispose()
+    return result
+
+
+async def main_async(args):
+    with tempfile.TemporaryDirectory(prefix="qae-sqlite-") as tmp:
+        print(f"{'profile':<10} {'1-row tx/s':>12} {'batched rows/s':>15} {'queries/s':>11}")
+        for profile in args.profiles:
+            r = await bench_profile(profile, args.rows, args.single_rows, args.batch_size,
+                                    args.queries, Path(tmp))
+            print(f"{r['profile']:<10} {r['single_rows_per_sec']:>12,.0f} "
+                  f"{r['batch_rows_per_sec']:>15,.0f} {r['queries_per_sec']:>11,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", nargs="+", default=list(STORAGE_PROFILES), choices=list(STORAGE_PROFILES))
+    parser.add_argument("--rows", type=int, default=20000, help="rows for the batched insert phase")
+    parser.add_argument("--single-rows", type=int, default=500, help="rows for the row-per-transaction phase")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=400)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Startup import-time report and budget check.
+
+Each module is imported in a fresh interpreter with ``-X importtime``; the
+report lists the slowest imports by cumulative time, and the command exits
+with status 1 when the median cold import of any module is over budget:
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --budget-ms 600 --top 25
+    python benchmarks/bench_startup.py backend.main ccxt.pro --repeats 9
+
+backend.main builds its engines in the FastAPI lifespan and the exchange
+adapter imports ccxt.pro on first connect, so neither should show up under
+the app modules; ``ccxt.pro`` can be passed for reference.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_MODULES = ["backend.main", "backend.api.worker", "backend.services.ingest_worker"]
+
+
+def import_profile(module: str) -> Tuple[float, List[Tuple[float, float, str]]]:
+    """Import ``module`` in a fresh interpreter; returns (wall ms, [(cumulative ms, self ms, name)])."""
+    code = (
+        "import time; t0 = time.perf_counter(); "
+        f"import {module}; "
+        "print((time.perf_counter() - t0) * 1000)"
+    )
+    env = {**os.environ, "PYTHONPATH": str(PROJECT_ROOT)}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1:] or ["no output"]
+        raise RuntimeError(f"import {module} failed: {tail[0]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative_us) / 1000, int(self_us) / 1000, name.rstrip()))
+    return float(proc.stdout.strip().splitlines()[-1]), rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time report and startup budget check.")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="modules to import")
+    parser.add_argument("--repeats", type=int, default=5, help="cold imports per module")
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list per module")
+    parser.add_argument("--budget-ms", type=float, default=800.0, help="median cold import budget")
+    args = parser.parse_args()
+
+    over_budget = []
+    for module in args.modules:
+        walls, rows = [], []
+        try:
+            for _ in range(args.repeats):
+                wall_ms, rows = import_profile(module)
+                walls.append(wall_ms)
+        except RuntimeError as e:
+            print(f"\n{module}: {e}")
+            over_budget.append(module)
+            continue
+        median = statistics.median(walls)
+        status = "OK" if median <= args.budget_ms else "OVER BUDGET"
+        if median > args.budget_ms:
+            over_budget.append(module)
+
+        print(f"\n{module}: median {median:.0f} ms, min {min(walls):.0f} ms "
+              f"over {args.repeats} cold imports (budget {args.budget_ms:.0f} ms) {status}")
+        print(f"  {'cumulative':>10}  {'self':>8}  module")
+        for cumulative_ms, self_ms, name in sorted(rows, reverse=True)[:args.top]:
+            print(f"  {cumulative_ms:>8.1f}ms  {self_ms:>6.1f}ms  {name}")
+        heavy = sorted({name.strip().split(".")[0] for _, _, name in rows} & {"ccxt", "pandas", "sklearn"})
+        if heavy:
+            print(f"  eagerly imported: {', '.join(heavy)}")
+
+    if over_budget:
+        print(f"\nFailed or over the {args.budget_ms:.0f} ms budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Per-tick latency of the triangular detector with thousands of markets loaded.
+
+    python benchmarks/bench_triangular.py --coins 1000 --ticks 20000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.services.triangular import TriangularDetector
+
+QUOTES = {"USDT": 1.0, "BTC": 60_000.0, "ETH": 3_000.0}
+CROSSES = {("BTC", "USDT"), ("ETH", "USDT"), ("ETH", "BTC")}
+BUDGET_US = 1000.0
+
+
+def synthetic_markets(coins: int, seed: int = 3):
+    """Every coin quoted in USDT, BTC and ETH, plus the quote crosses."""
+    rng = np.random.default_rng(seed)
+    usd = {f"C{i:04d}": float(v) for i, v in enumerate(rng.uniform(0.01, 500, coins))}
+    usd.update({"BTC": QUOTES["BTC"], "ETH": QUOTES["ETH"]})
+    markets = {}
+    for base in list(usd):
+        for quote in QUOTES:
+            if base in QUOTES and (base, quote) not in CROSSES:
+                continue
+            symbol = f"{base}/{quote}"
+            markets[symbol] = {"symbol": symbol, "base": base, "quote": quote, "spot": True, "active": True}
+    mids = {s: usd[m["base"]] / QUOTES[m["quote"]] for s, m in markets.items()}
+    return markets, mids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--coins", type=int, default=1000)
+    parser.add_argument("--ticks", type=int, default=20000)
+    args = parser.parse_args()
+
+    markets, mids = synthetic_markets(args.coins)
+    detector = TriangularDetector(min_net_profit_pct=0.0)
+    t0 = time.perf_counter()
+    graph = detector.build("synthetic", markets)
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    symbols = list(markets)
+    for s in symbols:
+        detector.on_tick("synthetic", s, mids[s] * 0.9995, mids[s] * 1.0005)
+
+    rng = np.random.default_rng(11)
+    picks = rng.integers(0, len(symbols), args.ticks)
+    noise = 1 + rng.normal(0, 0.004, args.ticks)
+    samples = np.empty(args.ticks)
+    for i, (idx, n) in enumerate(zip(picks, noise)):
+        s = symbols[idx]
+        mid = mids[s] * n
+        t = time.perf_counter_ns()
+        detector.on_tick("synthetic", s, mid * 0.9995, mid * 1.0005)
+        samples[i] = (time.perf_counter_ns() - t) / 1000
+
+    p50, p99 = np.percentile(samples, [50, 99])
+    print(f"markets={len(markets)} cycles={len(graph.cycles)} build={build_ms:.0f} ms")
+    print(f"per tick: p50={p50:.1f} us p99={p99:.1f} us max={samples.max():.1f} us "
+          f"(budget {BUDGET_US:.0f} us) active={len(detector.active)}")
+    if p99 > BUDGET_US:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Wire format benchmark: bytes and CPU per update for JSON, MessagePack and the columnar grid.
+
+    prices (full)     /api/v1/market/prices body for the whole grid
+    prices (delta)    /ws/market prices delta after one ticker frame
+    opportunities     /api/v1/arbitrage/opportunities body
+
+Encode is what the server pays once per update (per version or per stream
+frame); decode is what each client pays on receipt.
+
+    python benchmarks/bench_wire_formats.py
+    python benchmarks/bench_wire_formats.py --exchanges 7 --symbols 100 500 1000 --frame-size 50
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import msgpack
+
+from backend.services.incremental_arbitrage import IncrementalArbitrageDetector
+from backend.services.price_book import PriceBook
+from backend.services.stream_hub import PriceTopic
+from backend.services.wire import decode_price_grid, encode_json, encode_msgpack, encode_price_grid
+
+EXCHANGES = ["binance", "kraken", "bybit", "kucoin", "okx", "gate", "mexc"]
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+
+def build(n_exchanges: int, n_symbols: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    exchanges = (EXCHANGES * (n_exchanges // len(EXCHANGES) + 1))[:n_exchanges]
+    exchanges = [f"{e}{i // len(EXCHANGES) or ''}" for i, e in enumerate(exchanges)]
+    symbols = [f"C{i:04d}/USDT" for i in range(n_symbols)]
+    book = PriceBook(exchanges, symbols)
+    detector = IncrementalArbitrageDetector(min_net_profit_pct=-1.0)
+    mids = rng.uniform(0.1, 50_000, n_symbols)
+    for e in exchanges:
+        noise = 1 + rng.normal(0, 0.003, n_symbols)
+        for s, mid in zip(symbols, mids * noise):
+            book.update(e, s, mid * 0.9995, mid * 1.0005, 1.0, 1.0, 1_700_000_000_000.0)
+            detector.on_tick(e, s, mid * 0.9995, mid * 1.0005)
+    return book, detector, rng
+
+
+def timeit(fn, repeats: int) -> float:
+    """Median microseconds per call."""
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter_ns()
+        fn()
+        samples.append(time.perf_counter_ns() - t0)
+    return float(np.median(samples)) / 1000
+
+
+def row(label: str, fmt: str, encode, decode, repeats: int):
+    body = encode()
+    enc_us = timeit(encode, repeats)
+    dec_us = timeit(lambda: decode(body), repeats)
+    print(f"{label:<16} {fmt:<9} {len(body):>12,} {enc_us:>12.1f} {dec_us:>12.1f}")
+
+
+async def bench(n_exchanges: int, n_symbols: int, frame_size: int, repeats: int):
+    book, detector, rng = build(n_exchanges, n_symbols)
+    print(f"\n{n_exchanges} exchanges x {n_symbols} symbols, {frame_size}-ticker frames")
+    print(f"{'payload':<16} {'format':<9} {'bytes':>12} {'encode us':>12} {'decode us':>12}")
+
+    # Full grid, as the prices endpoint serves it (dict build counted for the row formats)
+    stamp = "2024-01-01T00:00:00"
+    row("prices (full)", "json", lambda: encode_json({"prices": book.to_dict(), "timestamp": stamp}),
+        json_loads, repeats)
+    row("prices (full)", "msgpack", lambda: encode_msgpack({"prices": book.to_dict(), "timestamp": stamp}),
+        msgpack.unpackb, repeats)
+    row("prices (full)", "columnar", lambda: encode_price_grid(book.snapshot()), decode_price_grid, repeats)
+
+    # One stream delta: a frame of updates on one exchange
+    topic = PriceTopic(book)
+    await topic.poll()
+    exchange = book.exchanges[0]
+    for s in rng.choice(n_symbols, min(frame_size, n_symbols), replace=False):
+        quote = book.get(exchange, book.symbols[s])
+        book.update(exchange, book.symbols[s], quote["bid"] * 1.0001, quote["ask"] * 1.0001, 2.0, 2.0,
+                    quote["timestamp"] + 1)
+    cells, removed = await topic.poll()
+    message = {"type": "delta", "topic": "prices", "seq": 1, "data": cells, "removed": removed,
+               "timestamp": stamp}
+    row("prices (delta)", "json", lambda: encode_json(message), json_loads, repeats)
+    row("prices (delta)", "msgpack", lambda: encode_msgpack(message), msgpack.unpackb, repeats)
+
+    opportunities = {"opportunities": list(detector.active.values()), "count": len(detector.active)}
+    row("opportunities", "json", lambda: encode_json(opportunities), json_loads, repeats)
+    row("opportunities", "msgpack", lambda: encode_msgpack(opportunities), msgpack.unpackb, repeats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--exchanges", type=int, default=7)
+    parser.add_argument("--symbols", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--frame-size", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+    for n in args.symbols:
+        asyncio.run(bench(args.exchanges, n, args.frame_size, args.repeats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the ingestion -> detection -> API -> storage pipeline.
+
+Runs offline on seeded synthetic tickers, so two runs on the same machine see
+identical data. Every case times one operation per iteration and reports
+p50 / p99 / mean latency and throughput:
+
+    ingest.watch_tickers         adapter frame delivery -> TickIngestQueue -> consumer
+    price_book.apply_tickers     one frame written into the PriceBook
+    scan.vectorized              SpreadScanner.scan over the whole book
+    scan.incremental             IncrementalArbitrageDetector.on_tickers for one frame
+    api.market_prices            /api/v1/market/prices payload build + FastAPI JSON encoding
+    api.arbitrage_opportunities  /api/v1/arbitrage/opportunities filter + FastAPI JSON encoding
+    api.snapshot.prices          one frame applied, then the versioned prices snapshot rebuilt
+    api.snapshot.opportunities   one frame detected, then the opportunities snapshot rebuilt and filtered
+    db.write_behind              WriteBehindWriter.flush of one batch into the tables.py models
+
+    python -m benchmarks.run
+    python -m benchmarks.run --quick --cases scan api
+    python -m benchmarks.run --save-baseline main
+    python -m benchmarks.run --compare main --threshold 15
+
+Baselines are JSON files under ``benchmarks/baselines/``. ``--compare`` prints
+the change per case and exits with status 1 when p50 or p99 of any case got
+slower by more than ``--threshold`` percent.
+"""
+
+import argparse
+import asyncio
+import gc
+import inspect
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.exchanges.adapter import ExchangeAdapter
+from backend.services.incremental_arbitrage import IncrementalArbitrageDetector
+from backend.services.price_book import PriceBook
+from backend.services.spread_scanner import SpreadScanner
+from backend.services.tick_ingest import TickIngestQueue
+
+BASELINE_DIR = PROJECT_ROOT / "benchmarks" / "baselines"
+EXCHANGES = ["binance", "kraken", "bybit", "kucoin", "okx", "gate", "mexc"]
+
+# name -> (coroutine function building and timing the case, default iterations)
+CASES: Dict[str, Tuple[Callable, int]] = {}
+
+
+def case(name: str, iterations: int):
+    def register(fn):
+        CASES[name] = (fn, iterations)
+        return fn
+    return register
+
+
+# --- Synthetic market ---
+
+class Market:
+    """Seeded exchanges x symbols universe and a ring of ccxt-shaped ticker frames."""
+
+    def __init__(self, n_exchanges: int, n_symbols: int, frame_size: int, seed: int, frames: int = 512):
+        rng = np.random.default_rng(seed)
+        exchanges = (EXCHANGES * (n_exchanges // len(EXCHANGES) + 1))[:n_exchanges]
+        self.exchanges = [f"{e}{i // len(EXCHANGES) or ''}" for i, e in enumerate(exchanges)]
+        self.symbols = [f"C{i:04d}/USDT" for i in range(n_symbols)]
+        self.mids = rng.uniform(0.1, 50_000, n_symbols)
+        self.frame_size = min(frame_size, n_symbols)
+
+        now_ms = 1_700_000_000_000
+        self.frames: List[Tuple[str, List[dict]]] = []
+        for i in range(frames):
+            exchange = self.exchanges[i % len(self.exchanges)]
+            picks = rng.choice(n_symbols, self.frame_size, replace=False)
+            mids = self.mids[picks] * (1 + rng.normal(0, 0.003, self.frame_size))
+            half = mids * rng.uniform(0.0001, 0.001, self.frame_size)
+            self.frames.append((exchange, [
+                {
+                    "symbol": self.symbols[s],
+                    "timestamp": now_ms + i,
+                    "bid": float(m - h),
+                    "ask": float(m + h),
+                    "bidVolume": 1.0,
+                    "askVolume": 1.0,
+                    "last": float(m),
+                }
+                for s, m, h in zip(picks, mids, half)
+            ]))
+        self._next = 0
+
+    def frame(self) -> Tuple[str, List[dict]]:
+        frame = self.frames[self._next]
+        self._next = (self._next + 1) % len(self.frames)
+        return frame
+
+    def full_sweep(self):
+        """One quote for every (exchange, symbol) pair, so books start fully populated."""
+        for e, exchange in enumerate(self.exchanges):
+            noise = 1 + np.random.default_rng(e).normal(0, 0.003, len(self.symbols))
+            yield exchange, [
+                {"symbol": s, "timestamp": 0, "bid": float(m * 0.9995), "ask": float(m * 1.0005),
+                 "bidVolume": 1.0, "askVolume": 1.0, "last": float(m)}
+                for s, m in zip(self.symbols, self.mids * noise)
+            ]
+
+    def price_book(self) -> PriceBook:
+        book = PriceBook(self.exchanges, self.symbols)
+        for exchange, tickers in self.full_sweep():
+            book.apply_tickers(exchange, tickers)
+        return book
+
+    def detector(self, **kwargs) -> IncrementalArbitrageDetector:
+        detector = IncrementalArbitrageDetector(**kwargs)
+        for exchange, tickers in self.full_sweep():
+            detector.on_tickers(exchange, tickers)
+        return detector
+
+
+def render_json(content: Any) -> bytes:
+    """What FastAPI does with an endpoint's return value."""
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    return JSONResponse(content=jsonable_encoder(content)).body
+
+
+# --- Measurement ---
+
+def summarize(samples: np.ndarray, items_per_op: float) -> Dict[str, float]:
+    us = samples / 1000
+    mean = float(us.mean())
+    ops = 1e6 / mean if mean else 0.0
+    return {
+        "iterations": int(len(samples)),
+        "p50_us": round(float(np.percentile(us, 50)), 3),
+        "p99_us": round(float(np.percentile(us, 99)), 3),
+        "mean_us": round(mean, 3),
+        "max_us": round(float(us.max()), 3),
+        "ops_per_sec": round(ops, 1),
+        "items_per_op": items_per_op,
+        "items_per_sec": round(ops * items_per_op, 1),
+    }
+
+
+async def measure(op: Callable, iterations: int, items_per_op: float = 1, warmup: int = 0) -> Dict[str, float]:
+    """Time ``op()`` (sync or async) ``iterations`` times after ``warmup`` untimed calls."""
+    warmup = warmup or max(1, iterations // 10)
+    samples = np.empty(iterations, dtype=np.int64)
+    clock = time.perf_counter_ns
+    gc.collect()
+    if inspect.iscoroutinefunction(op):
+        for _ in range(warmup):
+            await op()
+        for i in range(iterations):
+            t0 = clock()
+            await op()
+            samples[i] = clock() - t0
+    else:
+        for _ in range(warmup):
+            op()
+        for i in range(iterations):
+            t0 = clock()
+            op()
+            samples[i] = clock() - t0
+    return summarize(samples, items_per_op)
+
+
+# --- Cases ---
+
+@case("ingest.watch_tickers", iterations=5000)
+async def bench_ingest(market: Market, iterations: int, args) -> Dict[str, float]:
+    ingest = TickIngestQueue(policy="latest", batch_size=256)
+    consumed = [0]
+
+    async def on_ticker(ticker):
+        consumed[0] += 1
+
+    # The same delivery function watch_tickers builds for each stream
+    deliveries = {e: ExchangeAdapter(e, {}, ingest=ingest)._delivery(on_ticker) for e in market.exchanges}
+
+    async def op():
+        exchange, tickers = market.frame()
+        await deliveries[exchange](tickers)
+        await ingest.drain()
+
+    return await measure(op, iterations, market.frame_size)
+
+
+@case("price_book.apply_tickers", iterations=5000)
+async def bench_price_book(market: Market, iterations: int, args) -> Dict[str, float]:
+    book = PriceBook(market.exchanges, market.symbols)
+
+    def op():
+        exchange, tickers = market.frame()
+        book.apply_tickers(exchange, tickers)
+
+    return await measure(op, iterations, market.frame_size)
+
+
+@case("scan.vectorized", iterations=300)
+async def bench_vectorized(market: Market, iterations: int, args) -> Dict[str, float]:
+    scanner = SpreadScanner(market.price_book(), top_k=args.top_k, min_net_profit_pct=-1.0)
+    return await measure(scanner.scan, iterations, len(market.exchanges) * len(market.symbols))
+
+
+@case("scan.incremental", iterations=5000)
+async def bench_incremental(market: Market, iterations: int, args) -> Dict[str, float]:
+    detector = market.detector(min_net_profit_pct=-1.0)
+
+    def op():
+        detector.on_tickers(*market.frame())
+
+    return await measure(op, iterations, market.frame_size)
+
+
+@case("api.market_prices", iterations=200)
+async def bench_market_prices(market: Market, iterations: int, args) -> Dict[str, float]:
+    book = market.price_book()
+
+    async def op():
+        render_json({"prices": book.to_dict(), "timestamp": datetime.utcnow().isoformat()})
+
+    return await measure(op, iterations, len(market.exchanges) * len(market.symbols))
+
+
+@case("api.arbitrage_opportunities", iterations=1000)
+async def bench_opportunities(market: Market, iterations: int, args) -> Dict[str, float]:
+    # A negative threshold keeps one live opportunity per symbol
+    detector = market.detector(min_net_profit_pct=-1.0)
+    min_profit = args.min_profit
+
+    async def op():
+        opps = await detector.get_opportunities()
+        filtered_opps = [o for o in opps if o['net_profit_pct'] >= min_profit]
+        render_json({"opportunities": filtered_opps, "count": len(filtered_opps)})
+
+    return await measure(op, iterations, len(detector.active))
+
+
+@case("api.snapshot.prices", iterations=200)
+async def bench_prices_snapshot(market: Market, iterations: int, args) -> Dict[str, float]:
+    from backend.services.snapshot_cache import PricesSnapshot
+
+    book = market.price_book()
+    snapshot = PricesSnapshot(book)
+
+    def op():
+        book.apply_tickers(*market.frame())
+        snapshot.get()
+
+    return await measure(op, iterations, len(market.exchanges) * len(market.symbols))
+
+
+@case("api.snapshot.opportunities", iterations=1000)
+async def bench_opportunities_snapshot(market: Market, iterations: int, args) -> Dict[str, float]:
+    from backend.services.snapshot_cache import OpportunitiesSnapshot
+
+    detector = market.detector(min_net_profit_pct=-1.0)
+    snapshot = OpportunitiesSnapshot(detector.get_opportunities, lambda: detector.version)
+    min_profit = args.min_profit
+
+    async def op():
+        detector.on_tickers(*market.frame())
+        await snapshot.get(min_profit)
+
+    return await measure(op, iterations, len(detector.active))
+
+
+@case("db.write_behind", iterations=100)
+async def bench_db(market: Market, iterations: int, args) -> Dict[str, float]:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+    from backend.core.database import Base, create_engines
+    from backend.models.tables import RiskSeverity
+    from backend.services.persistence import WriteBehindWriter
+
+    opportunities = list(market.detector(min_net_profit_pct=-1.0).active.values())
+    batch = args.db_batch
+
+    with tempfile.TemporaryDirectory() as directory:
+        writer_engine, reader_engine = create_engines(
+            f"sqlite+aiosqlite:///{Path(directory) / 'bench.db'}", profile=args.storage_profile)
+        try:
+            async with writer_engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            session_factory = async_sessionmaker(writer_engine, class_=AsyncSession, expire_on_commit=False)
+            writer = WriteBehindWriter(session_factory, max_pending=batch * 2, batch_size=batch,
+                                       opportunity_min_interval=0.0)
+            cursor = [0]
+
+            async def op():
+                # Mostly opportunities, with the occasional trade and risk event
+                for i in range(batch):
+                    opp = opportunities[cursor[0] % len(opportunities)]
+                    cursor[0] += 1
+                    if i % 50 == 49:
+                        writer.submit_risk_event("bench", "synthetic risk event", RiskSeverity.INFO)
+                    elif i % 10 == 9:
+                        writer.submit_trade({
+                            "symbol": opp["symbol"], "buy_exchange": opp["buy_exchange"],
+                            "sell_exchange": opp["sell_exchange"], "buy_price": opp["buy_price"],
+                            "sell_price": opp["sell_price"], "quantity": 1.0,
+                        })
+                    else:
+                        writer.submit_opportunity(opp)
+                await writer.flush()
+
+            result = await measure(op, iterations, batch)
+            if writer.failed:
+                raise RuntimeError(f"{writer.failed} rows failed to write")
+            return result
+        finally:
+            await writer_engine.dispose()
+            if reader_engine is not writer_engine:
+                await reader_engine.dispose()
+
+
+# --- Baselines ---
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "numpy": np.__version__,
+        "commit": commit,
+    }
+
+
+def baseline_path(name: str) -> Path:
+    path = Path(name)
+    return path if path.suffix == ".json" else BASELINE_DIR / f"{name}.json"
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Print per-case changes; returns the names of cases that regressed."""
+    if baseline.get("config") != current["config"]:
+        print(f"warning: baseline config {baseline.get('config')} differs from {current['config']}")
+    regressions = []
+    print(f"\n{'case':<30} {'p50 us':>18} {'change':>8} {'p99 us':>18} {'change':>8}")
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            print(f"{name:<30} {'(not in baseline)':>18}")
+            continue
+        cells, regressed = [], False
+        for metric in ("p50_us", "p99_us"):
+            change = (result[metric] / base[metric] - 1) * 100 if base[metric] else 0.0
+            regressed = regressed or change > threshold
+            cells.append(f"{base[metric]:>8.1f} -> {result[metric]:<8.1f}{change:>+7.1f}%")
+        print(f"{name:<30} {cells[0]} {cells[1]}{'  REGRESSION' if regressed else ''}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+# --- CLI ---
+
+def selected_cases(prefixes: List[str]) -> List[str]:
+    if not prefixes:
+        return list(CASES)
+    names = [n for n in CASES if any(n.startswith(p) for p in prefixes)]
+    if not names:
+        raise SystemExit(f"No benchmark matches {prefixes}; available: {', '.join(CASES)}")
+    return names
+
+
+async def run(args) -> Dict[str, Any]:
+    config = {
+        "exchanges": args.exchanges,
+        "symbols": args.symbols,
+        "frame_size": args.frame_size,
+        "seed": args.seed,
+        "db_batch": args.db_batch,
+        "storage_profile": args.storage_profile,
+    }
+    results = {}
+    print(f"{'case':<30} {'iters':>6} {'p50 us':>10} {'p99 us':>10} {'mean us':>10} {'ops/s':>11} {'items/s':>13}")
+    for name in selected_cases(args.cases):
+        fn, iterations = CASES[name]
+        iterations = max(10, int(iterations * (0.1 if args.quick else args.scale)))
+        # Fresh, identically seeded data for every case
+        market = Market(args.exchanges, args.symbols, args.frame_size, args.seed)
+        r = results[name] = await fn(market, iterations, args)
+        print(f"{name:<30} {r['iterations']:>6} {r['p50_us']:>10.1f} {r['p99_us']:>10.1f} "
+              f"{r['mean_us']:>10.1f} {r['ops_per_sec']:>11,.0f} {r['items_per_sec']:>13,.0f}")
+    return {
+        "created_at": datetime.utcnow().isoformat(),
+        "environment": environment(),
+        "config": config,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", nargs="+", default=[], help="case names or prefixes (default: all)")
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    parser.add_argument("--exchanges", type=int, default=7)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--frame-size", type=int, default=50, help="tickers per watch_tickers frame")
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--min-profit", type=float, default=0.0, help="opportunities endpoint filter")
+    parser.add_argument("--db-batch", type=int, default=500, help="rows per write-behind flush")
+    parser.add_argument("--storage-profile", default="balanced")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every case's iteration count")
+    parser.add_argument("--quick", action="store_true", help="a tenth of the iterations, for smoke runs")
+    parser.add_argument("--save-baseline", metavar="NAME", help="write results to benchmarks/baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="compare against a saved baseline (name or .json path)")
+    parser.add_argument("--threshold", type=float, default=20.0, help="regression threshold in percent")
+    parser.add_argument("--output", help="also write the results JSON to this path")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (_, iterations) in CASES.items():
+            print(f"{name:<30} {iterations:>6} iterations")
+        return
+
+    baseline = None
+    if args.compare:
+        path = baseline_path(args.compare)
+        if not path.exists():
+            raise SystemExit(f"Baseline not found: {path}")
+        baseline = json.loads(path.read_text())
+
+    report = asyncio.run(run(args))
+
+    for target in filter(None, [args.save_baseline and baseline_path(args.save_baseline), args.output]):
+        target = Path(target)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nSaved results to {target}")
+
+    if baseline is not None:
+        regressions = compare(baseline, report, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold:g}%: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:g}%")
+
+
+if __name__ == "__main__":
+    main()
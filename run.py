@@ -3,7 +3,11 @@
 Quantum Arbitrage Engine - Main Entry Point
 Author: HABIB-UR-REHMAN <hassanbhatti2343@gmail.com>
 
-Starts both the API server and the Dashboard server.
+Starts the API server and the Dashboard server. With INGEST_WORKERS > 0 it
+also creates the shared-memory price book and starts one ingestion worker
+process per exchange group (see backend/services/ingest_worker.py). With
+API_WORKERS > 0 the engine serves its own API on loopback only and
+API_WORKERS stateless workers (backend/api/worker.py) serve the API port.
 """
 
 import asyncio
@@ -24,19 +28,28 @@ for d in ["logs", "data", "backups", "models"]:
     (PROJECT_ROOT / d).mkdir(exist_ok=True)
 
 
-def run_api_server():
-    """Run the FastAPI backend server."""
+def run_api_server(app="backend.main:app", host=None, port=None, workers=1):
+    """Run the FastAPI backend server (the engine, or the stateless API workers)."""
     import uvicorn
     uvicorn.run(
-        "backend.main:app",
-        host=os.environ.get("API_HOST", "0.0.0.0"),
-        port=int(os.environ.get("API_PORT", 8000)),
+        app,
+        host=host or os.environ.get("API_HOST", "0.0.0.0"),
+        port=port or int(os.environ.get("API_PORT", 8000)),
+        workers=workers,
         reload=False,
+        # auto = uvloop when installed (ENGINE_EVENT_LOOP=uvloop | asyncio to force)
+        loop=os.environ.get("ENGINE_EVENT_LOOP", "auto"),
         log_level="info",
         access_log=True,
     )
 
 
+def run_ingest_worker(exchanges):
+    """Run the exchange streams of one group into the shared price book."""
+    from backend.services.ingest_worker import main as worker_main
+    worker_main(["--exchanges", ",".join(exchanges)])
+
+
 def run_dashboard_server():
     """Run the static dashboard server."""
     import importlib.util
@@ -68,23 +81,60 @@ def main():
     ╚══════════════════════════════════════════════════════════════════╝
     """)
 
-    # Start API server in a process
-    api_process = multiprocessing.Process(target=run_api_server, daemon=True)
-    api_process.start()
-
-    # Give API server time to start
-    time.sleep(2)
-
-    # Start dashboard server in a process
-    dashboard_process = multiprocessing.Process(target=run_dashboard_server, daemon=True)
-    dashboard_process.start()
+    from backend.core.config import settings
+
+    # name -> (target, args); started in this order and restarted when they die
+    services = {}
+    book = None
+    if settings.ingest_workers > 0:
+        from backend.services.shared_price_book import SharedPriceBook
+        try:
+            settings.check_topology()
+        except ValueError as e:
+            print(f"    ✗ {e}")
+            sys.exit(1)
+        # Owned by this process: created before any reader starts, unlinked at shutdown
+        try:
+            book = SharedPriceBook.create(settings.shared_price_book_name, settings.exchanges_list,
+                                          settings.symbols_list)
+        except FileExistsError as e:
+            print(f"    ✗ {e}")
+            sys.exit(1)
+        for i, group in enumerate(settings.ingest_groups):
+            services[f"Ingest worker {i} ({','.join(group)})"] = (run_ingest_worker, (group,))
+    if settings.api_workers > 0:
+        services["Engine"] = (run_api_server, ("backend.main:app", "127.0.0.1", settings.engine_api_port))
+        services["API workers"] = (run_api_server, ("backend.api.worker:app", None, None, settings.api_workers))
+    else:
+        services["API server"] = (run_api_server, ())
+    services["Dashboard server"] = (run_dashboard_server, ())
+
+    def start(name):
+        target, args = services[name]
+        # Not daemonic: the API process may start its own CPU process pool
+        process = multiprocessing.Process(target=target, args=args, name=name)
+        process.start()
+        return process
+
+    processes = {}
+    for name in services:
+        processes[name] = start(name)
+        if name in ("API server", "Engine"):
+            # Give API server time to start
+            time.sleep(2)
 
     def shutdown(sig, frame):
         print("\n\n    Shutting down Quantum Arbitrage Engine...")
-        api_process.terminate()
-        dashboard_process.terminate()
-        api_process.join(timeout=5)
-        dashboard_process.join(timeout=5)
+        # Readers first, so the ingestion workers outlive the engine that consumes them
+        for process in reversed(list(processes.values())):
+            process.terminate()
+        for process in processes.values():
+            process.join(timeout=5)
+            if process.is_alive():
+                process.kill()
+        if book is not None:
+            book.close()
+            book.unlink()
         print("    Shutdown complete. Goodbye!")
         sys.exit(0)
 
@@ -94,14 +144,10 @@ def main():
     try:
         while True:
             time.sleep(1)
-            if not api_process.is_alive():
-                print("    ⚠ API server stopped unexpectedly. Restarting...")
-                api_process = multiprocessing.Process(target=run_api_server, daemon=True)
-                api_process.start()
-            if not dashboard_process.is_alive():
-                print("    ⚠ Dashboard server stopped unexpectedly. Restarting...")
-                dashboard_process = multiprocessing.Process(target=run_dashboard_server, daemon=True)
-                dashboard_process.start()
+            for name, process in processes.items():
+                if not process.is_alive():
+                    print(f"    ⚠ {name} stopped unexpectedly. Restarting...")
+                    processes[name] = start(name)
     except KeyboardInterrupt:
         shutdown(None, None)
 
@@ -0,0 +1,67 @@
+import asyncio
+from types import SimpleNamespace
+
+from backend.exchanges.adapter import ExchangeAdapter
+from backend.exchanges.subscriptions import SubscriptionShard
+
+
+class FakeClient:
+    def __init__(self, *hashes):
+        self.futures = {h: object() for h in hashes}
+        self.subscriptions = {h: True for h in hashes}
+        self.rejected = []
+        self.was_reset = self.closed = False
+
+    def reject(self, error, message_hash):
+        self.rejected.append(message_hash)
+        del self.futures[message_hash]
+
+    def reset(self, error):
+        self.was_reset = True
+
+    async def close(self):
+        self.closed = True
+
+
+def adapter_with(clients):
+    adapter = ExchangeAdapter("binance", {})
+    adapter.markets = {s: {"id": s.replace("/", "")} for s in ("BTC/USDT", "ETH/USDT", "DOGE/USDT", "PEPE/USDT")}
+    adapter.public_client = SimpleNamespace(clients=clients)
+    return adapter
+
+
+def test_stale_shard_reset_spares_receiving_streams():
+    quiet = SubscriptionShard("binance:1", ["DOGE/USDT", "PEPE/USDT"], batch=True)
+    busy = SubscriptionShard("binance:0", ["BTC/USDT", "ETH/USDT"], batch=True)
+    dedicated = FakeClient("tickers::DOGE/USDT,PEPE/USDT")
+    shared = FakeClient("tickers::DOGE/USDT,PEPE/USDT", "tickers::BTC/USDT,ETH/USDT")
+    healthy = FakeClient("tickers::BTC/USDT,ETH/USDT")
+    books = FakeClient("orderbook::DOGE/USDT", "orderbook::BTC/USDT")
+    clients = {"ws/0": dedicated, "ws/1": shared, "ws/2": healthy, "ws/3": books}
+    adapter = adapter_with(clients)
+
+    asyncio.run(adapter._reset_streams("test", [quiet], [busy]))
+
+    # Only the quiet shard's connection goes away
+    assert dedicated.was_reset and dedicated.closed and "ws/0" not in clients
+    # A shared connection stays up; the quiet shard resubscribes on it
+    assert not shared.was_reset and not shared.closed
+    assert shared.rejected == ["tickers::DOGE/USDT,PEPE/USDT"]
+    assert list(shared.subscriptions) == ["tickers::BTC/USDT,ETH/USDT"]
+    # Healthy streams and order books are left alone
+    for client in (healthy, books):
+        assert not client.was_reset and not client.rejected
+    assert len(books.subscriptions) == 2
+
+
+def test_repeated_staleness_drops_shared_connections():
+    quiet = SubscriptionShard("binance:1", ["DOGE/USDT"], batch=True)
+    busy = SubscriptionShard("binance:0", ["BTC/USDT"], batch=True)
+    shared = FakeClient("tickers::DOGE/USDT", "tickers::BTC/USDT")
+    healthy = FakeClient("tickers::BTC/USDT")
+    clients = {"ws/0": shared, "ws/1": healthy}
+
+    asyncio.run(adapter_with(clients)._reset_streams("test", [quiet], [busy], drop_shared=True))
+
+    assert shared.was_reset and shared.closed
+    assert list(clients) == ["ws/1"] and not healthy.was_reset
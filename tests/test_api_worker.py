@@ -0,0 +1,33 @@
+import asyncio
+import socket
+
+from backend.api import worker
+from backend.core.config import settings
+from backend.services.engine_link import EnginePublisher
+
+
+def test_worker_follows_the_engine_only_inside_its_lifespan(monkeypatch):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        address = f"tcp:127.0.0.1:{sock.getsockname()[1]}"
+    monkeypatch.setattr(settings, "engine_link_address", address)
+    monkeypatch.setattr(settings, "ingest_workers", 0)
+    assert worker.replica is None  # importing the module builds nothing
+
+    async def run():
+        publisher = EnginePublisher(address, interval=0.01)
+        publisher.add_topic("opportunities", lambda: [{"symbol": "BTC/USDT"}])
+        await publisher.start()
+        try:
+            async with worker.lifespan(worker.app):
+                for _ in range(200):
+                    if worker.replica.get("opportunities"):
+                        break
+                    await asyncio.sleep(0.01)
+                assert await worker.current_opportunities() == [{"symbol": "BTC/USDT"}]
+                assert worker.system_status() == {"engine_link": True}
+            assert worker.replica._task is None
+        finally:
+            await publisher.stop()
+
+    asyncio.run(run())
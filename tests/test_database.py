@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from backend.core.database import create_engines
+
+SYNCHRONOUS = {"OFF": 0, "NORMAL": 1, "FULL": 2}
+
+
+async def pragma(engine, name):
+    async with engine.connect() as conn:
+        return (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+
+
+@pytest.mark.parametrize("profile,synchronous,cache_size", [
+    ("durable", "FULL", -32000), ("balanced", "NORMAL", -64000), ("fast", "OFF", -256000),
+])
+def test_writer_runs_wal_with_the_profile_pragmas(tmp_path, profile, synchronous, cache_size):
+    async def run():
+        writer, reader = create_engines(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}", profile=profile)
+        try:
+            assert writer is not reader
+            assert await pragma(writer, "journal_mode") == "wal"
+            assert await pragma(writer, "synchronous") == SYNCHRONOUS[synchronous]
+            assert await pragma(writer, "cache_size") == cache_size
+            assert await pragma(writer, "busy_timeout") == 5000
+            assert await pragma(writer, "query_only") == 0
+        finally:
+            await writer.dispose()
+            await reader.dispose()
+
+    asyncio.run(run())
+
+
+def test_reader_is_query_only(tmp_path):
+    async def run():
+        writer, reader = create_engines(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}", profile="balanced")
+        try:
+            async with writer.begin() as conn:
+                await conn.execute(text("CREATE TABLE quotes (bid REAL)"))
+                await conn.execute(text("INSERT INTO quotes VALUES (100.0)"))
+
+            assert await pragma(reader, "query_only") == 1
+            # The journal mode lives in the file, so readers see the writer's WAL
+            assert await pragma(reader, "journal_mode") == "wal"
+            async with reader.connect() as conn:
+                assert (await conn.execute(text("SELECT bid FROM quotes"))).scalar() == 100.0
+                with pytest.raises(OperationalError, match="readonly"):
+                    await conn.execute(text("INSERT INTO quotes VALUES (101.0)"))
+        finally:
+            await writer.dispose()
+            await reader.dispose()
+
+    asyncio.run(run())
+
+
+def test_in_memory_and_unknown_profiles(tmp_path):
+    writer, reader = create_engines("sqlite+aiosqlite:///:memory:")
+    assert writer is reader
+    with pytest.raises(ValueError, match="Unknown storage profile"):
+        create_engines(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}", profile="turbo")
+    asyncio.run(writer.dispose())
@@ -0,0 +1,71 @@
+import asyncio
+import socket
+
+from backend.services.engine_link import EnginePublisher, EngineReplica
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for(condition, timeout: float = 2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_publisher_to_replica_round_trip():
+    address = f"tcp:127.0.0.1:{free_port()}"
+    state = {"opportunities": [{"symbol": "BTC/USDT", "net_profit_pct": 0.4}]}
+
+    async def run():
+        publisher = EnginePublisher(address, interval=0.01)
+        publisher.add_topic("opportunities", lambda: state["opportunities"])
+        replica = EngineReplica(address, reconnect_delay=0.01, max_reconnect_delay=0.05)
+        # The replica starts first and retries until the publisher is up
+        await replica.start()
+        await asyncio.sleep(0.05)
+        await publisher.start()
+        try:
+            await wait_for(lambda: replica.get("opportunities") is not None)
+            assert replica.get("opportunities") == state["opportunities"]
+            first = replica.version("opportunities")
+
+            state["opportunities"] = []
+            await wait_for(lambda: replica.get("opportunities") == [])
+            assert replica.version("opportunities") != first
+            assert replica.connected and replica.connects == 1
+        finally:
+            await replica.stop()
+            await publisher.stop()
+
+    asyncio.run(run())
+
+
+def test_replica_keeps_reconnecting_after_unexpected_errors():
+    address = f"tcp:127.0.0.1:{free_port()}"
+
+    async def run():
+        publisher = EnginePublisher(address, interval=0.01)
+        publisher.add_topic("status", lambda: {"ok": True})
+        replica = EngineReplica(address, reconnect_delay=0.01, max_reconnect_delay=0.05)
+        replica.decoders["status"] = lambda data: 1 / 0  # every message fails to apply
+        await publisher.start()
+        await replica.start()
+        try:
+            await wait_for(lambda: replica.connects >= 3)
+            assert not replica._task.done()
+            # Connecting is not enough to reset the backoff; the sessions never applied a frame
+            assert replica._backoff.attempt >= 2
+
+            del replica.decoders["status"]
+            await wait_for(lambda: replica.get("status") == {"ok": True})
+            assert replica._backoff.attempt == 0
+        finally:
+            await replica.stop()
+            await publisher.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from backend.core.config import settings
+from backend.engines import Engines, legacy_engine
+
+LEGACY_INSTALLED = legacy_engine("market_engine", "MarketDataEngine") is not None
+
+
+def test_legacy_engines_are_optional(monkeypatch):
+    assert legacy_engine("no_such_engine", "Engine") is None
+    assert legacy_engine("spread_scanner", "SpreadScanner") is not None
+
+    monkeypatch.setattr(settings, "arbitrage_scan_mode", "vectorized")
+    engines = Engines()
+    if legacy_engine("execution_engine", "ExecutionEngine") is None:
+        assert engines.execution_engine is None
+        assert engines.system_status()["execution_mode"] is None
+    assert isinstance(asyncio.run(engines.current_opportunities()), list)
+
+
+def test_app_imports():
+    import backend.main
+
+    assert backend.main.engines is None  # built in the lifespan, not at import
+
+
+@pytest.mark.skipif(LEGACY_INSTALLED, reason="the legacy engines are installed")
+def test_missing_legacy_engines_fail_fast(monkeypatch):
+    monkeypatch.setattr(settings, "arbitrage_scan_mode", "pairwise")
+    with pytest.raises(RuntimeError, match="pairwise"):
+        Engines()
+
+    # Nothing would feed the price book without the market engine or the ingest queue
+    monkeypatch.setattr(settings, "arbitrage_scan_mode", "vectorized")
+    monkeypatch.setattr(settings, "tick_ingest_enabled", False)
+    with pytest.raises(RuntimeError, match="TICK_INGEST_ENABLED"):
+        Engines()
+
+
+def test_tick_store_is_refused_with_ingestion_workers(monkeypatch):
+    monkeypatch.setattr(settings, "ingest_workers", 2)
+    monkeypatch.setattr(settings, "tick_store_enabled", True)
+    with pytest.raises(ValueError, match="TICK_STORE_ENABLED"):
+        Engines()
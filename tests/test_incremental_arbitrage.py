@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+from backend.services.incremental_arbitrage import IncrementalArbitrageDetector
+from backend.services.tick_ingest import TickIngestQueue
+
+
+def test_tick_to_opportunity_counts_from_delivery():
+    detector = IncrementalArbitrageDetector(taker_fees={"a": 0.0, "b": 0.0})
+    frame_a = [{"symbol": "BTC/USDT", "bid": 100.0, "ask": 100.1, "timestamp": None}]
+    frame_b = [{"symbol": "BTC/USDT", "bid": 102.0, "ask": 102.1, "timestamp": None}]
+    ingest = TickIngestQueue()
+    ingest.add_listener(detector.on_tickers, received=True)
+    ingest.publish("a", frame_a)
+    ingest.publish("b", frame_b)
+    # Time spent queued between delivery and the detector
+    time.sleep(0.005)
+    asyncio.run(ingest.drain())
+
+    opportunity = detector.active["BTC/USDT"]
+    assert opportunity["buy_exchange"] == "a" and opportunity["sell_exchange"] == "b"
+    assert opportunity["detection_latency_us"] >= 5000
+    assert opportunity["evaluation_us"] < opportunity["detection_latency_us"]
+    stats = detector.stats()
+    assert stats["tick_to_opportunity"]["count"] == 1
+    assert stats["evaluation"]["count"] == 1
+    assert stats["tick_to_opportunity"]["p50_us"] > stats["evaluation"]["p50_us"]
+    # The exchange's ticker dicts are left as delivered
+    assert frame_b == [{"symbol": "BTC/USDT", "bid": 102.0, "ask": 102.1, "timestamp": None}]
+
+
+def test_unstamped_ticks_only_report_evaluation_time():
+    detector = IncrementalArbitrageDetector(taker_fees={"a": 0.0, "b": 0.0})
+    detector.on_tickers("a", [{"symbol": "ETH/USDT", "bid": 10.0, "ask": 10.01}])
+    detector.on_tick("b", "ETH/USDT", 10.5, 10.51)
+
+    opportunity = detector.active["ETH/USDT"]
+    assert opportunity["detection_latency_us"] is None
+    assert opportunity["evaluation_us"] > 0
+    assert detector.stats()["tick_to_opportunity"]["count"] == 0
+
+
+def test_coalesced_tickers_keep_their_own_receive_time():
+    ingest = TickIngestQueue(policy="latest")
+    seen = []
+    ingest.add_listener(lambda exchange, tickers, received: seen.extend(zip(tickers, received)), received=True)
+    plain = []
+    ingest.add_listener(lambda exchange, tickers: plain.extend(tickers))
+    ingest.publish("a", [{"symbol": "X", "n": 1}], received_ns=1)
+    ingest.publish("a", [{"symbol": "Y", "n": 2}, {"symbol": "X", "n": 3}], received_ns=2)
+    asyncio.run(ingest.drain())
+
+    assert [(t["symbol"], t["n"], ns) for t, ns in seen] == [("Y", 2, 2), ("X", 3, 2)]
+    assert plain == [t for t, _ in seen]
@@ -0,0 +1,56 @@
+import pickle
+import time
+import zlib
+
+from backend.exchanges.market_cache import _HEADER, CACHE_MAGIC, CACHE_VERSION, MarketCache
+
+MARKETS = {
+    "BTC/USDT": {"id": "BTCUSDT", "symbol": "BTC/USDT", "active": True, "spot": True, "taker": 0.001,
+                 "precision": {"amount": 1e-05, "price": 0.01}, "limits": {"amount": {"min": 1e-05, "max": None}},
+                 "info": {"filters": [{"filterType": "PRICE_FILTER", "tickSize": "0.01"}]}},
+}
+CURRENCIES = {"BTC": {"id": "BTC", "code": "BTC", "precision": 1e-08}}
+
+
+def test_save_and_load_round_trip(tmp_path):
+    cache = MarketCache(str(tmp_path), library_version="4.1.80")
+    cache.save("binance", MARKETS, CURRENCIES)
+    entry = cache.load("binance")
+    assert entry.markets == MARKETS
+    assert entry.currencies == CURRENCIES
+    assert entry.age < 5
+    assert not cache.needs_refresh(entry)
+    assert cache.load("kraken") is None
+
+
+def test_expired_and_foreign_entries_are_ignored(tmp_path):
+    cache = MarketCache(str(tmp_path), ttl=60.0, refresh_after=10.0, library_version="4.1.80")
+    path = cache.save("binance", MARKETS)
+    raw = path.read_bytes()
+
+    # Saved 30 s ago: usable, but due for a refresh
+    path.write_bytes(_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, time.time() - 30) + raw[_HEADER.size:])
+    assert cache.needs_refresh(cache.load("binance"))
+
+    path.write_bytes(_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, time.time() - 120) + raw[_HEADER.size:])
+    assert cache.load("binance") is None
+
+    cache.save("binance", MARKETS)
+    assert MarketCache(str(tmp_path), library_version="4.2.0").load("binance") is None
+
+    path.write_bytes(raw[:_HEADER.size] + b"not zlib")
+    assert cache.load("binance") is None
+
+
+class Exploit:
+    def __reduce__(self):
+        return (exec, ("raise SystemExit('unpickled')",))
+
+
+def test_pickled_entries_are_never_decoded(tmp_path):
+    cache = MarketCache(str(tmp_path), library_version="4.1.80")
+    body = zlib.compress(pickle.dumps({"exchange_id": "binance", "markets": Exploit()}))
+    for version in (1, 2):
+        cache.path_for("binance").parent.mkdir(parents=True, exist_ok=True)
+        cache.path_for("binance").write_bytes(_HEADER.pack(CACHE_MAGIC, version, time.time()) + body)
+        assert cache.load("binance") is None
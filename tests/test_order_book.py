@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from backend.exchanges.order_book import BookSide, L2Book, estimate_fill
+
+
+def walk(levels, target, by_quote, limit=None, is_bid=False):
+    """Level-by-level fill -> (base, quote)."""
+    base = quote = 0.0
+    for price, size in levels:
+        if limit is not None and (price < limit if is_bid else price > limit):
+            break
+        remaining = target - (quote if by_quote else base)
+        if remaining <= 0:
+            break
+        take = min(size, remaining / price if by_quote else remaining)
+        base += take
+        quote += take * price
+    return base, quote
+
+
+def random_side(rng, is_bid, levels=50):
+    steps = rng.uniform(0.01, 0.5, levels).cumsum()
+    prices = 100.0 - steps if is_bid else 100.0 + steps
+    return [[float(p), float(s)] for p, s in zip(prices, rng.uniform(0.01, 3.0, levels))]
+
+
+@pytest.mark.parametrize("is_bid", [True, False])
+def test_fills_match_a_level_walk(is_bid):
+    rng = np.random.default_rng(3)
+    for _ in range(50):
+        levels = random_side(rng, is_bid)
+        side = BookSide.from_levels(levels, is_bid=is_bid)
+        limit = levels[int(rng.integers(0, len(levels)))][0] if rng.random() < 0.5 else None
+        notional, amount = float(rng.uniform(0, 8000)), float(rng.uniform(0, 80))
+
+        assert np.allclose(side.fill_quote(notional, limit), walk(levels, notional, True, limit, is_bid))
+        assert np.allclose(side.fill_base(amount, limit), walk(levels, amount, False, limit, is_bid))
+
+
+def test_fill_edges():
+    side = BookSide.from_levels([[10.0, 1.0], [11.0, 2.0]], is_bid=False)
+    assert side.fill_base(0.0) == (0.0, 0.0)
+    assert side.fill_base(1.0) == (1.0, 10.0)  # exactly the first level
+    assert side.fill_base(5.0) == (3.0, 32.0)  # capped at the book's depth
+    assert side.fill_base(5.0, limit_price=10.5) == (1.0, 10.0)
+    assert side.fill_quote(21.0) == (2.0, 21.0)
+    assert BookSide.from_levels([], is_bid=True).fill_quote(100.0) == (0.0, 0.0)
+
+
+def test_estimate_fill_is_limited_by_the_thinner_side():
+    buy = L2Book("a", "BTC/USDT", BookSide.from_levels([], True), BookSide.from_levels([[100.0, 5.0]], False))
+    sell = L2Book("b", "BTC/USDT", BookSide.from_levels([[101.0, 0.5], [100.5, 0.5]], True),
+                  BookSide.from_levels([], False))
+    fill = estimate_fill(buy, sell, trade_size_usd=300.0, buy_fee=0.0, sell_fee=0.0)
+
+    assert fill["fillable_base"] == pytest.approx(1.0)
+    assert fill["sell_vwap"] == pytest.approx(100.75)
+    assert fill["vwap_net_profit_usd"] == pytest.approx(0.75)
+    assert fill["depth_limited"]
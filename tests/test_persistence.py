@@ -0,0 +1,115 @@
+import asyncio
+
+from backend.models.tables import Opportunity, Trade
+from backend.services.persistence import WriteBehindWriter
+
+
+class FakeSession:
+    def __init__(self, db):
+        self.db = db
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def begin(self):
+        return self
+
+    async def execute(self, statement, rows):
+        if self.db.during_execute:
+            self.db.during_execute()
+        if self.db.fail:
+            self.db.fail -= 1
+            raise RuntimeError("database is locked")
+        self.db.batches.append((statement.table.name, [row["n"] for row in rows]))
+
+
+class FakeDatabase:
+    def __init__(self, fail: int = 0):
+        self.fail = fail  # executes that raise before the database recovers
+        self.batches = []
+        self.during_execute = None
+
+    def session(self):
+        return FakeSession(self)
+
+    @property
+    def rows(self):
+        return [n for _, ns in self.batches for n in ns]
+
+
+def writer_for(db, **kwargs):
+    kwargs = {"batch_size": 3, "flush_interval": 0.01, "max_retry_delay": 0.02, **kwargs}
+    return WriteBehindWriter(session_factory=db.session, **kwargs)
+
+
+def test_flush_writes_batches_per_table():
+    db = FakeDatabase()
+    writer = writer_for(db)
+    for n in range(4):
+        writer.submit(Opportunity if n % 2 else Trade, {"n": n})
+
+    assert asyncio.run(writer.flush()) == 3
+    assert db.batches == [("trades", [0, 2]), ("opportunities", [1])]
+    assert writer.stats()["pending"] == 1
+
+
+def test_full_buffer_refuses_new_rows():
+    writer = writer_for(FakeDatabase(), max_pending=2)
+    assert writer.submit(Trade, {"n": 0}) and writer.submit(Trade, {"n": 1})
+    assert not writer.submit(Trade, {"n": 2})
+    assert writer.dropped == 1 and writer.stats()["pending"] == 2
+
+
+def test_failed_batch_is_retried_in_order():
+    db = FakeDatabase(fail=2)
+
+    async def run():
+        writer = writer_for(db)
+        await writer.start()
+        for n in range(5):
+            writer.submit(Trade, {"n": n})
+        for _ in range(200):
+            if len(db.rows) == 5:
+                break
+            await asyncio.sleep(0.01)
+        await writer.stop()
+        return writer
+
+    writer = asyncio.run(run())
+    assert db.rows == [0, 1, 2, 3, 4]
+    assert writer.retries == 2
+    assert writer.failed == 0
+
+
+def test_requeue_evicts_the_oldest_rows_beyond_the_bound():
+    db = FakeDatabase(fail=1)
+    writer = writer_for(db, max_pending=4)
+    for n in range(4):
+        writer.submit(Trade, {"n": n})
+
+    # Rows submitted while the failing batch is in flight take the space it left
+    db.during_execute = lambda: writer.submit(Trade, {"n": 4}) and writer.submit(Trade, {"n": 5})
+    assert asyncio.run(writer.flush()) == 0
+    db.during_execute = None
+    assert writer.failed == 2
+    asyncio.run(writer.stop())
+    assert db.rows == [2, 3, 4, 5]
+
+
+def test_stop_flushes_everything_buffered():
+    db = FakeDatabase()
+
+    async def run():
+        writer = writer_for(db, flush_interval=60.0)
+        await writer.start()
+        for n in range(7):
+            writer.submit(Trade, {"n": n})
+        await writer.stop()
+        return writer
+
+    writer = asyncio.run(run())
+    assert sorted(db.rows) == list(range(7))
+    assert writer.written == 7 and writer.stats()["pending"] == 0
@@ -0,0 +1,32 @@
+import asyncio
+import time
+
+from backend.services.replay import ReplayConfig, ReplaySession
+from backend.services.tick_store import TickStore
+
+
+def record(store, exchange, tickers):
+    store.record(exchange, tickers)
+    # Distinct receive times, so each call replays as its own frame
+    time.sleep(0.005)
+
+
+def test_triangular_sees_markets_first_quoted_after_the_first_frame(tmp_path):
+    store = TickStore(str(tmp_path))
+    store.directory.mkdir(parents=True, exist_ok=True)
+    # First frame lists BTC/USDT only; the other legs of the cycle arrive later
+    record(store, "binance", [{"symbol": "BTC/USDT", "bid": 100.0, "ask": 100.01}])
+    record(store, "binance", [
+        {"symbol": "ETH/USDT", "bid": 10.0, "ask": 10.001},
+        {"symbol": "ETH/BTC", "bid": 0.0899, "ask": 0.09},
+        {"symbol": "BTC/USDT", "bid": 100.0, "ask": 100.01},
+    ])
+    asyncio.run(store.flush())
+
+    summary = ReplaySession(ReplayConfig(
+        store_dir=str(tmp_path), triangular=True, min_profit_threshold_pct=0.1,
+        quote_max_age=0, taker_fees={"binance": 0.0},
+    )).run()
+
+    assert summary["ticks"] == 4
+    assert summary["opportunities"]["triangular_active"] == 1
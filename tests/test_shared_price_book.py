@@ -0,0 +1,153 @@
+import multiprocessing
+import os
+import time
+import uuid
+
+import numpy as np
+import pytest
+
+from backend.services.shared_price_book import _HEADER, SharedBookFollower, SharedPriceBook
+
+EXCHANGES = ["binance", "kraken", "okx"]
+SYMBOLS = [f"C{i}/USDT" for i in range(200)]
+
+
+@pytest.fixture
+def book():
+    book = SharedPriceBook.create(f"qae-test-{uuid.uuid4().hex[:8]}", EXCHANGES, SYMBOLS)
+    yield book
+    book.close()
+    book.unlink()
+
+
+def frame(k):
+    # Every quote of frame k carries k, so a row mixing two frames is detectable
+    return [{"symbol": s, "bid": float(k), "ask": float(k) + 0.5, "timestamp": float(k)} for s in SYMBOLS]
+
+
+def write_frames(name, exchange, stop):
+    book = SharedPriceBook.attach(name)
+    book.claim([exchange])
+    k = 0
+    while not stop.is_set():
+        k += 1
+        book.apply_tickers(exchange, frame(k))
+        time.sleep(0.0001)
+    book.close()
+
+
+def test_frozen_snapshot_is_consistent_under_concurrent_writers(book):
+    ctx = multiprocessing.get_context("spawn")
+    stop = ctx.Event()
+    writers = [ctx.Process(target=write_frames, args=(book.shm.name, name, stop)) for name in EXCHANGES[:2]]
+    for writer in writers:
+        writer.start()
+    try:
+        reads, deadline = 0, time.monotonic() + 1.5
+        while time.monotonic() < deadline or book.version < 50:
+            snap = book.frozen_snapshot()
+            for e in range(2):
+                bid, ask = snap.bid[e], snap.ask[e]
+                if np.isnan(bid[0]):
+                    continue
+                assert np.all(bid == bid[0]), "row mixes two frames"
+                assert np.all(ask == bid[0] + 0.5)
+            reads += 1
+    finally:
+        stop.set()
+        for writer in writers:
+            writer.join(5)
+    assert reads > 100
+    assert all(writer.exitcode == 0 for writer in writers)
+    assert not snap.grid.flags.writeable
+
+
+def stick_mid_frame(book, e, k):
+    # A writer preempted (or killed) halfway through frame k: counter odd, half the row written
+    book._seq[e] += 1
+    for field in (0, 1):
+        book._grid[field, e, :len(SYMBOLS) // 2] = float(k)
+
+
+def test_stuck_writer_never_yields_a_torn_row(book, monkeypatch):
+    monkeypatch.setattr("backend.services.shared_price_book.READ_TIMEOUT", 0.001)
+    book.apply_tickers("kraken", frame(1))
+    stick_mid_frame(book, 0, 5)  # binance has never completed a frame
+    first = book.frozen_snapshot()
+    assert np.isnan(first.bid[0]).all()
+    assert (first.bid[1] == 1.0).all()
+
+    book.claim(["binance"])  # a restarted worker takes the row over
+    book.apply_tickers("binance", frame(2))
+    assert (book.frozen_snapshot().bid[0] == 2.0).all()
+
+    stick_mid_frame(book, 0, 3)
+    snap = book.frozen_snapshot()
+    assert (snap.bid[0] == 2.0).all() and (snap.ask[0] == 2.5).all()
+    assert book.get("binance", SYMBOLS[0])["bid"] == 2.0
+    assert book.stale_reads == 3
+
+
+def test_claim_repairs_a_row_left_mid_write(book, monkeypatch):
+    monkeypatch.setattr("backend.services.shared_price_book.READ_TIMEOUT", 0.001)
+    book.apply_tickers("kraken", frame(1))
+    book.frozen_snapshot()
+    # Writer killed between the two counter increments
+    book._seq[1] += 1
+    # Readers wait out READ_TIMEOUT, then use the last consistent copy
+    assert book.get("kraken", SYMBOLS[0])["bid"] == 1.0
+    assert book.stale_reads == 1
+
+    book.claim(["kraken"])
+    assert book._seq[1] % 2 == 0
+    book.apply_tickers("kraken", frame(2))
+    assert book._seq[1] % 2 == 0
+    assert book.frozen_snapshot().bid[1, 0] == 2.0
+
+
+def test_drops_are_visible_to_other_processes(book):
+    other = SharedPriceBook.attach(book.shm.name)
+    try:
+        other.apply_tickers("okx", [{"symbol": "NOT/LISTED", "bid": 1.0, "ask": 1.1}])
+        other.update("okx", "ALSO/UNLISTED", 1.0, 1.1)
+        assert book.dropped == 2
+        follower = SharedBookFollower(book, lambda exchange, tickers: None)
+        assert follower.stats()["dropped_quotes"] == 2
+    finally:
+        other.close()
+
+
+def test_follower_forwards_changed_cells(book):
+    batches = []
+    follower = SharedBookFollower(book, lambda exchange, tickers: batches.append((exchange, tickers)))
+    book.update("binance", SYMBOLS[0], 10.0, 10.1, timestamp=1.0)
+    assert follower.poll() == 1
+    assert follower.poll() == 0
+    book.update("okx", SYMBOLS[3], 20.0, 20.1, timestamp=2.0)
+    assert follower.poll() == 1
+    assert [(e, t[0]["symbol"], t[0]["bid"]) for e, t in batches] == [
+        ("binance", SYMBOLS[0], 10.0), ("okx", SYMBOLS[3], 20.0),
+    ]
+
+
+def test_create_refuses_a_block_owned_by_a_running_process(book):
+    with pytest.raises(FileExistsError, match="running process"):
+        SharedPriceBook.create(book.shm.name, EXCHANGES, SYMBOLS)
+    # The live block is untouched
+    book.update("binance", SYMBOLS[0], 1.0, 1.1)
+    assert book.get("binance", SYMBOLS[0])["bid"] == 1.0
+
+
+def test_create_replaces_a_block_left_by_a_dead_process(book):
+    ctx = multiprocessing.get_context("spawn")
+    dead = ctx.Process(target=time.sleep, args=(0,))
+    dead.start()
+    dead.join()
+    # The creator pid is the last header field
+    book.shm.buf[_HEADER.size - 8:_HEADER.size] = dead.pid.to_bytes(8, "little")
+
+    replacement = SharedPriceBook.create(book.shm.name, EXCHANGES, SYMBOLS)
+    try:
+        assert replacement.creator_pid == os.getpid()
+    finally:
+        replacement.close()
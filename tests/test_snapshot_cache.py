@@ -0,0 +1,54 @@
+import time
+
+from backend.services.engine_link import EngineReplica, ReplicaPriceBook
+from backend.services.price_book import PriceBook
+from backend.services.snapshot_cache import PricesSnapshot
+from backend.services.wire import COLUMNAR, JSON, MSGPACK, encode_price_grid
+
+
+def frame(book: PriceBook) -> bytes:
+    return encode_price_grid(book.frozen_snapshot())
+
+
+def test_prices_are_encoded_once_per_version_and_format():
+    book = PriceBook(["binance"], ["BTC/USDT"])
+    book.update("binance", "BTC/USDT", 100.0, 100.1)
+    snapshot = PricesSnapshot(book)
+    assert snapshot.cached(JSON) is None  # nothing built yet
+
+    first = snapshot.get(JSON)
+    assert snapshot.cached(JSON) is first and snapshot.get(JSON) is first
+    assert snapshot.cached(MSGPACK) is None
+    assert snapshot.get(MSGPACK).etag != first.etag
+    assert snapshot.builds == 2
+
+    book.update("binance", "BTC/USDT", 100.2, 100.3)
+    assert snapshot.cached(JSON) is None  # stale bodies are never served
+    second = snapshot.get(JSON)
+    assert second.etag != first.etag and str(book.version) in second.etag
+    assert snapshot.stats()["bytes"] == {JSON: len(second.body)}
+
+
+def test_workers_agree_on_etags():
+    engine = PriceBook(["binance"], ["BTC/USDT"])
+    early = ReplicaPriceBook(EngineReplica("tcp:127.0.0.1:0"))
+    late = ReplicaPriceBook(EngineReplica("tcp:127.0.0.1:0"))
+    engine.update("binance", "BTC/USDT", 100.0, 100.1)
+    early._decode(frame(engine))
+    engine.update("binance", "BTC/USDT", 100.2, 100.3)
+    # One worker saw both frames, the other joined after the second
+    early._decode(frame(engine))
+    late._decode(frame(engine))
+
+    assert early.version == late.version == engine.version
+    for fmt in (JSON, MSGPACK, COLUMNAR):
+        assert PricesSnapshot(early).get(fmt).etag == PricesSnapshot(late).get(fmt).etag
+
+
+def test_a_restarted_book_does_not_reuse_versions():
+    before = PriceBook(["binance"], ["BTC/USDT"])
+    for i in range(5):
+        before.update("binance", "BTC/USDT", 100.0 + i, 100.1 + i)
+    time.sleep(0.001)
+    after = PriceBook(["binance"], ["BTC/USDT"])
+    assert after.version > before.version
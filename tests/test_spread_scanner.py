@@ -0,0 +1,91 @@
+import asyncio
+
+import numpy as np
+
+from backend.services.price_book import PriceBook
+from backend.services.spread_scanner import SpreadScanner, net_spreads, rank_spreads
+
+
+def brute_force(fees, bid, ask):
+    """Every (buy, sell, column) net spread with a plain loop."""
+    spreads = {}
+    exchanges, symbols = bid.shape
+    for i in range(exchanges):
+        for j in range(exchanges):
+            if i == j:
+                continue
+            for s in range(symbols):
+                cost, proceeds = ask[i, s] * (1 + fees[i]), bid[j, s] * (1 - fees[j])
+                if np.isfinite(cost) and np.isfinite(proceeds) and cost > 0:
+                    spreads[(i, j, s)] = proceeds / cost - 1.0
+    return spreads
+
+
+def random_quotes(rng, exchanges=5, symbols=40):
+    mid = rng.uniform(1, 1000, symbols)
+    noise = 1 + rng.normal(0, 0.004, (exchanges, symbols))
+    ask = mid * noise * 1.0005
+    bid = mid * noise * 0.9995
+    holes = rng.random((exchanges, symbols)) < 0.2
+    bid[holes] = np.nan
+    ask[holes] = np.nan
+    return rng.uniform(0, 0.003, exchanges), bid, ask
+
+
+def test_net_spreads_matches_brute_force():
+    rng = np.random.default_rng(7)
+    fees, bid, ask = random_quotes(rng)
+    expected = brute_force(fees, bid, ask)
+    net = net_spreads(fees, bid, ask)
+
+    assert net.shape == (5, 5, 40)
+    for idx in zip(*np.nonzero(np.isfinite(net))):
+        assert tuple(idx) in expected
+    for idx, value in expected.items():
+        assert np.isclose(net[idx], value)
+    assert np.all(np.isneginf(net[np.arange(5), np.arange(5), :]))
+
+
+def test_rank_spreads_matches_brute_force():
+    rng = np.random.default_rng(11)
+    for threshold, top_k in ((-1.0, 10), (0.0, 5), (0.001, 50), (0.5, 3)):
+        fees, bid, ask = random_quotes(rng)
+        expected = sorted(
+            ((value, idx) for idx, value in brute_force(fees, bid, ask).items() if value >= threshold),
+            reverse=True,
+        )[:top_k]
+        buy, sell, col, net = rank_spreads(fees, bid, ask, threshold, top_k)
+
+        assert len(net) == len(expected)
+        assert np.allclose(net, [value for value, _ in expected])
+        assert all(np.diff(net) <= 0)
+        brute = brute_force(fees, bid, ask)
+        for i, j, s, value in zip(buy, sell, col, net):
+            assert np.isclose(brute[(i, j, s)], value)
+
+
+def test_version_and_listeners_only_follow_changes():
+    book = PriceBook(["binance", "kraken"], ["BTC/USDT"])
+    book.update("binance", "BTC/USDT", 100.0, 100.1)
+    book.update("kraken", "BTC/USDT", 102.0, 102.1)
+    scanner = SpreadScanner(book, taker_fees={"binance": 0.0, "kraken": 0.0})
+    notified = []
+    scanner.add_listener(lambda opportunity: notified.append(opportunity["sell_price"]))
+
+    async def run():
+        await scanner.start(interval=0.01)
+        await asyncio.sleep(0.1)
+        unchanged = scanner.version
+        await asyncio.sleep(0.1)
+        assert scanner.version == unchanged
+        book.update("kraken", "BTC/USDT", 103.0, 103.1)
+        await asyncio.sleep(0.1)
+        await scanner.stop()
+        return unchanged
+
+    unchanged = asyncio.run(run())
+    assert scanner.scans > 10
+    assert unchanged == 1
+    assert scanner.version == 2
+    assert scanner.opportunities[0]["sell_price"] == 103.0
+    assert notified == [102.0, 103.0]
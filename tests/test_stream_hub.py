@@ -0,0 +1,136 @@
+import asyncio
+import json
+
+import msgpack
+import pytest
+
+from backend.services.price_book import PriceBook
+from backend.services.stream_hub import PriceTopic, StateTopic, StreamHub, Topic
+
+
+def test_topic_without_state_fails_on_construction():
+    class PollOnly(Topic):
+        async def poll(self):
+            return None
+
+    with pytest.raises(TypeError):
+        PollOnly("broken")
+
+
+def test_state_topic_reports_changes_only():
+    values = iter([{"mode": "monitor"}, {"mode": "monitor"}, {"mode": "full_auto"}])
+    topic = StateTopic("system", lambda: next(values))
+
+    async def polls():
+        return [await topic.poll() for _ in range(3)]
+
+    first, unchanged, changed = asyncio.run(polls())
+    assert first == ({"mode": "monitor"}, [])
+    assert unchanged is None
+    assert changed == ({"mode": "full_auto"}, [])
+    assert topic.state() == {"mode": "full_auto"}
+
+
+class FakeWebSocket:
+    def __init__(self, stalled: bool = False):
+        self.sent = []
+        self.closed_with = None
+        self.stalled = stalled  # never finishes a send, like a client that stopped reading
+        self.incoming: asyncio.Queue = asyncio.Queue()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, frame):
+        if self.stalled:
+            await asyncio.Event().wait()
+        self.sent.append(json.loads(frame))
+
+    async def send_bytes(self, frame):
+        self.sent.append(msgpack.unpackb(frame))
+
+    async def receive(self):
+        return await self.incoming.get()
+
+    async def close(self, code=1000):
+        self.closed_with = code
+        self.incoming.put_nowait({"type": "websocket.disconnect"})
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_price_topic_sends_only_changed_cells():
+    book = PriceBook(["binance", "kraken"], ["BTC/USDT"])
+    book.update("binance", "BTC/USDT", 100.0, 100.1, timestamp=1.0)
+    topic = PriceTopic(book)
+
+    async def run():
+        first = await topic.poll()
+        unchanged = await topic.poll()
+        book.update("kraken", "BTC/USDT", 101.0, 101.1, timestamp=2.0)
+        book.update("kraken", "ETH/USDT", 10.0, 10.1, timestamp=2.0)  # the book grows a symbol
+        return first, unchanged, await topic.poll()
+
+    first, unchanged, changed = asyncio.run(run())
+    assert first[0]["BTC/USDT"]["binance"]["bid"] == 100.0
+    assert unchanged is None
+    assert set(changed[0]) == {"BTC/USDT", "ETH/USDT"}
+    assert list(changed[0]["BTC/USDT"]) == ["kraken"]
+    assert changed[1] == []
+    assert set(topic.state()) == {"BTC/USDT", "ETH/USDT"}
+
+
+def test_deltas_fan_out_once_per_format():
+    book = PriceBook(["binance"], ["BTC/USDT"])
+    book.update("binance", "BTC/USDT", 100.0, 100.1, timestamp=1.0)
+    hub = StreamHub(interval=60.0)
+    hub.add_topic(PriceTopic(book))
+
+    async def run():
+        clients = [FakeWebSocket(), FakeWebSocket(), FakeWebSocket()]
+        formats = ["json", "json", "msgpack"]
+        serving = [asyncio.create_task(hub.serve(ws, ["prices"], fmt)) for ws, fmt in zip(clients, formats)]
+        await settle()
+        book.update("binance", "BTC/USDT", 101.0, 101.1, timestamp=2.0)
+        await hub.publish()
+        await settle()
+        await hub.stop()
+        await asyncio.gather(*serving)
+        return clients
+
+    clients = asyncio.run(run())
+    for ws in clients:
+        snapshot, delta = ws.sent
+        assert snapshot["type"] == "snapshot" and snapshot["seq"] == 1
+        assert delta["type"] == "delta" and delta["seq"] == 2
+        assert delta["data"]["BTC/USDT"]["binance"]["bid"] == 101.0
+        assert ws.closed_with == 1001
+    assert hub.published == 1
+    assert set(hub.bytes_encoded) == {"json", "msgpack"}
+
+
+def test_slow_client_is_dropped_without_stalling_others():
+    values = iter(range(1000))
+    hub = StreamHub(interval=60.0, queue_size=2)
+    hub.add_topic(StateTopic("system", lambda: next(values)))
+
+    async def run():
+        slow, fast = FakeWebSocket(stalled=True), FakeWebSocket()
+        serving = [asyncio.create_task(hub.serve(ws, ["system"])) for ws in (slow, fast)]
+        await settle()
+        for _ in range(5):
+            await hub.publish()
+            await settle()
+        closing_left = len(hub._closing)
+        await hub.stop()
+        await asyncio.gather(*serving)
+        return slow, fast, closing_left
+
+    slow, fast, closing_left = asyncio.run(run())
+    assert hub.dropped_clients == 1
+    assert slow.closed_with == 1013
+    assert closing_left == 0
+    assert [frame["seq"] for frame in fast.sent] == [1, 2, 3, 4, 5, 6]
@@ -0,0 +1,43 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend.exchanges.adapter import ExchangeAdapter
+from backend.exchanges.subscriptions import SubscriptionShard
+from backend.exchanges.supervisor import Backoff
+
+
+def test_backoff_survives_long_outages():
+    backoff = Backoff(base=1.0, cap=5.0)
+    backoff.attempt = 5000
+    for _ in range(10):
+        assert 2.5 <= backoff.next() <= 5.0
+    assert backoff.attempt == 5010
+    backoff.reset()
+    assert backoff.next() <= 1.0
+
+
+def test_consumer_errors_do_not_count_as_stream_failures():
+    calls = []
+
+    async def watch_tickers(symbols):
+        calls.append(symbols)
+        if len(calls) > 3:
+            raise asyncio.CancelledError
+        return {"BTC/USDT": {"symbol": "BTC/USDT", "bid": 1.0, "ask": 1.1}}
+
+    async def broken_consumer(tickers):
+        raise ValueError("consumer bug")
+
+    adapter = ExchangeAdapter("binance", {})
+    adapter.public_client = SimpleNamespace(watch_tickers=watch_tickers)
+    shard = SubscriptionShard("binance:0", ["BTC/USDT"], batch=True)
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(adapter._stream_batch(shard, broken_consumer))
+
+    assert len(calls) == 4
+    assert shard.messages == 3 and shard.errors == 0
+    assert adapter.supervisor.restarts == 0
+    assert adapter.supervisor.breaker.failures == 0
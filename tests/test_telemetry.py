@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+from backend.exchanges import telemetry as telemetry_module
+from backend.exchanges.telemetry import ExchangeTelemetry, Histogram, render_prometheus
+
+
+def test_histogram_quantiles_and_cumulative_buckets():
+    hist = Histogram(bounds=(1, 10, 100))
+    assert hist.quantile(0.5) is None and hist.summary()["mean_ms"] is None
+    for value in (0.5, 1, 5, 10, 50, 500):
+        hist.observe(value)
+
+    # Bounds are inclusive upper edges, as Prometheus ``le`` is
+    assert hist.counts == [2, 2, 1, 1]
+    assert hist.cumulative() == [("1", 2), ("10", 4), ("100", 5), ("+Inf", 6)]
+    assert hist.quantile(0.3) == 1.0
+    assert hist.quantile(0.5) == 10.0
+    assert hist.quantile(0.8) == 100.0
+    assert hist.quantile(0.99) is None  # beyond the last finite bound
+    assert hist.summary() == {"count": 6, "mean_ms": 94.42, "p50_ms_le": 10.0, "p99_ms_le": None}
+
+
+def test_quote_ages_cover_tracked_symbols_only(monkeypatch):
+    monkeypatch.setattr(telemetry_module.time, "time", lambda: 1000.0)
+    telemetry = ExchangeTelemetry("binance")
+    telemetry.track(["BTC/USDT", "ETH/USDT"])
+    telemetry.on_frame([{"symbol": "BTC/USDT"}, {"symbol": "DOGE/USDT"}, {"symbol": "ETH/USDT"}])
+    assert set(telemetry.last_seen) == {"BTC/USDT", "ETH/USDT"}
+    assert telemetry.tickers == 3 and telemetry.untimed == 3
+
+    # Resubscribing without ETH forgets its age
+    telemetry.track(["BTC/USDT"])
+    assert telemetry.quote_ages(now=1002.5) == {"BTC/USDT": 2.5}
+
+
+def test_render_prometheus(monkeypatch):
+    monkeypatch.setattr(telemetry_module.time, "time", lambda: 1000.0)
+    telemetry = ExchangeTelemetry("binance")
+    telemetry.track(["BTC/USDT"])
+    telemetry.on_frame([{"symbol": "BTC/USDT", "timestamp": 1000.0 * 1000 - 3}])
+    telemetry.on_rest("fetch_ticker", 30.0, ok=False)
+    adapters = [SimpleNamespace(name="binance", is_connected=True, telemetry=telemetry),
+                SimpleNamespace(name='we"ird', is_connected=False, telemetry=ExchangeTelemetry('we"ird'))]
+
+    text = render_prometheus(adapters)
+    lines = text.splitlines()
+    assert text.endswith("\n")
+    assert "# TYPE qae_exchange_feed_latency_ms histogram" in lines
+    assert 'qae_exchange_connected{exchange="binance"} 1' in lines
+    assert 'qae_exchange_connected{exchange="we\\"ird"} 0' in lines
+    assert 'qae_exchange_feed_latency_ms_bucket{exchange="binance",le="2"} 0' in lines
+    assert 'qae_exchange_feed_latency_ms_bucket{exchange="binance",le="5"} 1' in lines
+    assert 'qae_exchange_feed_latency_ms_bucket{exchange="binance",le="+Inf"} 1' in lines
+    assert 'qae_exchange_feed_latency_ms_count{exchange="binance"} 1' in lines
+    assert 'qae_exchange_tickers_total{exchange="binance"} 1' in lines
+    assert 'qae_exchange_rest_errors_total{exchange="binance"} 1' in lines
+    assert 'qae_exchange_rest_latency_ms_bucket{exchange="binance",method="fetch_ticker",le="50"} 1' in lines
+    assert 'qae_quote_age_seconds{exchange="binance",symbol="BTC/USDT"} 0.000' in lines
+    # Every sample belongs to a family declared before it
+    declared = set()
+    for line in lines:
+        if line.startswith("# TYPE "):
+            declared.add(line.split()[2])
+        elif not line.startswith("#"):
+            name = line.split("{")[0]
+            assert any(name == f or name.startswith(f + "_") for f in declared), line
@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from backend.services import tick_store as tick_store_module
+from backend.services.tick_store import TickStore
+
+
+def ticker(symbol, bid, ts=None):
+    return {"symbol": symbol, "bid": bid, "ask": bid + 0.1, "bidVolume": 1.0, "askVolume": None,
+            "last": None, "timestamp": ts}
+
+
+def test_record_flush_and_range_reads(tmp_path, monkeypatch):
+    now = [1_700_000_000.0]
+    monkeypatch.setattr(tick_store_module.time, "time", lambda: now[0])
+    store = TickStore(str(tmp_path / "ticks"))
+    store.directory.mkdir(parents=True)
+    for i in range(10):
+        now[0] += 1
+        store.record("binance" if i % 2 else "kraken", [ticker("BTC/USDT", 100.0 + i), ticker("ETH/USDT", 10.0 + i)])
+    assert asyncio.run(store.flush()) == 20
+    assert store.stats()["pending"] == 0
+
+    start_ms, end_ms = 1_700_000_003_000, 1_700_000_006_000
+    window = store.query(start_ms, end_ms)
+    assert len(window) == 6 and np.all(np.diff(window["recv_ms"]) >= 0)
+    assert window["recv_ms"].min() >= start_ms and window["recv_ms"].max() < end_ms
+    # A time-only range is a slice of the memory map itself
+    assert isinstance(next(store.iter_range(start_ms, end_ms)), np.memmap)
+
+    btc = store.query(symbol="BTC/USDT", exchange="binance")
+    assert btc["bid"].tolist() == [101.0, 103.0, 105.0, 107.0, 109.0]
+    assert np.isnan(btc["ask_size"]).all()
+    assert len(store.query(symbol="XRP/USDT")) == 0
+
+    # A reader opened later resolves the same names
+    reader = TickStore(str(tmp_path / "ticks"))
+    assert len(reader.query(symbol="ETH/USDT", exchange="kraken")) == 5
+
+
+def test_receive_times_stay_ordered_when_the_clock_steps_back(tmp_path, monkeypatch):
+    now = [1_700_000_100.0]
+    monkeypatch.setattr(tick_store_module.time, "time", lambda: now[0])
+    first = TickStore(str(tmp_path))
+    first.record("binance", [ticker("BTC/USDT", 100.0)])
+    asyncio.run(first.flush())
+
+    now[0] -= 30  # clock stepped back while the engine restarted
+    second = TickStore(str(tmp_path))
+    second.record("binance", [ticker("BTC/USDT", 101.0)])
+    asyncio.run(second.flush())
+
+    recv = second.query()["recv_ms"]
+    assert len(recv) == 2 and recv[1] >= recv[0]
+
+
+@pytest.mark.skipif(tick_store_module.fcntl is None, reason="no fcntl")
+def test_a_directory_has_one_writer(tmp_path):
+    async def run():
+        writer, other = TickStore(str(tmp_path)), TickStore(str(tmp_path))
+        await writer.start()
+        try:
+            with pytest.raises(RuntimeError, match="already being written"):
+                await other.start()
+        finally:
+            await writer.stop()
+        # Released on stop
+        await other.start()
+        await other.stop()
+
+    asyncio.run(run())